@@ -0,0 +1,192 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Packs the components of a text (header, chapters, footer, etc.) into a
+# 		   single file with an index so any component or run of components can
+# 		   be read without opening a file per component
+
+# File layout
+# magic (8 bytes) | header length (8 bytes, little-endian) | header (JSON) | component data (UTF-8)
+# The header lists [component name, offset, length] in component order, with
+# offsets in bytes from the start of the component data.
+
+# Imports
+
+# Built-ins
+from collections import OrderedDict
+import json
+import mmap
+import os
+import struct
+import sys
+
+
+# Globals
+
+# Characters replaced by underscores in component filenames
+illegal_filename_chars = ": .,"
+illegal_filename_table = str.maketrans({ ch: "_" for ch in illegal_filename_chars })
+
+
+# Utility functions
+
+def component_filename(p_key):
+	return p_key.translate(illegal_filename_table)
+
+def component_text(p_component):
+
+	# Components are lists of lines (or already joined text)
+	return p_component if isinstance(p_component, str) else "\n".join(p_component)
+
+def flatten_components(p_components):
+
+	# Components divided into subcomponents (see GutenbergReader) are stored
+	# by their subcomponent names, which already carry their output prefix
+	for key in p_components:
+		if isinstance(p_components[key], dict):
+			for subkey, subcomponent in flatten_components(p_components[key]):
+				yield subkey, subcomponent
+		else:
+			yield key, p_components[key]
+
+
+# Classes
+
+class ComponentPack:
+
+	# File signature and extension
+	magic = b"AOLMPACK"
+	extension = ".pack"
+
+	# Constructor and private methods
+
+	def __init__(self, p_filepath):
+
+		# 0. Save parameters
+		self.m_filepath = p_filepath
+
+		# 1. Map the file and read its header
+		self.m_file = open(p_filepath, "rb")
+		self.m_map = mmap.mmap(self.m_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if ComponentPack.magic != self.m_map[0:len(ComponentPack.magic)]:
+			raise ValueError("Not a component pack: {0}".format(p_filepath))
+		header_start = len(ComponentPack.magic) + 8
+		header_length = struct.unpack("<Q", self.m_map[len(ComponentPack.magic):header_start])[0]
+		header = json.loads(self.m_map[header_start:header_start + header_length].decode("utf-8"))
+
+		# 2. Component positions, by name and in order
+		self.m_data_start = header_start + header_length
+		self.m_text_filename = header["text"]
+		self.m_entries = header["components"]
+		self.m_indices = { entry[0]: index for index, entry in enumerate(self.m_entries) }
+
+	def __contains__(self, p_name):
+		return p_name in self.m_indices
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, p_type, p_value, p_traceback):
+		self.close()
+
+	def __getitem__(self, p_name):
+		return self.component(self.m_indices[p_name])
+
+	def __len__(self):
+		return len(self.m_entries)
+
+	# Properties
+
+	@property
+	def names(self):
+		return [entry[0] for entry in self.m_entries]
+
+	@property
+	def text_filename(self):
+		return self.m_text_filename
+
+	# Public methods
+
+	def close(self):
+		self.m_map.close()
+		self.m_file.close()
+
+	def component(self, p_index):
+
+		# 1. Read one component directly from its offset
+		name, offset, length = self.m_entries[p_index]
+		start = self.m_data_start + offset
+
+		return self.m_map[start:start + length].decode("utf-8")
+
+	def component_lines(self, p_index):
+		return self.component(p_index).split("\n")
+
+	def components(self, p_start=0, p_end=None):
+
+		# Components from index p_start up to (not including) p_end, read as one
+		# contiguous slice since packed components are stored in order
+		end = len(self.m_entries) if None == p_end else min(p_end, len(self.m_entries))
+		components = OrderedDict()
+		if p_start >= end:
+			return components
+
+		first_offset = self.m_entries[p_start][1]
+		last_name, last_offset, last_length = self.m_entries[end - 1]
+		data = self.m_map[self.m_data_start + first_offset:self.m_data_start + last_offset + last_length]
+
+		for name, offset, length in self.m_entries[p_start:end]:
+			components[name] = data[offset - first_offset:offset - first_offset + length].decode("utf-8")
+
+		return components
+
+	def export_folder(self, p_output_folder):
+
+		# Writes the components out in the one-file-per-component layout of
+		# ProjectGutenbergText.output
+		full_folder = p_output_folder + os.path.splitext(self.m_text_filename)[0] + os.sep
+		if not os.path.isdir(full_folder):
+			os.mkdir(full_folder)
+
+		for index, entry in enumerate(self.m_entries):
+			with open(full_folder + component_filename(entry[0]) + ".txt", "w") as component_file:
+				component_file.write(self.component(index))
+
+		return full_folder
+
+	# Static methods
+
+	@staticmethod
+	def write(p_filepath, p_components, p_text_filename):
+
+		# 1. Encode components and compute their offsets
+		encoded_components = []
+		entries = []
+		offset = 0
+		for name, component in flatten_components(p_components):
+			encoded = component_text(component).encode("utf-8")
+			encoded_components.append(encoded)
+			entries.append([name, offset, len(encoded)])
+			offset += len(encoded)
+
+		# 2. Write the header and then each component in one sequential pass
+		header = json.dumps({ "text": p_text_filename, "components": entries }).encode("utf-8")
+		with open(p_filepath, "wb") as pack_file:
+			pack_file.write(ComponentPack.magic)
+			pack_file.write(struct.pack("<Q", len(header)))
+			pack_file.write(header)
+			for encoded in encoded_components:
+				pack_file.write(encoded)
+
+
+# Main script
+
+def main(p_pack_filepath, p_output_folder):
+
+	# 1. Export a packed text to one file per component
+	with ComponentPack(p_pack_filepath) as pack:
+		print("Exported {0} components to {1}".format(len(pack), pack.export_folder(p_output_folder)))
+
+if "__main__" == __name__:
+	if len(sys.argv) > 2:
+		main(sys.argv[1], sys.argv[2])
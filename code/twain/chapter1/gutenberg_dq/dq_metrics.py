@@ -0,0 +1,302 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Data quality metrics of text components (e.g. the chapters of a
+# 		   Project Gutenberg edition) computed together in one pass over each
+# 		   component and reported as a tidy component x metric table
+
+# Metrics and features
+# A metric is a function registered with the features it needs (e.g. the type
+# counts of a component). Each needed feature is computed once per component as
+# a numpy array, from the component's text or from other features, and every
+# metric is a vectorized reduction over those arrays. Adding a metric that uses
+# existing features adds no pass over the text.
+#
+# Table rows: text, component, metric, value
+
+# Imports
+
+# Built-ins
+import argparse
+from collections import OrderedDict
+import csv
+import os
+import sys
+import unicodedata
+
+# Third party
+import numpy as np
+
+# Custom
+from positional_index import component_documents, tokenize
+
+
+# Globals
+
+# Feature and metric registries: name -> (names of required features, function)
+features = OrderedDict()
+metrics = OrderedDict()
+
+# Word list for out-of-vocabulary rates, if one is installed
+default_dictionary = "/usr/share/dict/words"
+
+# Table columns
+table_fields = ["text", "component", "metric", "value"]
+
+# Character class of each Basic Multilingual Plane code point (built once, in
+# about 15 ms, so each text's characters are classified by one table lookup)
+other_class, punctuation_class, whitespace_class = 0, 1, 2
+character_class_table = np.array([whitespace_class if chr(code_point).isspace() else
+	(punctuation_class if unicodedata.category(chr(code_point)).startswith("P") else other_class)
+	for code_point in range(0x10000)], dtype=np.uint8)
+
+
+# Utility functions
+
+def feature(p_name, p_requires=()):
+
+	# Registers a function(context) computing a feature from the features it requires
+	def register(p_function):
+		features[p_name] = (tuple(p_requires), p_function)
+		return p_function
+
+	return register
+
+def metric(p_name, p_requires=()):
+
+	# Registers a function(context) computing a metric from the features it requires
+	def register(p_function):
+		metrics[p_name] = (tuple(p_requires), p_function)
+		return p_function
+
+	return register
+
+def ratio(p_numerator, p_denominator):
+	return float(p_numerator) / float(p_denominator) if p_denominator > 0 else 0.0
+
+def load_dictionary(p_filepath):
+
+	# Lowercased words of a word list (one word per line)
+	with open(p_filepath, "r", encoding="utf-8", errors="ignore") as dictionary_file:
+		return set(line.strip().lower().replace("’", "'") for line in dictionary_file if line.strip())
+
+
+# Features
+
+@feature("tokens")
+def tokens_feature(p_context):
+	return np.array(tokenize(p_context["text"])[0], dtype=str)
+
+@feature("type_counts", ["tokens"])
+def type_counts_feature(p_context):
+
+	# Distinct tokens (sorted) and the count of each
+	return np.unique(p_context["tokens"], return_counts=True)
+
+@feature("token_lengths", ["tokens"])
+def token_lengths_feature(p_context):
+	return np.char.str_len(p_context["tokens"])
+
+@feature("code_points")
+def code_points_feature(p_context):
+	return np.frombuffer(p_context["text"].encode("utf-32-le"), dtype=np.uint32)
+
+@feature("character_classes", ["code_points"])
+def character_classes_feature(p_context):
+
+	# Class of each character (code points beyond the table are "other")
+	code_points = p_context["code_points"]
+	classes = character_class_table[np.minimum(code_points, 0xFFFF)]
+	classes[code_points > 0xFFFF] = other_class
+	return classes
+
+@feature("in_dictionary", ["type_counts"])
+def in_dictionary_feature(p_context):
+
+	# Whether each distinct token is in the dictionary (looked up once per type)
+	dictionary = p_context["dictionary"]
+	types = p_context["type_counts"][0]
+	return np.fromiter((word in dictionary for word in types), dtype=bool, count=len(types))
+
+
+# Metrics
+
+@metric("token_count", ["tokens"])
+def token_count_metric(p_context):
+	return len(p_context["tokens"])
+
+@metric("type_count", ["type_counts"])
+def type_count_metric(p_context):
+	return len(p_context["type_counts"][0])
+
+@metric("type_token_ratio", ["tokens", "type_counts"])
+def type_token_ratio_metric(p_context):
+	return ratio(len(p_context["type_counts"][0]), len(p_context["tokens"]))
+
+@metric("hapax_count", ["type_counts"])
+def hapax_count_metric(p_context):
+	return int(np.count_nonzero(1 == p_context["type_counts"][1]))
+
+@metric("hapax_ratio", ["type_counts"])
+def hapax_ratio_metric(p_context):
+
+	# Share of distinct tokens that occur once
+	return ratio(np.count_nonzero(1 == p_context["type_counts"][1]), len(p_context["type_counts"][0]))
+
+@metric("mean_word_length", ["token_lengths"])
+def mean_word_length_metric(p_context):
+	return float(p_context["token_lengths"].mean()) if len(p_context["token_lengths"]) > 0 else 0.0
+
+@metric("punctuation_density", ["character_classes"])
+def punctuation_density_metric(p_context):
+
+	# Punctuation characters per non-whitespace character
+	class_counts = np.bincount(p_context["character_classes"], minlength=3)
+	return ratio(class_counts[punctuation_class], class_counts.sum() - class_counts[whitespace_class])
+
+@metric("non_ascii_rate", ["code_points"])
+def non_ascii_rate_metric(p_context):
+	return ratio(np.count_nonzero(p_context["code_points"] > 0x7F), len(p_context["code_points"]))
+
+@metric("oov_rate", ["type_counts", "in_dictionary"])
+def oov_rate_metric(p_context):
+
+	# Share of tokens not in the dictionary
+	counts = p_context["type_counts"][1]
+	return ratio(counts[~p_context["in_dictionary"]].sum(), counts.sum())
+
+
+# Classes
+
+class DQMetricsEngine:
+
+	# Constructor and private methods
+
+	def __init__(self, p_metrics=None, p_dictionary=None):
+
+		# 0. Save parameters (all registered metrics by default)
+		self.m_metrics = list(p_metrics) if None != p_metrics else list(metrics.keys())
+		self.m_dictionary = p_dictionary
+
+		# 1. Features the metrics need, in an order where each follows its requirements
+		self.m_features = []
+		for name in self.m_metrics:
+			if name not in metrics:
+				raise ValueError("Unknown metric '{0}' (known: {1})".format(name, ", ".join(metrics)))
+			for requirement in metrics[name][0]:
+				self.__require(requirement)
+		if "in_dictionary" in self.m_features and None == self.m_dictionary:
+			raise ValueError("A dictionary is needed for: {0}".format(", ".join(
+				name for name in self.m_metrics if "in_dictionary" in metrics[name][0])))
+
+	def __require(self, p_feature):
+
+		if p_feature in self.m_features:
+			return
+		for requirement in features[p_feature][0]:
+			self.__require(requirement)
+		self.m_features.append(p_feature)
+
+	# Properties
+
+	@property
+	def features(self):
+		return self.m_features
+
+	@property
+	def metrics(self):
+		return self.m_metrics
+
+	# Public methods
+
+	def measure(self, p_text):
+
+		# Metric name -> value for one component's text
+
+		# 1. Compute each needed feature once
+		context = { "text": p_text, "dictionary": self.m_dictionary }
+		for name in self.m_features:
+			context[name] = features[name][1](context)
+
+		# 2. Reduce the features to metrics (numpy numbers become Python numbers,
+		#    so rows can be encoded as JSON)
+		values = OrderedDict()
+		for name in self.m_metrics:
+			value = metrics[name][1](context)
+			values[name] = value.item() if isinstance(value, np.generic) else value
+
+		return values
+
+	def table(self, p_documents):
+
+		# Tidy rows (text, component, metric, value) for (document id, text) pairs,
+		# with ids of the form "<text>/<component>" (see component_documents)
+		rows = []
+		for document_id, text in p_documents:
+			text_name, component = document_id.split("/", 1) if "/" in document_id else ("", document_id)
+			for name, value in self.measure(text).items():
+				rows.append((text_name, component, name, value))
+
+		return rows
+
+	# Static methods
+
+	@staticmethod
+	def write_table(p_rows, p_file):
+		writer = csv.writer(p_file)
+		writer.writerow(table_fields)
+		writer.writerows(p_rows)
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define metric possibilities
+	parser.add_argument("inputs", nargs="+", help="Packed texts or metadata json files")
+	parser.add_argument("-m", "--metrics", nargs="+", choices=list(metrics.keys()), help="Metrics to compute (default: all)")
+	parser.add_argument("-d", "--dictionary", help="Word list for out-of-vocabulary rates")
+	parser.add_argument("-b", "--body", action="store_true", help="Only measure body components (chapters)")
+	parser.add_argument("-o", "--output", help="CSV file for the table (default: standard output)")
+
+	# 3. Parse arguments passed in through the terminal
+	arguments = parser.parse_args()
+
+	# 4. Metrics asked for by name that need a dictionary must have one
+	if None == arguments.dictionary and not os.path.isfile(default_dictionary):
+		dictionary_metrics = [name for name in arguments.metrics or [] if "in_dictionary" in metrics[name][0]]
+		if len(dictionary_metrics) > 0:
+			parser.error("a dictionary (-d) is needed for: {0}".format(", ".join(dictionary_metrics)))
+
+	return arguments
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	# 1. Out-of-vocabulary rates are only computed with a dictionary
+	dictionary_filepath = arguments.dictionary if arguments.dictionary else \
+		(default_dictionary if os.path.isfile(default_dictionary) else None)
+	dictionary = load_dictionary(dictionary_filepath) if None != dictionary_filepath else None
+	metric_names = arguments.metrics if arguments.metrics else \
+		[name for name in metrics if None != dictionary or "in_dictionary" not in metrics[name][0]]
+	engine = DQMetricsEngine(metric_names, dictionary)
+
+	# 2. Measure every component of every input
+	rows = []
+	for filepath in arguments.inputs:
+		rows.extend(engine.table((document_id, text) for document_id, text in component_documents(filepath)
+			if not arguments.body or "_BODY_" in document_id))
+
+	# 3. Write the table
+	if arguments.output:
+		with open(arguments.output, "w", newline="") as table_file:
+			DQMetricsEngine.write_table(rows, table_file)
+	else:
+		DQMetricsEngine.write_table(rows, sys.stdout)
+
+if "__main__" == __name__:
+	main()
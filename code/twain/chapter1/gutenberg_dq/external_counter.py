@@ -0,0 +1,309 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Exact counting of items (n-grams, attribute values) under a memory
+# 		   budget, spilling sorted partial counts to disk and merging them at
+# 		   the end, for corpora too large for in-memory Counter objects
+
+# Runs
+# Counts are kept in a dictionary until its estimated size passes the budget.
+# The dictionary is then written to a temporary "run" file, sorted by key, and
+# emptied. At the end the runs (and what is still in memory) are k-way merged
+# with heapq.merge, summing equal keys, so the final counts stream out in key
+# order without ever being held together. If there are more runs than can be
+# open at once, groups of runs are first merged into larger runs.
+#
+# Run file lines: key<TAB>count (keys are tokens or XML attribute values, which
+# have no newlines once parsed). N-gram keys (tuples of strings) are stored joined by "\x1f" and split again
+# when read. Results equal those of Counter (see the -v option).
+
+# Imports
+
+# Built-ins
+import argparse
+from collections import Counter
+import heapq
+from itertools import islice
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Custom
+from positional_index import component_documents, tokenize
+from text_sketches import ngrams
+
+
+# Globals
+
+# Default memory budget for counts held in memory (bytes)
+default_memory_budget = 512 * 1024 * 1024
+
+# Estimated bytes per dictionary entry besides its key (hash table slot and count)
+entry_overhead = 100
+
+# Most run files read at once when merging
+default_merge_fan_in = 64
+
+# Separator of n-gram tokens in stored keys
+ngram_separator = "\x1f"
+
+# Items tallied together by update (bounds the batch's own memory)
+update_batch_size = 65536
+
+# Size of run file read and write buffers, and run lines written at once
+run_buffer_size = 1024 * 1024
+run_block_size = 65536
+
+
+# Utility functions
+
+def key_size(p_key):
+
+	# Estimated bytes of a key held in memory
+	if isinstance(p_key, tuple):
+		return sys.getsizeof(p_key) + sum(sys.getsizeof(item) for item in p_key)
+	return sys.getsizeof(p_key)
+
+def encode_key(p_key):
+	return ngram_separator.join(p_key) if isinstance(p_key, tuple) else p_key
+
+def write_run(p_filepath, p_items):
+
+	# Writes (encoded key, count) pairs, already in key order, to a run file in
+	# blocks of lines (keys with newlines cannot be stored)
+	items = iter(p_items)
+	with open(p_filepath, "w", encoding="utf-8", newline="\n", buffering=run_buffer_size) as run_file:
+		while True:
+			block = list(islice(items, run_block_size))
+			if 0 == len(block):
+				break
+			lines = "".join(["{0}\t{1}\n".format(key, count) for key, count in block])
+			if len(block) != lines.count("\n"):
+				raise ValueError("Keys of an ExternalCounter cannot contain newlines")
+			run_file.write(lines)
+
+def read_run(p_filepath):
+
+	# Yields the (encoded key, count) pairs of a run file in order
+	with open(p_filepath, "r", encoding="utf-8", newline="\n", buffering=run_buffer_size) as run_file:
+		for line in run_file:
+			key, count = line.rsplit("\t", 1)
+			yield key, int(count)
+
+def merge_sorted(p_iterables):
+
+	# Merges (key, count) streams sorted by key, summing the counts of equal keys
+	current_key = None
+	current_count = 0
+	for key, count in heapq.merge(*p_iterables):
+		if key == current_key:
+			current_count += count
+			continue
+		if None != current_key:
+			yield current_key, current_count
+		current_key, current_count = key, count
+	if None != current_key:
+		yield current_key, current_count
+
+
+# Classes
+
+class ExternalCounter:
+
+	# Constructor and private methods
+
+	def __init__(self, p_memory_budget=default_memory_budget, p_temp_folder=None, p_ngrams=False,
+				 p_merge_fan_in=default_merge_fan_in):
+
+		# 0. Save parameters
+		self.m_memory_budget = p_memory_budget
+		self.m_temp_folder = p_temp_folder
+		self.m_ngrams = p_ngrams
+		self.m_merge_fan_in = p_merge_fan_in
+
+		# 1. Member field initialization
+
+		# Counts in memory, their estimated size, and the run files written so far
+		self.m_counts = Counter()
+		self.m_memory = 0
+		self.m_runs = []
+		self.m_run_folder = None
+		self.m_run_count = 0
+
+		# Total of all counts added
+		self.m_total = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, p_type, p_value, p_traceback):
+		self.close()
+
+	def __new_run_filepath(self):
+		if None == self.m_run_folder:
+			self.m_run_folder = tempfile.mkdtemp(prefix="counts_", dir=self.m_temp_folder)
+		self.m_run_count += 1
+		return os.path.join(self.m_run_folder, "run{0}.bin".format(self.m_run_count))
+
+	def __decode_key(self, p_key):
+		return tuple(p_key.split(ngram_separator)) if self.m_ngrams else p_key
+
+	def __merge_runs(self):
+
+		# Merges groups of runs until they can all be open at once
+		while len(self.m_runs) > self.m_merge_fan_in:
+			group = self.m_runs[0:self.m_merge_fan_in]
+			filepath = self.__new_run_filepath()
+			write_run(filepath, merge_sorted([read_run(run) for run in group]))
+			for run in group:
+				os.remove(run)
+			self.m_runs = self.m_runs[self.m_merge_fan_in:] + [filepath]
+
+	# Properties
+
+	@property
+	def memory(self):
+		return self.m_memory
+
+	@property
+	def runs(self):
+		return len(self.m_runs)
+
+	@property
+	def total(self):
+		return self.m_total
+
+	# Public methods
+
+	def add(self, p_key, p_count=1):
+
+		# 1. Count the key, spilling the counts to disk once over budget
+		if p_key in self.m_counts:
+			self.m_counts[p_key] += p_count
+		else:
+			self.m_counts[p_key] = p_count
+			self.m_memory += key_size(p_key) + entry_overhead
+			if self.m_memory > self.m_memory_budget:
+				self.spill()
+		self.m_total += p_count
+
+	def close(self):
+
+		# Removes the run files
+		if None != self.m_run_folder:
+			shutil.rmtree(self.m_run_folder, ignore_errors=True)
+		self.m_run_folder = None
+		self.m_runs = []
+		self.m_counts = Counter()
+		self.m_memory = 0
+
+	def counter(self):
+
+		# All counts as a Counter (only for results known to fit in memory)
+		return Counter(dict(self.items()))
+
+	def items(self):
+
+		# Yields (key, count) for every key in key order, merging all runs
+		self.__merge_runs()
+		memory_items = sorted((encode_key(key), count) for key, count in self.m_counts.items())
+		for key, count in merge_sorted([read_run(run) for run in self.m_runs] + [memory_items]):
+			yield self.__decode_key(key), count
+
+	def most_common(self, p_n):
+		return heapq.nlargest(p_n, self.items(), key=lambda item: item[1])
+
+	def spill(self):
+
+		# Writes the counts in memory to a new run file, sorted by key
+		if 0 == len(self.m_counts):
+			return
+		filepath = self.__new_run_filepath()
+		write_run(filepath, sorted((encode_key(key), count) for key, count in self.m_counts.items()))
+		self.m_runs.append(filepath)
+		self.m_counts = Counter()
+		self.m_memory = 0
+
+	def update(self, p_items):
+
+		# Counts every item of an iterable (items are tallied in small batches with
+		# Counter first, which is much faster than one add per item)
+		items = iter(p_items)
+		while True:
+			batch = Counter(islice(items, update_batch_size))
+			if 0 == len(batch):
+				break
+			self.update_counts(batch)
+
+	def update_counts(self, p_counts):
+
+		# Adds the counts of a mapping of keys to counts (the budget is checked
+		# after the whole mapping, so it can be passed by one batch)
+		new_keys = p_counts.keys() - self.m_counts.keys()
+		self.m_memory += sum(map(key_size, new_keys)) + entry_overhead * len(new_keys)
+		self.m_counts.update(p_counts)
+		self.m_total += sum(p_counts.values())
+		if self.m_memory > self.m_memory_budget:
+			self.spill()
+
+	def write(self, p_file, p_min_count=1):
+
+		# Streams "key<TAB>count" lines of the merged counts to a file
+		for key, count in self.items():
+			if count >= p_min_count:
+				p_file.write("{0}\t{1}\n".format(" ".join(key) if self.m_ngrams else key, count))
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define counting possibilities
+	parser.add_argument("inputs", nargs="+", help="Packed texts or metadata json files")
+	parser.add_argument("-n", "--n", type=int, default=3, help="n-gram length")
+	parser.add_argument("-m", "--memory", type=int, default=default_memory_budget // (1024 * 1024),
+		help="Memory budget for counts (MB)")
+	parser.add_argument("-k", "--top", type=int, default=25, help="Number of most frequent n-grams to show")
+	parser.add_argument("-o", "--output", help="File to write all counts to (tab-separated, in n-gram order)")
+	parser.add_argument("-t", "--temp", help="Folder for run files (default: the system's temporary folder)")
+	parser.add_argument("-v", "--verify", action="store_true", help="Check the counts against an in-memory Counter")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+	start_time = time.time()
+
+	with ExternalCounter(arguments.memory * 1024 * 1024, arguments.temp, True) as counter:
+
+		# 1. Count the n-grams of every component of every input
+		for filepath in arguments.inputs:
+			for document_id, text in component_documents(filepath):
+				counter.update(ngrams(tokenize(text)[0], arguments.n))
+
+		# 2. Show the most frequent, and optionally write all counts
+		print("{0}-grams: {1} total, {2} runs spilled".format(arguments.n, counter.total, counter.runs))
+		for item, count in counter.most_common(arguments.top):
+			print("{0}: {1}".format(" ".join(item), count))
+		if arguments.output:
+			with open(arguments.output, "w", encoding="utf-8") as output_file:
+				counter.write(output_file)
+		print("Counted in {0:.2f}s".format(time.time() - start_time))
+
+		# 3. Optionally compare with in-memory counting
+		if arguments.verify:
+			in_memory = Counter()
+			for filepath in arguments.inputs:
+				for document_id, text in component_documents(filepath):
+					in_memory.update(ngrams(tokenize(text)[0], arguments.n))
+			print("Matches Counter: {0}".format(in_memory == counter.counter()))
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,342 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Finds the header, front matter, body, footer and license boundaries of
+# 		   Project Gutenberg texts and writes key specs that GutenbergReader reads
+# 		   in place of hand-typed start and end lines
+
+# Boundaries
+# header:      first line of the file up to the "*** START OF ..." line
+# frontmatter: after the START line up to the line before the body
+# body:        first chapter heading up to the line before the footer
+# footer:      "End of the Project Gutenberg ..." or "*** END OF ..." line up to the license
+# license:     "*** START: FULL LICENSE ***" line to the end of the file
+#
+# All markers and chapter headings are found in one scan of the text with a
+# single compiled pattern. Tables of contents often repeat the chapter headings:
+# a run of two or more headings with no prose between them (at most a title or
+# page number line each, the run ending where numbering restarts) is taken for
+# a table of contents, and the body starts at the first heading outside such a
+# run, i.e. the first one followed by body text. This holds for multi-volume
+# texts whose chapter numbers restart in each volume. Generated
+# specs hold line indices ("startline_index", "endline_index") as well as the
+# start and end lines themselves.
+
+# Imports
+
+# Built-ins
+import argparse
+from collections import OrderedDict
+import json
+from multiprocessing import Pool
+import os
+import re
+
+
+# Globals
+
+# Markers and chapter headings, each matching a whole line
+boundary_pattern = re.compile(
+	r"^[ \t\ufeff]*(?:" +
+	r"(?P<start>(?i:\*{3}\s*START OF (?:THE|THIS) PROJECT GUTENBERG E-?(?:BOOK|TEXT))\s*(?P<title>[^*\n]*?)\s*\*{3})|" +
+	r"(?P<end>(?i:\*{3}\s*END OF (?:THE|THIS) PROJECT GUTENBERG|End of (?:the |this )?Project Gutenberg)[^\n]*)|" +
+	r"(?P<license>(?i:\*{3}\s*START: FULL LICENSE\s*\*{3}))|" +
+	r"(?P<chapter>(?P<chapter_word>CHAPTER|Chapter)[ \t]+(?P<chapter_number>[IVXLCDM]+|\d+|[A-Z]+(?:[ -][A-Z]+)*)\b\.?(?:[ \t]+[^\n]*)?)" +
+	r")[ \t]*$",
+	re.MULTILINE)
+
+# Most non-blank lines between two headings of a table of contents (e.g. a
+# chapter title and a page number)
+toc_gap_lines = 2
+
+# Output names of generated components
+gutenberg_output_names = {
+
+	"header": "GUTENBERG_HEADER",
+	"frontmatter": "{0}_FRONTMATTER",
+	"body": "{0}_BODY_",
+	"footer": "GUTENBERG_FOOTER",
+	"license": "GUTENBERG_LICENSE"
+}
+
+
+# Utility functions
+
+def spec_title(p_title, p_filepath):
+
+	# Component name prefix from the START line title (e.g. "HUCKLEBERRY FINN"
+	# becomes "HUCKLEBERRYFINN"), or from the file name if it has none
+	title = re.sub(r"[^A-Z0-9]", "", p_title.upper())
+	if 0 == len(title) or title.isdigit():
+		title = re.sub(r"[^A-Z0-9]", "", os.path.splitext(os.path.basename(p_filepath))[0].upper())
+
+	return title
+
+
+# Classes
+
+class GutenbergBoundaries:
+
+	# Constructor and private methods
+
+	def __init__(self, p_text, p_filepath=""):
+
+		# 0. Save parameters
+		self.m_filepath = p_filepath
+
+		# 1. Member field initialization
+
+		# Lines of the text (numbered as GutenbergReader numbers them)
+		self.m_lines = p_text.split("\n")
+
+		# Line index of each marker found, and title from the START line
+		self.m_start_index = None
+		self.m_end_index = None
+		self.m_license_index = None
+		self.m_title = ""
+
+		# Chapter headings as (line index, heading word, heading number)
+		self.m_chapters = []
+
+		# 2. Find all boundaries in one scan
+		self.__scan(p_text)
+
+	def __first_line(self, p_start, p_end):
+
+		# Index of the first non-blank line in [p_start, p_end), or None
+		for index in range(p_start, p_end):
+			if len(self.m_lines[index].strip().lstrip("\ufeff")) > 0:
+				return index
+		return None
+
+	def __count_lines(self, p_start, p_end):
+
+		# Number of non-blank lines in [p_start, p_end)
+		return sum(1 for index in range(p_start, p_end) if len(self.m_lines[index].strip()) > 0)
+
+	def __last_line(self, p_start, p_end):
+
+		# Index of the last non-blank line in [p_start, p_end), or None
+		for index in range(p_end - 1, p_start - 1, -1):
+			if len(self.m_lines[index].strip().lstrip("\ufeff")) > 0:
+				return index
+		return None
+
+	def __scan(self, p_text):
+
+		# Line numbers are counted incrementally between matches
+		line_index = 0
+		previous_offset = 0
+
+		for match in boundary_pattern.finditer(p_text):
+
+			# A. Line of this match
+			line_index += p_text.count("\n", previous_offset, match.start())
+			previous_offset = match.start()
+
+			# B. Keep the first of each marker (footers repeat the END line after
+			#    the "End of the Project Gutenberg ..." line)
+			if None != match.group("start"):
+				if None == self.m_start_index:
+					self.m_start_index = line_index
+					self.m_title = match.group("title")
+			elif None != match.group("end"):
+				if None == self.m_end_index:
+					self.m_end_index = line_index
+			elif None != match.group("license"):
+				if None == self.m_license_index:
+					self.m_license_index = line_index
+			elif None != self.m_start_index and None == self.m_end_index:
+				self.m_chapters.append((line_index,
+					match.group("chapter_word"),
+					match.group("chapter_number").upper()))
+
+	# Properties
+
+	@property
+	def chapters(self):
+		return self.m_chapters
+
+	@property
+	def title(self):
+		return spec_title(self.m_title, self.m_filepath)
+
+	# Public methods
+
+	def body_start(self):
+
+		# First chapter heading outside a table of contents (see toc_headings)
+		if 0 == len(self.m_chapters):
+			return None
+
+		toc_headings = self.toc_headings()
+		for index in range(len(self.m_chapters)):
+			if index not in toc_headings:
+				return self.m_chapters[index][0]
+
+		# (all headings dense, e.g. very short chapters: last occurrence of the first heading)
+		first_number = self.m_chapters[0][2]
+		return [chapter for chapter in self.m_chapters if first_number == chapter[2]][-1][0]
+
+	def toc_headings(self):
+
+		# Indices (in chapters) of headings in tables of contents: runs of two or
+		# more headings with at most toc_gap_lines non-blank lines between each
+		# and the next. A run ends at prose, and before a heading that restarts
+		# its numbering (the body's first heading may follow the contents closely)
+		toc_headings = set()
+		run = []
+		for index in range(len(self.m_chapters)):
+
+			# A. Restarted numbering begins a new run
+			if len(run) > 0 and self.m_chapters[index][2] == self.m_chapters[run[0]][2]:
+				toc_headings.update(run if len(run) > 1 else [])
+				run = []
+			run.append(index)
+
+			# B. Prose (or the end of the headings) after this heading ends the run
+			if index + 1 == len(self.m_chapters) or \
+			   self.__count_lines(self.m_chapters[index][0] + 1, self.m_chapters[index + 1][0]) > toc_gap_lines:
+				toc_headings.update(run if len(run) > 1 else [])
+				run = []
+
+		return toc_headings
+
+	def components(self):
+
+		# Line ranges (first and last line, inclusive) of each component found, in text order
+		components = OrderedDict()
+		line_count = len(self.m_lines)
+
+		# 1. Ends of the header and of the text proper
+		text_end = next(index for index in (self.m_end_index, self.m_license_index, line_count) if None != index)
+		body_start = self.body_start()
+
+		# 2. Header up to the START line
+		if None != self.m_start_index:
+			header_start = self.__first_line(0, self.m_start_index + 1)
+			components["header"] = (header_start, self.m_start_index)
+		text_start = self.m_start_index + 1 if None != self.m_start_index else 0
+
+		# 3. Front matter and body
+		if None != body_start:
+			frontmatter_start = self.__first_line(text_start, body_start)
+			if None != frontmatter_start:
+				components["frontmatter"] = (frontmatter_start, self.__last_line(text_start, body_start))
+		else:
+			body_start = self.__first_line(text_start, text_end)
+		if None != body_start:
+			components["body"] = (body_start, self.__last_line(body_start, text_end))
+
+		# 4. Footer and license
+		if None != self.m_end_index:
+			footer_end = self.m_license_index if None != self.m_license_index and \
+				self.m_license_index > self.m_end_index else line_count
+			components["footer"] = (self.m_end_index, self.__last_line(self.m_end_index, footer_end))
+		if None != self.m_license_index and (None == self.m_end_index or self.m_license_index > self.m_end_index):
+			components["license"] = (self.m_license_index, self.__last_line(self.m_license_index, line_count))
+
+		return components
+
+	def key_spec(self):
+
+		# Keys in the form of a metadata json file for GutenbergReader
+		spec = { "input": OrderedDict(), "output": OrderedDict(), "order": [] }
+		title = self.title
+
+		for key, (start_index, end_index) in self.components().items():
+
+			# A. Start and end lines (for reading by key) and their indices
+			spec["input"][key] = OrderedDict([
+
+				("startline", self.m_lines[start_index].strip().lstrip("\ufeff")),
+				("endline", self.m_lines[end_index].strip()),
+				("startline_index", start_index),
+				("endline_index", end_index)
+			])
+
+			# B. Bodies with chapter headings are divided into chapters
+			if "body" == key and None != self.body_start():
+				spec["input"][key]["subcomponents"] = "True"
+				spec["input"][key]["subcomponent_input_prefix"] = self.m_chapters[0][1]
+
+			spec["output"][key] = gutenberg_output_names[key].format(title)
+			spec["order"].append(key)
+
+		return spec
+
+
+# Batch detection
+
+def detect_file(p_arguments):
+
+	# Writes a metadata json file with generated keys for one text (run in a worker process)
+	text_filepath, output_folder, overwrite = p_arguments
+	output_folder = output_folder if None != output_folder else os.path.dirname(text_filepath) + os.sep
+	metadata_filepath = output_folder + os.path.splitext(os.path.basename(text_filepath))[0] + ".json"
+
+	# 1. Leave existing (e.g. hand-written) metadata files alone unless asked to replace them
+	if os.path.isfile(metadata_filepath) and not overwrite:
+		return text_filepath, None, "metadata file exists"
+
+	# 2. Detect boundaries
+	with open(text_filepath, "r", encoding="utf-8", errors="replace") as text_file:
+		boundaries = GutenbergBoundaries(text_file.read(), text_filepath)
+	spec = boundaries.key_spec()
+	if "body" not in spec["input"]:
+		return text_filepath, None, "no body found"
+
+	# 3. Write the metadata file (components are filled in by GutenbergReader)
+	with open(metadata_filepath, "w") as metadata_file:
+		json.dump({ "keys": spec, "components": {} }, metadata_file, indent=4)
+
+	return text_filepath, metadata_filepath, "{0} chapters".format(len(boundaries.chapters))
+
+def detect_files(p_text_filepaths, p_output_folder=None, p_overwrite=False, p_processes=None):
+
+	# Detects boundaries of many texts across a process pool, yielding
+	# (text filepath, metadata filepath or None, message) as each finishes
+	with Pool(p_processes) as pool:
+		for result in pool.imap_unordered(detect_file,
+			[(filepath, p_output_folder, p_overwrite) for filepath in p_text_filepaths], chunksize=16):
+			yield result
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define detection possibilities
+	parser.add_argument("inputs", nargs="+", help="Gutenberg text files or folders of them")
+	parser.add_argument("-o", "--output", help="Folder for metadata json files (default: next to each text)")
+	parser.add_argument("-f", "--overwrite", action="store_true", help="Replace existing metadata json files")
+	parser.add_argument("-p", "--processes", type=int, help="Number of worker processes")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+	output_folder = os.path.join(arguments.output, "") if arguments.output else None
+
+	# 1. Gather text files
+	text_filepaths = []
+	for path in arguments.inputs:
+		if os.path.isdir(path):
+			text_filepaths.extend(os.path.join(path, filename) for filename in sorted(os.listdir(path))
+				if filename.endswith(".txt"))
+		else:
+			text_filepaths.append(path)
+
+	# 2. Detect boundaries in parallel
+	for text_filepath, metadata_filepath, message in detect_files(text_filepaths, output_folder,
+		arguments.overwrite, arguments.processes):
+		print("{0}: {1}{2}".format(text_filepath, message,
+			" -> " + metadata_filepath if None != metadata_filepath else ""))
+
+if "__main__" == __name__:
+	main()
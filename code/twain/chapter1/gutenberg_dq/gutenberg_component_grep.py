@@ -32,6 +32,11 @@ from collections import OrderedDict
 import json
 import os
 import sys
+import tempfile
+
+# Custom
+from component_pack import ComponentPack
+from span_tree import HierarchicalSegmenter, default_heading_levels
 
 
 # Globals
@@ -138,12 +143,20 @@ class GutenbergReader:
 		for input_key in self.m_metadata_json["keys"]["order"]:
 
 			# A. Read this component and the line where reading stopped
-			self.m_components[input_key], line_index = \
-				GutenbergReader.read_component(
-					(self.m_metadata_json["keys"]["input"][input_key]["startline"],
-				 	 self.m_metadata_json["keys"]["input"][input_key]["endline"]),
-					self.m_text_lines,
-					line_index)
+			#    (generated keys give line indices, see gutenberg_boundaries.py)
+			if "startline_index" in self.m_metadata_json["keys"]["input"][input_key]:
+				self.m_components[input_key], line_index = \
+					GutenbergReader.read_component_lines(
+						(self.m_metadata_json["keys"]["input"][input_key]["startline_index"],
+						 self.m_metadata_json["keys"]["input"][input_key]["endline_index"]),
+						self.m_text_lines)
+			else:
+				self.m_components[input_key], line_index = \
+					GutenbergReader.read_component(
+						(self.m_metadata_json["keys"]["input"][input_key]["startline"],
+					 	 self.m_metadata_json["keys"]["input"][input_key]["endline"]),
+						self.m_text_lines,
+						line_index)
 
 			# B. Check to see if this component needs to be divided into subcomponents
 			if "subcomponents" in self.m_metadata_json["keys"]["input"][input_key]:
@@ -152,21 +165,19 @@ class GutenbergReader:
 				input_prefix = self.m_metadata_json["keys"]["input"][input_key]["subcomponent_input_prefix"]
 				output_prefix = self.m_metadata_json["keys"]["output"][input_key]
 
-				# II. Determine line indices where input prefix exists
-				subcomp_indices = [[index] for index in range(len(self.m_components[input_key])) if input_prefix in self.m_components[input_key][index]]
-				for item_index in range(len(subcomp_indices)):
-					if item_index + 1 < len(subcomp_indices):
-						subcomp_indices[item_index].append(subcomp_indices[item_index + 1][0] - 1)
-					else:
-						subcomp_indices[item_index].append(len(self.m_components[input_key]) - 1)
-
-				# III. Split apart component into subcomponents
+				# II. Split apart component into subcomponents in one pass over its lines
+				#     (each subcomponent runs from the line after its prefixed line
+				#      up to the next prefixed line)
 				subcomponents = OrderedDict()
-				for item in subcomp_indices:
-					subcomponents[output_prefix + self.m_components[input_key][item[0]]] = \
-						self.m_components[input_key][item[0] + 1:item[1] + 1]
-
-				# IV. Replace full text component with dictionary subcomponents
+				subcomponent_lines = None
+				for line in self.m_components[input_key]:
+					if input_prefix in line:
+						subcomponent_lines = []
+						subcomponents[output_prefix + line] = subcomponent_lines
+					elif None != subcomponent_lines:
+						subcomponent_lines.append(line)
+
+				# III. Replace full text component with dictionary subcomponents
 				self.m_components[input_key] = subcomponents
 
 	def output(self, p_metadata_filepath):
@@ -175,6 +186,22 @@ class GutenbergReader:
 		with open(p_metadata_filepath, "w") as output_file:
 			json.dump(self.m_metadata_json, output_file, indent=4)
 
+	def span_tree(self, p_input_key=None, p_heading_levels=default_heading_levels):
+
+		# 1. Segment the whole text, or one (undivided) component of it, into a tree
+		#    of heading, paragraph and sentence spans
+		if None == p_input_key:
+			text = "".join(self.m_text_lines)
+		else:
+			text = "\n".join(self.m_components[p_input_key])
+
+		return HierarchicalSegmenter(p_heading_levels).segment(text)
+
+	def output_packed(self, p_pack_filepath):
+
+		# 1. Write out the components (subcomponents flattened) to a packed file
+		ComponentPack.write(p_pack_filepath, self.m_components, os.path.basename(self.m_text_filepath))
+
 
 	# Static methods
 
@@ -223,10 +250,264 @@ class GutenbergReader:
 		#	 and return the line where reading ended
 		return component_lines, line_stop_index
 
+	@staticmethod
+	def read_component_lines(p_line_indices, p_text_lines):
+
+		# 1. Gather text lines between start and end line indices, inclusive,
+		#    and return the line after the component
+		start_index, end_index = p_line_indices
+		return [line.strip() for line in p_text_lines[start_index:end_index + 1]], end_index + 1
+
+
+class ComponentStreamWriter:
+
+	# Writes components to a metadata json (or json lines) file one at a time,
+	# so no more than one component is held in memory. Output goes to a
+	# temporary file that replaces the output file once writing is complete.
+
+	# json:  { <metadata keys>..., "components": { key: lines, group key: { key: lines } } }
+	# jsonl: metadata on the first line, then { "key", "lines" } per component,
+	#        { "group" } per divided component and { "group", "key", "lines" } per subcomponent
+
+	formats = ["json", "jsonl"]
+
+	# Constructor and private methods
+
+	def __init__(self, p_filepath, p_format="json", p_metadata=None):
+
+		# 0. Save parameters
+		self.m_filepath = p_filepath
+		self.m_format = p_format
+		self.m_metadata = p_metadata if None != p_metadata else {}
+
+		# 1. Member field initialization
+
+		# Temporary output file
+		self.m_file = None
+		self.m_temp_filepath = None
+
+		# Group (divided component) being written, and whether each open json
+		# object has had an entry written to it yet
+		self.m_group = None
+		self.m_object_started = []
+
+	def __enter__(self):
+		return self.open()
+
+	def __exit__(self, p_type, p_value, p_traceback):
+
+		# Only complete output replaces the output file
+		if None == p_type:
+			self.close()
+		else:
+			self.discard()
+
+	def __write_entry(self, p_key, p_json):
+
+		# Entry of the innermost open json object
+		self.m_file.write("{0}\n{1}: {2}".format("," if self.m_object_started[-1] else "",
+			json.dumps(p_key), p_json))
+		self.m_object_started[-1] = True
+
+	def __write_record(self, p_record):
+		self.m_file.write(json.dumps(p_record) + "\n")
+
+	# Public methods
+
+	def begin_group(self, p_key):
+
+		# 1. Subsequent components are subcomponents of this one
+		self.m_group = p_key
+		if "json" == self.m_format:
+			self.__write_entry(p_key, "{")
+			self.m_object_started.append(False)
+		else:
+			self.__write_record({ "group": p_key })
+
+	def close(self):
+
+		# 1. Close the components and metadata objects
+		if "json" == self.m_format:
+			self.m_file.write("\n}\n}\n")
+		self.m_file.close()
+
+		# 2. Replace the output file
+		os.replace(self.m_temp_filepath, self.m_filepath)
+
+	def discard(self):
+		self.m_file.close()
+		os.remove(self.m_temp_filepath)
+
+	def end_group(self):
+		if "json" == self.m_format:
+			self.m_file.write("\n}")
+			self.m_object_started.pop()
+		self.m_group = None
+
+	def open(self):
+
+		# 1. Temporary file beside the output file
+		temp_handle, self.m_temp_filepath = tempfile.mkstemp(
+			dir=os.path.dirname(os.path.abspath(self.m_filepath)), suffix=".tmp")
+		self.m_file = os.fdopen(temp_handle, "w")
+
+		# 2. Metadata (everything but the components) comes first
+		metadata = OrderedDict((key, value) for key, value in self.m_metadata.items() if "components" != key)
+		if "json" == self.m_format:
+			self.m_file.write("{")
+			self.m_object_started.append(False)
+			for key, value in metadata.items():
+				self.__write_entry(key, json.dumps(value))
+			self.__write_entry("components", "{")
+			self.m_object_started.append(False)
+		else:
+			self.__write_record(metadata)
+
+		return self
+
+	def write(self, p_key, p_lines):
+
+		# 1. Write one component (or subcomponent of the current group)
+		if "json" == self.m_format:
+			self.__write_entry(p_key, json.dumps(p_lines))
+		elif None == self.m_group:
+			self.__write_record({ "key": p_key, "lines": p_lines })
+		else:
+			self.__write_record({ "group": self.m_group, "key": p_key, "lines": p_lines })
+
+	# Static methods
+
+	@staticmethod
+	def load_components(p_filepath):
+
+		# Components written in either format, as GutenbergReader holds them
+		if not p_filepath.endswith(".jsonl"):
+			with open(p_filepath, "r") as json_file:
+				return json.load(json_file, object_pairs_hook=OrderedDict)["components"]
+
+		components = OrderedDict()
+		with open(p_filepath, "r") as jsonl_file:
+			next(jsonl_file)
+			for line in jsonl_file:
+				record = json.loads(line)
+				if "lines" not in record:
+					components[record["group"]] = OrderedDict()
+				elif "group" in record:
+					components[record["group"]][record["key"]] = record["lines"]
+				else:
+					components[record["key"]] = record["lines"]
+
+		return components
+
+
+class GutenbergStreamReader:
+
+	# Reads the same components as GutenbergReader, but passes each one to a
+	# writer as soon as its last line is read and keeps no other lines of the
+	# text, so memory is bounded by the largest single (sub)component
+
+	# Constructor and private methods
+
+	def __init__(self, p_text_filepath, p_metadata_filepath):
+
+		# 0. Save parameters
+		self.m_text_filepath = p_text_filepath
+		self.m_metadata_filepath = p_metadata_filepath
+
+		# 1. Member field initialization
+
+		# Index of the next line to be read from the text file
+		self.m_next_line = 0
+
+		# 2. Read the metadata keys (components from earlier readings are dropped)
+		with open(p_metadata_filepath, "r") as metadata_file:
+			self.m_metadata_json = json.load(metadata_file, object_pairs_hook=OrderedDict)
+		self.m_metadata_json.pop("components", None)
+
+	def __component_lines(self, p_key_spec, p_lines):
+
+		# Stripped lines of one component, read with the same rules as
+		# GutenbergReader.read_component(_lines)
+
+		# A. Components given by line indices
+		if "startline_index" in p_key_spec:
+			start_index, end_index = p_key_spec["startline_index"], p_key_spec["endline_index"]
+			if start_index < self.m_next_line:
+				raise ValueError("Components must be in line order to be streamed: {0}".format(p_key_spec["startline"]))
+			for index, line in p_lines:
+				if index >= start_index:
+					yield line.strip()
+				if index >= end_index:
+					return
+			return
+
+		# B. Components given by start and end keys (inclusive)
+		start_key_found = False
+		for index, line in p_lines:
+			cleaned_line = line.strip()
+			if not start_key_found:
+				if p_key_spec["startline"] in cleaned_line:
+					start_key_found = True
+					yield cleaned_line
+			else:
+				yield cleaned_line
+				if p_key_spec["endline"] in cleaned_line:
+					return
+
+	def __numbered_lines(self, p_text_file):
+		for line in p_text_file:
+			self.m_next_line += 1
+			yield self.m_next_line - 1, line
+
+	# Public methods
+
+	def output(self, p_output_filepath, p_format="json"):
+
+		# 1. Stream components into a metadata json (or json lines) file
+		with ComponentStreamWriter(p_output_filepath, p_format, self.m_metadata_json) as writer:
+			self.stream(writer)
+
+	def stream(self, p_writer):
+
+		self.m_next_line = 0
+		with open(self.m_text_filepath, "r") as text_file:
+
+			lines = self.__numbered_lines(text_file)
+
+			# 1. Go through component keys, reading components specified by them in order
+			for input_key in self.m_metadata_json["keys"]["order"]:
+
+				key_spec = self.m_metadata_json["keys"]["input"][input_key]
+				component_lines = self.__component_lines(key_spec, lines)
+
+				# A. Undivided components are written once their end line is read
+				if "subcomponents" not in key_spec:
+					p_writer.write(input_key, list(component_lines))
+					continue
+
+				# B. Divided components are written a subcomponent at a time, each
+				#    running from the line after its prefixed line up to the next
+				input_prefix = key_spec["subcomponent_input_prefix"]
+				output_prefix = self.m_metadata_json["keys"]["output"][input_key]
+				p_writer.begin_group(input_key)
+				subcomponent_key = None
+				subcomponent_lines = None
+				for line in component_lines:
+					if input_prefix in line:
+						if None != subcomponent_key:
+							p_writer.write(subcomponent_key, subcomponent_lines)
+						subcomponent_key = output_prefix + line
+						subcomponent_lines = []
+					elif None != subcomponent_lines:
+						subcomponent_lines.append(line)
+				if None != subcomponent_key:
+					p_writer.write(subcomponent_key, subcomponent_lines)
+				p_writer.end_group()
+
 
 # Main script		
 
-def main(p_txt_filename):
+def main(p_txt_filename, p_stream_format=None):
 
 	# 0. Text file path and metadata json file path inferred form text filename
 	text_filepath = paths["input"] + p_txt_filename
@@ -238,6 +519,13 @@ def main(p_txt_filename):
 		print("Invalid filename input: {0}".format(p_txt_filename))
 		return
 
+	# 1. Stream components straight into the metadata file (or a json lines file beside it)
+	if None != p_stream_format:
+		output_filepath = metadata_filepath if "json" == p_stream_format else \
+			os.path.splitext(metadata_filepath)[0] + ".jsonl"
+		GutenbergStreamReader(text_filepath, metadata_filepath).output(output_filepath, p_stream_format)
+		return
+
 	# 1. Read file components into ordered dictionary
 	reader = GutenbergReader(text_filepath, metadata_filepath)
 
@@ -250,4 +538,5 @@ def main(p_txt_filename):
 		
 if "__main__" == __name__:
 	if len(sys.argv) > 1:
-		main(sys.argv[1] if len(sys.argv) > 1 else "")
+		main(sys.argv[1] if len(sys.argv) > 1 else "",
+			 sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] in ComponentStreamWriter.formats else None)
@@ -5,13 +5,17 @@
 
 import os
 
+# Custom
+from component_pack import ComponentPack, component_filename, component_text
+
+
 # Classes
 
 # Project Gutenberg text base class
 class ProjectGutenbergText(object):
 	
 	# Constructor and Private Methods
-	def __init__(self, p_filepath, p_file_components, p_component_reading_method):
+	def __init__(self, p_filepath, p_file_components, p_component_reading_method, p_read_raw_text=True):
 
 		# 0. Class field initialization
 		self.m_components = p_file_components
@@ -23,7 +27,9 @@ class ProjectGutenbergText(object):
 		self.__read_components = p_component_reading_method
 
 		# 1. Read in the file in raw, plain text
-		self.__read_raw_text()
+		#    (child classes that stream their components can skip this)
+		if p_read_raw_text:
+			self.__read_raw_text()
 
 		# 2. Store file data (header, body, footer, etc.)
 		self.__read_components()
@@ -39,8 +45,6 @@ class ProjectGutenbergText(object):
 
 	def output(self, p_output_folder):
 
-		illegal_filename_chars = ": .,"
-
 		# 1. Make a folder in the given output folder based on the filename
 		full_folder = p_output_folder + os.path.splitext(self.m_text_filename)[0] + os.sep
 		if not os.path.isdir(full_folder):
@@ -48,14 +52,13 @@ class ProjectGutenbergText(object):
 
 		# 2. Output each component as its own file into the given output folder
 		for key in self.m_components:
+			with open(full_folder + component_filename(key) + ".txt", "w") as component_file:
+				component_file.write(component_text(self.m_components[key]))
+
+	def output_packed(self, p_output_folder):
 
-			# A. Transform key into filename
-			filename = key
-			for ch in illegal_filename_chars:
-				if ch in filename:
-					filename = filename.replace(ch, "_")
+		# 1. Write all components into one packed file named after the text file
+		pack_filepath = p_output_folder + os.path.splitext(self.m_text_filename)[0] + ComponentPack.extension
+		ComponentPack.write(pack_filepath, self.m_components, self.m_text_filename)
 
-			# B. Write out component as text file
-			with open(full_folder + filename + ".txt", "w") as component_file:
-				component_file.write("\n".join(self.m_components[key]))
-			
\ No newline at end of file
+		return pack_filepath
@@ -0,0 +1,376 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Finds near-duplicate text components (reprinted sections across MTPO
+# 		   volumes, duplicate letters, chapters that barely changed between
+# 		   editions) with shingling, MinHash signatures and LSH banding, then
+# 		   verifies candidate pairs with exact Jaccard similarity
+
+# Method
+# 1. Shingles: each run of k consecutive tokens, hashed to 64 bits (tokens are
+#    hashed with BLAKE2 and combined polynomially, so hashes are the same in every
+#    process and on every day)
+# 2. MinHash: the minimum of each of n multiply-shift hash functions over a
+#    component's shingles; two signatures agree at a position with probability
+#    equal to the components' Jaccard similarity
+# 3. LSH: signatures are cut into b bands of r rows. Components sharing any whole
+#    band are candidates, found by sorting band values (no pairwise comparison).
+#    The threshold where a pair becomes likely to be a candidate is about (1 / b) ** (1 / r).
+# 4. Candidates are kept if the exact Jaccard similarity of their shingle sets
+#    reaches the threshold.
+#
+# Store folder layout
+# manifest.json   parameters, and per component: id, content hash, shingle offset and count
+# signatures.npy  MinHash signatures (one row per component, in manifest order)
+# shingles.bin    sorted distinct shingle hashes of each component (uint64), appended
+#
+# A component added again with different text is re-signed and its new shingles
+# are appended; its old shingles stay in shingles.bin until the store is rebuilt.
+
+# Imports
+
+# Built-ins
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+
+# Third party
+import numpy as np
+
+# Custom
+from positional_index import component_documents, tokenize
+
+
+# Globals
+
+# Default parameters
+default_shingle_size = 5
+default_permutations = 128
+default_threshold = 0.5
+default_seed = 1
+
+# Multiplier combining token hashes into shingle hashes (a large odd 64-bit number)
+shingle_multiplier = np.uint64(0x9E3779B97F4A7C15)
+
+# Shingles hashed at once when signing (bounds the permutations x shingles matrix)
+signing_block_size = 8192
+
+
+# Utility functions
+
+def token_hash(p_token):
+	return struct.unpack("<Q", hashlib.blake2b(p_token.encode("utf-8"), digest_size=8).digest())[0]
+
+def shingle_hashes(p_tokens, p_shingle_size=default_shingle_size, p_token_hashes=None):
+
+	# Sorted distinct 64-bit hashes of every run of p_shingle_size tokens (a
+	# component shorter than one shingle is one shingle of all its tokens)
+	token_hashes = p_token_hashes if None != p_token_hashes else {}
+	hashes = np.array([token_hashes[token] if token in token_hashes else
+		token_hashes.setdefault(token, token_hash(token)) for token in p_tokens], dtype=np.uint64)
+	if 0 == len(hashes):
+		return hashes
+	shingle_size = min(p_shingle_size, len(hashes))
+
+	# Polynomial combination of each window of token hashes (wrapping at 64 bits)
+	shingles = np.zeros(len(hashes) - shingle_size + 1, dtype=np.uint64)
+	with np.errstate(over="ignore"):
+		for offset in range(shingle_size):
+			shingles = shingles * shingle_multiplier + hashes[offset:offset + len(shingles)]
+
+	return np.unique(shingles)
+
+def jaccard(p_shingles1, p_shingles2):
+
+	# Exact Jaccard similarity of two sorted distinct shingle hash arrays
+	intersection = len(np.intersect1d(p_shingles1, p_shingles2, assume_unique=True))
+	union = len(p_shingles1) + len(p_shingles2) - intersection
+
+	return intersection / float(union) if union > 0 else 0.0
+
+def band_parameters(p_permutations, p_threshold):
+
+	# Bands and rows per band (bands x rows = permutations) whose candidate
+	# threshold (1 / bands) ** (1 / rows) is closest to the requested threshold
+	options = [(p_permutations // rows, rows) for rows in range(1, p_permutations + 1) if 0 == p_permutations % rows]
+
+	return min(options, key=lambda option: abs((1.0 / option[0]) ** (1.0 / option[1]) - p_threshold))
+
+def text_hash(p_text):
+	return hashlib.blake2b(p_text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Classes
+
+class MinHasher:
+
+	# Multiply-shift hash functions h(x) = (a * x + b) mod 2 ** 64 >> 32 (a odd),
+	# drawn from a seeded generator so signatures are comparable across runs
+
+	def __init__(self, p_permutations=default_permutations, p_seed=default_seed):
+
+		generator = np.random.RandomState(p_seed)
+		high, low = generator.randint(0, 2 ** 32, size=(2, p_permutations), dtype=np.uint64)
+		self.m_multipliers = ((high << np.uint64(32)) | low | np.uint64(1))[:, np.newaxis]
+		high, low = generator.randint(0, 2 ** 32, size=(2, p_permutations), dtype=np.uint64)
+		self.m_increments = ((high << np.uint64(32)) | low)[:, np.newaxis]
+
+	@property
+	def permutations(self):
+		return len(self.m_multipliers)
+
+	def signature(self, p_shingles):
+
+		# Minimum hash value of the shingles under each function (all ones if empty)
+		signature = np.full(len(self.m_multipliers), np.iinfo(np.uint32).max, dtype=np.uint32)
+		with np.errstate(over="ignore"):
+			for start in range(0, len(p_shingles), signing_block_size):
+				block = p_shingles[np.newaxis, start:start + signing_block_size]
+				values = ((self.m_multipliers * block + self.m_increments) >> np.uint64(32)).astype(np.uint32)
+				np.minimum(signature, values.min(axis=1), out=signature)
+
+		return signature
+
+
+class NearDuplicateIndex:
+
+	# Constructor and private methods
+
+	def __init__(self, p_folder, p_shingle_size=default_shingle_size, p_permutations=default_permutations,
+				 p_seed=default_seed):
+
+		# 0. Save parameters
+		self.m_folder = p_folder if p_folder.endswith(os.sep) else p_folder + os.sep
+
+		# 1. Member field initialization
+
+		# Parameters, component entries ([id, content hash, shingle offset, shingle count])
+		# in signature row order and the row of each component id
+		self.m_parameters = { "shingle_size": p_shingle_size, "permutations": p_permutations, "seed": p_seed }
+		self.m_entries = []
+		self.m_rows = {}
+		self.m_signatures = np.zeros((0, p_permutations), dtype=np.uint32)
+		self.m_shingles = None
+
+		# 2. Load an existing store (its parameters must match)
+		if os.path.isfile(self.m_folder + "manifest.json"):
+			with open(self.m_folder + "manifest.json", "r") as manifest_file:
+				manifest = json.load(manifest_file)
+			if manifest["parameters"] != self.m_parameters:
+				raise ValueError("Store {0} was built with {1}, not {2}".format(
+					p_folder, manifest["parameters"], self.m_parameters))
+			self.m_entries = manifest["components"]
+			self.m_signatures = np.load(self.m_folder + "signatures.npy")
+		elif not os.path.isdir(self.m_folder):
+			os.makedirs(self.m_folder)
+		self.m_rows = { entry[0]: row for row, entry in enumerate(self.m_entries) }
+
+		# 3. Hash functions and token hashes (cached across components)
+		self.m_minhasher = MinHasher(p_permutations, p_seed)
+		self.m_token_hashes = {}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, p_type, p_value, p_traceback):
+		self.close()
+
+	def __len__(self):
+		return len(self.m_entries)
+
+	def __shingles(self, p_row):
+
+		# Shingle hashes of a component, read from the memory-mapped shingle file
+		# (an empty file, e.g. only too-short components so far, cannot be mapped)
+		if self.m_shingles is None:
+			shingles_filepath = self.m_folder + "shingles.bin"
+			if os.path.isfile(shingles_filepath) and os.path.getsize(shingles_filepath) > 0:
+				self.m_shingles = np.memmap(shingles_filepath, dtype=np.uint64, mode="r")
+			else:
+				self.m_shingles = np.zeros(0, np.uint64)
+		offset, count = self.m_entries[p_row][2], self.m_entries[p_row][3]
+
+		return self.m_shingles[offset:offset + count]
+
+	# Properties
+
+	@property
+	def ids(self):
+		return [entry[0] for entry in self.m_entries]
+
+	@property
+	def parameters(self):
+		return self.m_parameters
+
+	# Public methods
+
+	def add_documents(self, p_documents):
+
+		# Signs (document id, text) pairs, skipping components whose text is unchanged;
+		# returns the number of components signed
+		shingles_filepath = self.m_folder + "shingles.bin"
+		offset = os.path.getsize(shingles_filepath) // 8 if os.path.isfile(shingles_filepath) else 0
+		signed_count = 0
+		new_signatures = []
+		self.m_shingles = None
+
+		# 1. Shingle and sign each new or changed component, appending its shingles
+		with open(shingles_filepath, "ab") as shingles_file:
+			for document_id, text in p_documents:
+
+				content_hash = text_hash(text)
+				row = self.m_rows.get(document_id)
+				if None != row and content_hash == self.m_entries[row][1]:
+					continue
+
+				shingles = shingle_hashes(tokenize(text)[0], self.m_parameters["shingle_size"], self.m_token_hashes)
+				shingles_file.write(shingles.tobytes())
+				entry = [document_id, content_hash, offset, len(shingles)]
+				signature = self.m_minhasher.signature(shingles)
+				offset += len(shingles)
+				signed_count += 1
+
+				# A. New components get the next row, changed ones keep theirs
+				if None == row:
+					self.m_rows[document_id] = len(self.m_entries)
+					self.m_entries.append(entry)
+					new_signatures.append(signature)
+				else:
+					self.m_entries[row] = entry
+					if row < len(self.m_signatures):
+						self.m_signatures[row] = signature
+					else:
+						new_signatures[row - len(self.m_signatures)] = signature
+
+		# 2. Store the signatures of new components
+		if len(new_signatures) > 0:
+			self.m_signatures = np.vstack([self.m_signatures, np.array(new_signatures, dtype=np.uint32)])
+		self.save()
+
+		return signed_count
+
+	def candidates(self, p_threshold=default_threshold, p_across_texts=False):
+
+		# Pairs of rows sharing at least one band of their signatures
+		bands, rows = band_parameters(self.m_parameters["permutations"], p_threshold)
+		signed = np.array([row for row, entry in enumerate(self.m_entries) if entry[3] > 0], dtype=np.int64)
+		texts = [entry[0].split("/", 1)[0] for entry in self.m_entries]
+		pairs = set()
+
+		for band in range(bands):
+
+			# 1. Group components by a hash of the band's values (one sort per band;
+			#    hash collisions only add candidates, which are verified)
+			values = self.m_signatures[signed, band * rows:(band + 1) * rows].astype(np.uint64)
+			keys = np.zeros(len(signed), dtype=np.uint64)
+			with np.errstate(over="ignore"):
+				for column in range(rows):
+					keys = keys * shingle_multiplier + values[:, column]
+			order = np.argsort(keys, kind="stable")
+			sorted_keys = keys[order]
+			boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+
+			# 2. Every pair within a bucket of more than one component is a candidate
+			for bucket in np.split(order, boundaries):
+				if len(bucket) < 2:
+					continue
+				members = signed[bucket].tolist()
+				for index, row1 in enumerate(members):
+					for row2 in members[index + 1:]:
+						if p_across_texts and texts[row1] == texts[row2]:
+							continue
+						pairs.add((row1, row2) if row1 < row2 else (row2, row1))
+
+		return pairs
+
+	def close(self):
+		self.m_shingles = None
+
+	def estimate(self, p_id1, p_id2):
+
+		# Jaccard similarity estimated from the signatures
+		return float(np.mean(self.m_signatures[self.m_rows[p_id1]] == self.m_signatures[self.m_rows[p_id2]]))
+
+	def near_duplicates(self, p_threshold=default_threshold, p_across_texts=False):
+
+		# (id, id, exact Jaccard similarity) of candidate pairs at or above the
+		# threshold, most similar first
+		results = []
+		for row1, row2 in self.candidates(p_threshold, p_across_texts):
+			similarity = jaccard(self.__shingles(row1), self.__shingles(row2))
+			if similarity >= p_threshold:
+				results.append((self.m_entries[row1][0], self.m_entries[row2][0], similarity))
+
+		return sorted(results, key=lambda result: (-result[2], result[0], result[1]))
+
+	def save(self):
+
+		# 1. Write signatures and manifest to temporary files, then replace the old ones
+		np.save(self.m_folder + "signatures.tmp.npy", self.m_signatures)
+		with open(self.m_folder + "manifest.tmp", "w") as manifest_file:
+			json.dump({ "parameters": self.m_parameters, "components": self.m_entries }, manifest_file)
+		os.replace(self.m_folder + "signatures.tmp.npy", self.m_folder + "signatures.npy")
+		os.replace(self.m_folder + "manifest.tmp", self.m_folder + "manifest.json")
+
+	def similarity(self, p_id1, p_id2):
+		return jaccard(self.__shingles(self.m_rows[p_id1]), self.__shingles(self.m_rows[p_id2]))
+
+
+# Main script
+
+def text_documents(p_filepath):
+
+	# Components of packed texts and metadata json files, or a plain text file as one component
+	if p_filepath.endswith(".txt"):
+		with open(p_filepath, "r", encoding="utf-8", errors="replace") as text_file:
+			yield os.path.splitext(os.path.basename(p_filepath))[0], text_file.read()
+	else:
+		for document in component_documents(p_filepath):
+			yield document
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define near-duplicate detection possibilities
+	parser.add_argument("store", help="Signature store folder")
+	parser.add_argument("command", choices=["add", "find", "compare"], help="Store operation")
+	parser.add_argument("inputs", nargs="*", help="Packed texts, metadata json or text files to add, or two ids to compare")
+	parser.add_argument("-k", "--shingle-size", type=int, default=default_shingle_size, help="Tokens per shingle")
+	parser.add_argument("-n", "--permutations", type=int, default=default_permutations, help="MinHash signature length")
+	parser.add_argument("-t", "--threshold", type=float, default=default_threshold, help="Least Jaccard similarity")
+	parser.add_argument("-x", "--across", action="store_true", help="Only pairs of components from different texts")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	with NearDuplicateIndex(arguments.store, arguments.shingle_size, arguments.permutations) as index:
+
+		# 1. Sign the components of each input
+		if "add" == arguments.command:
+			for filepath in arguments.inputs:
+				print("{0}: {1} components signed".format(filepath, index.add_documents(text_documents(filepath))))
+
+		# 2. Near-duplicate pairs across the store
+		elif "find" == arguments.command:
+			start_time = time.time()
+			results = index.near_duplicates(arguments.threshold, arguments.across)
+			for id1, id2, similarity in results:
+				print("{0:.3f} {1} | {2}".format(similarity, id1, id2))
+			print("{0} pairs among {1} components in {2:.2f}s".format(len(results), len(index), time.time() - start_time))
+
+		# 3. Estimated and exact similarity of two components
+		else:
+			print("Estimated: {0:.3f}, exact: {1:.3f}".format(index.estimate(arguments.inputs[0], arguments.inputs[1]),
+				index.similarity(arguments.inputs[0], arguments.inputs[1])))
+
+if "__main__" == __name__:
+	main()
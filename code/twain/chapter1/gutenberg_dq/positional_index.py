@@ -0,0 +1,484 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Persistent positional inverted index over text components (Project
+# 		   Gutenberg editions, MTPO volumes) for word and phrase lookups with
+# 		   keyword-in-context (KWIC) retrieval
+
+# Index folder layout
+# manifest.json          segment names and where each document currently lives
+# <segment>/terms.json   term -> [offset, length, document frequency] in postings.bin
+# <segment>/postings.bin per term: varint document count, then per document the
+#                        document number delta, position count and position deltas
+# <segment>/docs.json    document ids and [offset, length] of each document's
+#                        token offsets (offsets.bin) and compressed text (texts.bin)
+#
+# Each call to add_documents writes one new segment, so adding an edition or
+# volume never rewrites what is already indexed. A document added again under
+# the same id replaces its older copy.
+
+# Imports
+
+# Built-ins
+import argparse
+from collections import OrderedDict
+import json
+import mmap
+import os
+import re
+import time
+import zlib
+
+# Custom
+from component_pack import ComponentPack, component_text, flatten_components
+
+
+# Globals
+
+# Words (with inner apostrophes) are the indexed tokens
+token_pattern = re.compile(r"\w+(?:['’]\w+)*")
+
+
+# Utility functions
+
+def tokenize(p_text):
+
+	# Lowercased tokens (with curly apostrophes made straight) and the character offset of each
+	tokens = []
+	offsets = []
+	for match in token_pattern.finditer(p_text):
+		tokens.append(match.group().lower().replace("’", "'"))
+		offsets.append(match.start())
+
+	return tokens, offsets
+
+def encode_varints(p_numbers, p_output):
+
+	# Appends non-negative integers as 7-bit variable length bytes
+	for number in p_numbers:
+		while number >= 0x80:
+			p_output.append((number & 0x7F) | 0x80)
+			number >>= 7
+		p_output.append(number)
+
+def decode_varints(p_buffer, p_start, p_end):
+
+	# Yields the integers encoded between two buffer positions
+	number = 0
+	shift = 0
+	for index in range(p_start, p_end):
+		byte = p_buffer[index]
+		number |= (byte & 0x7F) << shift
+		if byte & 0x80:
+			shift += 7
+		else:
+			yield number
+			number = 0
+			shift = 0
+
+def delta_decode(p_numbers):
+	total = 0
+	for number in p_numbers:
+		total += number
+		yield total
+
+def delta_encode(p_numbers):
+	previous = 0
+	for number in p_numbers:
+		yield number - previous
+		previous = number
+
+
+# Classes
+
+class IndexSegment:
+
+	# One immutable batch of indexed documents
+
+	# Constructor and private methods
+
+	def __init__(self, p_folder):
+
+		# 0. Save parameters
+		self.m_folder = p_folder
+
+		# 1. Term dictionary and document table
+		with open(p_folder + "terms.json", "r") as terms_file:
+			self.m_terms = json.load(terms_file)
+		with open(p_folder + "docs.json", "r") as docs_file:
+			self.m_documents = json.load(docs_file)
+
+		# 2. Map the binary files (read only on lookup)
+		self.m_maps = {}
+		for name in ["postings", "offsets", "texts"]:
+			binary_file = open(p_folder + name + ".bin", "rb")
+			self.m_maps[name] = (binary_file, mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+				if os.path.getsize(p_folder + name + ".bin") > 0 else b"")
+
+	# Properties
+
+	@property
+	def documents(self):
+		return self.m_documents
+
+	@property
+	def terms(self):
+		return self.m_terms
+
+	# Public methods
+
+	def close(self):
+		for binary_file, binary_map in self.m_maps.values():
+			if isinstance(binary_map, mmap.mmap):
+				binary_map.close()
+			binary_file.close()
+
+	def postings(self, p_term):
+
+		# Document number -> positions of a term
+		if p_term not in self.m_terms:
+			return {}
+		offset, length, document_frequency = self.m_terms[p_term]
+		numbers = decode_varints(self.m_maps["postings"][1], offset, offset + length)
+
+		postings = {}
+		document_number = 0
+		for document_index in range(next(numbers)):
+			document_number += next(numbers)
+			position = 0
+			positions = []
+			for position_index in range(next(numbers)):
+				position += next(numbers)
+				positions.append(position)
+			postings[document_number] = positions
+
+		return postings
+
+	def text(self, p_document_number):
+		offset, length = self.m_documents["texts"][p_document_number]
+		return zlib.decompress(self.m_maps["texts"][1][offset:offset + length]).decode("utf-8")
+
+	def token_offsets(self, p_document_number):
+		offset, length = self.m_documents["offsets"][p_document_number]
+		return list(delta_decode(decode_varints(self.m_maps["offsets"][1], offset, offset + length)))
+
+	# Static methods
+
+	@staticmethod
+	def write(p_folder, p_documents):
+
+		# p_documents: list of (document id, text)
+		os.mkdir(p_folder)
+
+		# 1. Tokenize each document, writing its token offsets and compressed text
+		term_postings = {}
+		documents = { "ids": [], "offsets": [], "texts": [] }
+		with open(p_folder + "offsets.bin", "wb") as offsets_file, \
+			 open(p_folder + "texts.bin", "wb") as texts_file:
+
+			for document_number, (document_id, text) in enumerate(p_documents):
+
+				tokens, offsets = tokenize(text)
+				for position, token in enumerate(tokens):
+					term_postings.setdefault(token, {}).setdefault(document_number, []).append(position)
+
+				encoded_offsets = bytearray()
+				encode_varints(delta_encode(offsets), encoded_offsets)
+				documents["offsets"].append([offsets_file.tell(), len(encoded_offsets)])
+				offsets_file.write(encoded_offsets)
+
+				compressed_text = zlib.compress(text.encode("utf-8"))
+				documents["texts"].append([texts_file.tell(), len(compressed_text)])
+				texts_file.write(compressed_text)
+
+				documents["ids"].append(document_id)
+
+		# 2. Write the compressed posting list of each term, in term order
+		terms = {}
+		with open(p_folder + "postings.bin", "wb") as postings_file:
+			for term in sorted(term_postings):
+
+				postings = term_postings[term]
+				encoded = bytearray()
+				encode_varints([len(postings)], encoded)
+				previous_number = 0
+				for document_number in sorted(postings):
+					encode_varints([document_number - previous_number, len(postings[document_number])], encoded)
+					encode_varints(delta_encode(postings[document_number]), encoded)
+					previous_number = document_number
+
+				terms[term] = [postings_file.tell(), len(encoded), len(postings)]
+				postings_file.write(encoded)
+
+		# 3. Write the term dictionary and document table
+		with open(p_folder + "terms.json", "w") as terms_file:
+			json.dump(terms, terms_file)
+		with open(p_folder + "docs.json", "w") as docs_file:
+			json.dump(documents, docs_file)
+
+
+class PositionalIndex:
+
+	# Constructor and private methods
+
+	def __init__(self, p_index_folder):
+
+		# 0. Save parameters
+		self.m_index_folder = p_index_folder
+
+		# 1. Member field initialization
+
+		# Segment names in the order they were added, and the open segments
+		self.m_manifest = { "segments": [], "documents": {} }
+		self.m_segments = OrderedDict()
+
+		# 2. Read the manifest and open every segment
+		if not os.path.isdir(p_index_folder):
+			os.makedirs(p_index_folder)
+		if os.path.isfile(p_index_folder + "manifest.json"):
+			with open(p_index_folder + "manifest.json", "r") as manifest_file:
+				self.m_manifest = json.load(manifest_file)
+		for segment_name in self.m_manifest["segments"]:
+			self.m_segments[segment_name] = IndexSegment(p_index_folder + segment_name + os.sep)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, p_type, p_value, p_traceback):
+		self.close()
+
+	def __is_live(self, p_segment_name, p_document_number):
+
+		# Documents replaced by a later segment are skipped
+		document_id = self.m_segments[p_segment_name].documents["ids"][p_document_number]
+		return [p_segment_name, p_document_number] == self.m_manifest["documents"].get(document_id)
+
+	def __new_segment_name(self):
+
+		# Next numbered segment name not yet used by a folder
+		segment_name = "segment_{0:06d}".format(len(self.m_manifest["segments"]) + 1)
+		while os.path.isdir(self.m_index_folder + segment_name):
+			segment_name += "_"
+		return segment_name
+
+	def __phrase_postings(self, p_segment_name, p_phrase_tokens):
+
+		# Document number -> positions where the phrase starts, within one segment
+		segment = self.m_segments[p_segment_name]
+		if 0 == len(p_phrase_tokens):
+			return {}
+
+		# 1. Start from the rarest phrase term to keep the intersection small
+		term_order = sorted(range(len(p_phrase_tokens)),
+			key=lambda index: segment.terms.get(p_phrase_tokens[index], [0, 0, 0])[2])
+		rarest = term_order[0]
+		candidates = { document_number: set(position - rarest for position in positions)
+					   for document_number, positions in segment.postings(p_phrase_tokens[rarest]).items()
+					   if self.__is_live(p_segment_name, document_number) }
+
+		# 2. Keep starts where every other term is at its expected offset
+		for index in term_order[1:]:
+			if 0 == len(candidates):
+				break
+			postings = segment.postings(p_phrase_tokens[index])
+			for document_number in list(candidates.keys()):
+				if document_number not in postings:
+					del candidates[document_number]
+					continue
+				candidates[document_number] &= set(position - index for position in postings[document_number])
+				if 0 == len(candidates[document_number]):
+					del candidates[document_number]
+
+		return { document_number: sorted(starts) for document_number, starts in candidates.items() }
+
+	def __save_manifest(self):
+		manifest_filepath = self.m_index_folder + "manifest.json"
+		with open(manifest_filepath + ".tmp", "w") as manifest_file:
+			json.dump(self.m_manifest, manifest_file)
+		os.replace(manifest_filepath + ".tmp", manifest_filepath)
+
+	# Properties
+
+	@property
+	def document_ids(self):
+		return list(self.m_manifest["documents"].keys())
+
+	# Public methods
+
+	def add_documents(self, p_documents):
+
+		# Indexes (document id, text) pairs as one new segment
+		documents = list(p_documents)
+		if 0 == len(documents):
+			return None
+
+		# 1. Write the new segment
+		segment_name = self.__new_segment_name()
+		IndexSegment.write(self.m_index_folder + segment_name + os.sep, documents)
+
+		# 2. Point each document id at its newest copy
+		for document_number, (document_id, text) in enumerate(documents):
+			self.m_manifest["documents"][document_id] = [segment_name, document_number]
+		self.m_manifest["segments"].append(segment_name)
+		self.__save_manifest()
+
+		self.m_segments[segment_name] = IndexSegment(self.m_index_folder + segment_name + os.sep)
+
+		return segment_name
+
+	def close(self):
+		for segment in self.m_segments.values():
+			segment.close()
+
+	def contains(self, p_document_id):
+		return p_document_id in self.m_manifest["documents"]
+
+	def kwic(self, p_phrase, p_context_tokens=8):
+
+		# Keyword-in-context lines: (document id, token position, left, match, right)
+		phrase_tokens = tokenize(p_phrase)[0]
+		lines = []
+		for segment_name, segment in self.m_segments.items():
+			for document_number, positions in self.__phrase_postings(segment_name, phrase_tokens).items():
+
+				# A. Context windows are cut from the stored text by token offset
+				text = segment.text(document_number)
+				offsets = segment.token_offsets(document_number)
+				document_id = segment.documents["ids"][document_number]
+				for position in positions:
+					last = position + len(phrase_tokens) - 1
+					match_end = token_pattern.match(text, offsets[last]).end()
+					left_start = offsets[max(0, position - p_context_tokens)]
+					right_end = token_pattern.match(text, offsets[min(len(offsets) - 1, last + p_context_tokens)]).end()
+					lines.append((document_id, position,
+						" ".join(text[left_start:offsets[position]].split()),
+						" ".join(text[offsets[position]:match_end].split()),
+						" ".join(text[match_end:right_end].split())))
+
+		return lines
+
+	def phrase(self, p_phrase):
+
+		# Document id -> start positions of a word or phrase
+		phrase_tokens = tokenize(p_phrase)[0]
+		results = {}
+		for segment_name, segment in self.m_segments.items():
+			for document_number, positions in self.__phrase_postings(segment_name, phrase_tokens).items():
+				results[segment.documents["ids"][document_number]] = positions
+
+		return results
+
+	def remove_documents(self, p_document_ids):
+
+		# Documents are dropped from the manifest (their segment data stays until compacted)
+		for document_id in p_document_ids:
+			self.m_manifest["documents"].pop(document_id, None)
+		self.__save_manifest()
+
+	def compact(self):
+
+		# Rewrites all live documents into a single segment
+		documents = [(document_id, self.m_segments[segment_name].text(document_number))
+					 for document_id, (segment_name, document_number) in self.m_manifest["documents"].items()]
+
+		# 1. Write the new segment while the old ones are still in use (a failed
+		#    write leaves the index as it was)
+		segment_name = self.__new_segment_name()
+		IndexSegment.write(self.m_index_folder + segment_name + os.sep, documents)
+
+		# 2. Switch the manifest to the new segment
+		old_segments = self.m_segments
+		self.m_manifest = { "segments": [segment_name], "documents": {} }
+		for document_number, (document_id, text) in enumerate(documents):
+			self.m_manifest["documents"][document_id] = [segment_name, document_number]
+		self.__save_manifest()
+		self.m_segments = OrderedDict([(segment_name, IndexSegment(self.m_index_folder + segment_name + os.sep))])
+
+		# 3. Close and remove the replaced segment folders
+		for old_segment, segment in old_segments.items():
+			segment.close()
+			for filename in os.listdir(self.m_index_folder + old_segment):
+				os.remove(self.m_index_folder + old_segment + os.sep + filename)
+			os.rmdir(self.m_index_folder + old_segment)
+
+	def stats(self):
+		return {
+
+			"segments": len(self.m_segments),
+			"documents": len(self.m_manifest["documents"]),
+			"terms": len(set().union(*[segment.terms.keys() for segment in self.m_segments.values()]))
+		}
+
+
+# Document sources
+
+def component_documents(p_filepath):
+
+	# (document id, text) for each component of a packed text or a GutenbergReader
+	# metadata json file, with ids of the form "<text file name>/<component name>"
+	if p_filepath.endswith(ComponentPack.extension):
+		with ComponentPack(p_filepath) as pack:
+			for index, name in enumerate(pack.names):
+				yield pack.text_filename + "/" + name, pack.component(index)
+	else:
+		with open(p_filepath, "r") as metadata_file:
+			components = json.load(metadata_file)["components"]
+		text_name = os.path.splitext(os.path.basename(p_filepath))[0]
+		for name, component in flatten_components(components):
+			yield text_name + "/" + name, component_text(component)
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define index possibilities
+	parser.add_argument("index", help="Index folder")
+	parser.add_argument("command", choices=["add", "query", "kwic", "compact", "stats"], help="Index operation")
+	parser.add_argument("inputs", nargs="*", help="Packed texts or metadata json files to add, or a phrase to look up")
+	parser.add_argument("-w", "--window", type=int, default=8, help="Context tokens on each side for KWIC lines")
+
+	# 3. Parse arguments passed in through the terminal
+	arguments = parser.parse_args()
+	if os.sep != arguments.index[len(arguments.index) - 1]:
+		arguments.index += os.sep
+
+	return arguments
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	with PositionalIndex(arguments.index) as index:
+
+		# 1. Add each input file as its own segment
+		if "add" == arguments.command:
+			for filepath in arguments.inputs:
+				print("{0}: {1}".format(filepath, index.add_documents(component_documents(filepath))))
+
+		# 2. Look up a word or phrase
+		elif "query" == arguments.command:
+			start_time = time.perf_counter()
+			results = index.phrase(" ".join(arguments.inputs))
+			for document_id in sorted(results):
+				print("{0}: {1}".format(document_id, len(results[document_id])))
+			print("{0} documents in {1:.2f} ms".format(len(results), 1000 * (time.perf_counter() - start_time)))
+
+		# 3. Keyword-in-context lines for a word or phrase
+		elif "kwic" == arguments.command:
+			for document_id, position, left, match, right in index.kwic(" ".join(arguments.inputs), arguments.window):
+				print("{0} [{1}]: {2} [{3}] {4}".format(document_id, position, left, match, right))
+
+		# 4. Merge segments
+		elif "compact" == arguments.command:
+			index.compact()
+
+		# 5. Index statistics
+		for stat, value in index.stats().items():
+			print("{0}: {1}".format(stat, value))
+
+if "__main__" == __name__:
+	main()
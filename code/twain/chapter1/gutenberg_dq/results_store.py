@@ -0,0 +1,297 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: SQLite store of per-edition, per-component statistics (token counts
+# 		   and term frequencies) so results can be queried and compared across
+# 		   editions without re-reading or recomputing from the source texts
+
+# Schema
+# texts       one row per work (e.g. Adventures of Huckleberry Finn)
+# editions    one row per edition of a text (e.g. the 2021-02-21 Gutenberg file)
+# components  one row per component of an edition, in text order, with its label
+#             (e.g. "CHAPTER I.", the component name without its output prefix)
+# terms       one row per distinct term
+# term_stats  count of each term in each component, keyed by term first so a
+#             term's counts across all editions are one index range
+#
+# An edition added again replaces its earlier rows in the same transaction.
+
+# Imports
+
+# Built-ins
+import argparse
+from collections import Counter, OrderedDict
+import os
+import sqlite3
+
+# Custom
+from positional_index import component_documents, tokenize
+
+
+# Globals
+
+# Table and index definitions
+schema = """
+CREATE TABLE IF NOT EXISTS texts (
+	text_id INTEGER PRIMARY KEY,
+	title TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS editions (
+	edition_id INTEGER PRIMARY KEY,
+	text_id INTEGER NOT NULL REFERENCES texts(text_id) ON DELETE CASCADE,
+	name TEXT NOT NULL,
+	source TEXT,
+	UNIQUE (text_id, name)
+);
+CREATE TABLE IF NOT EXISTS components (
+	component_id INTEGER PRIMARY KEY,
+	edition_id INTEGER NOT NULL REFERENCES editions(edition_id) ON DELETE CASCADE,
+	position INTEGER NOT NULL,
+	name TEXT NOT NULL,
+	label TEXT NOT NULL,
+	line_count INTEGER NOT NULL,
+	token_count INTEGER NOT NULL,
+	UNIQUE (edition_id, position)
+);
+CREATE INDEX IF NOT EXISTS components_label ON components (label, edition_id);
+CREATE TABLE IF NOT EXISTS terms (
+	term_id INTEGER PRIMARY KEY,
+	term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS term_stats (
+	term_id INTEGER NOT NULL REFERENCES terms(term_id),
+	component_id INTEGER NOT NULL REFERENCES components(component_id) ON DELETE CASCADE,
+	count INTEGER NOT NULL,
+	PRIMARY KEY (term_id, component_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS term_stats_component ON term_stats (component_id);
+"""
+
+# Query for a term's counts per component, optionally for one label
+term_frequency_query = """
+SELECT texts.title, editions.name, components.label, term_stats.count, components.token_count
+FROM terms
+JOIN term_stats ON term_stats.term_id = terms.term_id
+JOIN components ON components.component_id = term_stats.component_id
+JOIN editions ON editions.edition_id = components.edition_id
+JOIN texts ON texts.text_id = editions.text_id
+WHERE terms.term = ?{0}
+ORDER BY texts.title, editions.name, components.position
+"""
+
+# Most variables bound in one statement (SQLite's default limit is 999)
+max_variables = 900
+
+# Marker between a component's output prefix and its label (see GutenbergReader)
+body_marker = "_BODY_"
+
+
+# Utility functions
+
+def component_label(p_name):
+
+	# Label shared by the same component across editions (e.g. "CHAPTER I."
+	# from "HUCKLEBERRYFINN_BODY_CHAPTER I.")
+	return p_name.split(body_marker, 1)[1] if body_marker in p_name else p_name
+
+
+# Classes
+
+class ResultsStore:
+
+	# Constructor and private methods
+
+	def __init__(self, p_database_filepath):
+
+		# 0. Save parameters
+		self.m_database_filepath = p_database_filepath
+
+		# 1. Open the database (write-ahead logging lets readers query during loads)
+		self.m_connection = sqlite3.connect(p_database_filepath)
+		self.m_connection.execute("PRAGMA foreign_keys = ON")
+		self.m_connection.execute("PRAGMA journal_mode = WAL")
+		self.m_connection.execute("PRAGMA synchronous = NORMAL")
+		self.m_connection.executescript(schema)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, p_type, p_value, p_traceback):
+		self.close()
+
+	def __id(self, p_insert, p_select, p_values):
+
+		# Row id of an existing or newly inserted row
+		cursor = self.m_connection.execute(p_insert, p_values)
+		if cursor.lastrowid and cursor.rowcount > 0:
+			return cursor.lastrowid
+		return self.m_connection.execute(p_select, p_values).fetchone()[0]
+
+	def __term_ids(self, p_terms):
+
+		# 1. Add new terms in bulk
+		terms = list(p_terms)
+		self.m_connection.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", ((term,) for term in terms))
+
+		# 2. Look up all their ids, a batch of terms per statement
+		term_ids = {}
+		for start in range(0, len(terms), max_variables):
+			batch = terms[start:start + max_variables]
+			term_ids.update(self.m_connection.execute(
+				"SELECT term, term_id FROM terms WHERE term IN ({0})".format(",".join("?" * len(batch))), batch))
+
+		return term_ids
+
+	# Public methods
+
+	def add_edition(self, p_title, p_edition, p_components, p_source=None):
+
+		# Stores (or replaces) the statistics of one edition from its components
+		# (name -> text, in text order) in a single transaction
+		with self.m_connection:
+
+			# 1. Text and edition rows (an earlier copy of the edition is removed first)
+			text_id = self.__id("INSERT OR IGNORE INTO texts (title) VALUES (?)",
+				"SELECT text_id FROM texts WHERE title = ?", (p_title,))
+			self.m_connection.execute("DELETE FROM editions WHERE text_id = ? AND name = ?", (text_id, p_edition))
+			edition_id = self.m_connection.execute("INSERT INTO editions (text_id, name, source) VALUES (?, ?, ?)",
+				(text_id, p_edition, p_source)).lastrowid
+
+			# 2. Count terms of every component
+			component_rows = []
+			component_counts = []
+			for position, (name, text) in enumerate(p_components.items()):
+				counts = Counter(tokenize(text)[0])
+				component_rows.append((edition_id, position, name, component_label(name),
+					text.count("\n") + 1, sum(counts.values())))
+				component_counts.append(counts)
+
+			# 3. Bulk insert components, then the term counts of each
+			self.m_connection.executemany("INSERT INTO components (edition_id, position, name, label, line_count, "
+				"token_count) VALUES (?, ?, ?, ?, ?, ?)", component_rows)
+			component_ids = [row[0] for row in self.m_connection.execute(
+				"SELECT component_id FROM components WHERE edition_id = ? ORDER BY position", (edition_id,))]
+			vocabulary = set()
+			for counts in component_counts:
+				vocabulary.update(counts)
+			term_ids = self.__term_ids(vocabulary)
+			self.m_connection.executemany("INSERT INTO term_stats (term_id, component_id, count) VALUES (?, ?, ?)",
+				((term_ids[term], component_id, count)
+				 for component_id, counts in zip(component_ids, component_counts)
+				 for term, count in counts.items()))
+
+		return edition_id
+
+	def add_file(self, p_filepath, p_title, p_edition=None):
+
+		# Stores an edition from a packed text or GutenbergReader metadata json file
+		components = OrderedDict((document_id.split("/", 1)[1], text)
+			for document_id, text in component_documents(p_filepath))
+		edition = p_edition if None != p_edition else os.path.splitext(os.path.basename(p_filepath))[0]
+
+		return self.add_edition(p_title, edition, components, os.path.abspath(p_filepath))
+
+	def close(self):
+		self.m_connection.close()
+
+	def components(self, p_title, p_edition):
+
+		# (name, label, line count, token count) of each component of an edition, in order
+		return self.m_connection.execute("""
+			SELECT components.name, components.label, components.line_count, components.token_count
+			FROM components
+			JOIN editions ON editions.edition_id = components.edition_id
+			JOIN texts ON texts.text_id = editions.text_id
+			WHERE texts.title = ? AND editions.name = ?
+			ORDER BY components.position""", (p_title, p_edition)).fetchall()
+
+	def editions(self):
+
+		# (title, edition, component count, token count) of every stored edition
+		return self.m_connection.execute("""
+			SELECT texts.title, editions.name, COUNT(components.component_id), SUM(components.token_count)
+			FROM editions
+			JOIN texts ON texts.text_id = editions.text_id
+			LEFT JOIN components ON components.edition_id = editions.edition_id
+			GROUP BY editions.edition_id
+			ORDER BY texts.title, editions.name""").fetchall()
+
+	def remove_edition(self, p_title, p_edition):
+		with self.m_connection:
+			self.m_connection.execute("DELETE FROM editions WHERE name = ? AND text_id = "
+				"(SELECT text_id FROM texts WHERE title = ?)", (p_edition, p_title))
+
+	def term_frequency(self, p_term, p_label=None):
+
+		# (title, edition, label, count, component token count) of a term in every
+		# component that contains it, or only in components with a given label
+		if None == p_label:
+			return self.m_connection.execute(term_frequency_query.format(""), (p_term.lower(),)).fetchall()
+		return self.m_connection.execute(term_frequency_query.format(" AND components.label = ?"),
+			(p_term.lower(), p_label)).fetchall()
+
+	def term_totals(self, p_term):
+
+		# (title, edition, total count, edition token count) of a term in each edition
+		return self.m_connection.execute("""
+			SELECT texts.title, editions.name, SUM(term_stats.count),
+				(SELECT SUM(token_count) FROM components WHERE edition_id = editions.edition_id)
+			FROM terms
+			JOIN term_stats ON term_stats.term_id = terms.term_id
+			JOIN components ON components.component_id = term_stats.component_id
+			JOIN editions ON editions.edition_id = components.edition_id
+			JOIN texts ON texts.text_id = editions.text_id
+			WHERE terms.term = ?
+			GROUP BY editions.edition_id
+			ORDER BY texts.title, editions.name""", (p_term.lower(),)).fetchall()
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define store possibilities
+	parser.add_argument("command", choices=["add", "editions", "frequency", "totals"], help="Store operation")
+	parser.add_argument("inputs", nargs="*", help="Files to add (packed texts or metadata json), or the term to look up")
+	parser.add_argument("-d", "--database", default="{0}{1}data{1}output{1}results.db".format(os.getcwd(), os.sep),
+		help="SQLite database file")
+	parser.add_argument("-t", "--title", default="Adventures of Huckleberry Finn", help="Title of the text being added")
+	parser.add_argument("-l", "--label", help="Component label (e.g. \"CHAPTER I.\") to look up")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	with ResultsStore(arguments.database) as store:
+
+		# 1. Add editions
+		if "add" == arguments.command:
+			for filepath in arguments.inputs:
+				store.add_file(filepath, arguments.title)
+				print("Added {0}".format(filepath))
+
+		# 2. Show stored editions
+		elif "editions" == arguments.command:
+			for title, edition, component_count, token_count in store.editions():
+				print("{0} / {1}: {2} components, {3} tokens".format(title, edition, component_count, token_count))
+
+		# 3. Frequency of a term by component across editions
+		elif "frequency" == arguments.command:
+			for title, edition, label, count, token_count in store.term_frequency(arguments.inputs[0], arguments.label):
+				print("{0} / {1} / {2}: {3} ({4:.2f} per 10,000 words)".format(title, edition, label, count,
+					10000.0 * count / max(token_count, 1)))
+
+		# 4. Total frequency of a term in each edition
+		else:
+			for title, edition, count, token_count in store.term_totals(arguments.inputs[0]):
+				print("{0} / {1}: {2} ({3:.2f} per 10,000 words)".format(title, edition, count,
+					10000.0 * count / max(token_count, 1)))
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,306 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Renders word frequencies and rates of change by chapter as grids of
+# 		   small plots (one per term), down-sampling long series and writing
+# 		   figures in parallel worker processes
+
+# Inputs
+# Chapter x term matrices: one row per chapter (in text order), one column per term.
+# Figures are described by plain job dictionaries (series already down-sampled)
+# so that they are cheap to send to worker processes, which render them with
+# matplotlib's non-interactive Agg backend.
+
+# Imports
+
+# Built-ins
+import argparse
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import time
+
+# Third party
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.ticker import MaxNLocator
+import numpy as np
+
+# Custom
+from component_pack import component_filename
+from positional_index import component_documents, tokenize
+
+
+# Globals
+
+# Default layout
+default_columns = 4
+default_panel_size = (2.4, 1.6)
+default_panels_per_figure = 16
+default_max_points = 200
+default_dpi = 100
+
+# Height of the figure title (inches) and most ticks per panel axis
+title_height = 0.4
+max_ticks = 4
+
+# Frequencies are shown per this many tokens of each chapter
+frequency_scale = 10000.0
+
+
+# Utility functions
+
+def downsample(p_x, p_y, p_max_points=default_max_points):
+
+	# Keeps the lowest and highest point of each of p_max_points / 2 equal
+	# buckets (so peaks survive), plus the first and last points
+	point_count = len(p_y)
+	if point_count <= p_max_points:
+		return p_x, p_y
+
+	# 1. Pad the series out to a whole number of buckets and find each bucket's extremes
+	bucket_count = max(1, p_max_points // 2)
+	bucket_size = int(math.ceil(point_count / float(bucket_count)))
+	buckets = np.pad(p_y, (0, bucket_count * bucket_size - point_count), mode="edge").reshape(bucket_count, bucket_size)
+	offsets = np.arange(bucket_count) * bucket_size
+	indices = np.concatenate(([0, point_count - 1],
+		offsets + buckets.argmin(axis=1), offsets + buckets.argmax(axis=1)))
+
+	# 2. Points in series order
+	indices = np.unique(np.minimum(indices, point_count - 1))
+
+	return p_x[indices], p_y[indices]
+
+def chapter_term_matrix(p_chapter_texts, p_terms=None, p_top_n=default_panels_per_figure):
+
+	# Counts of terms (the most frequent p_top_n if not given) in each chapter,
+	# with the token count of each chapter
+	chapter_counts = [Counter(tokenize(text)[0]) for text in p_chapter_texts]
+	if None == p_terms:
+		total_counts = Counter()
+		for counts in chapter_counts:
+			total_counts.update(counts)
+		p_terms = [term for term, count in total_counts.most_common(p_top_n)]
+
+	matrix = np.array([[counts[term] for term in p_terms] for counts in chapter_counts], dtype=np.float64)
+	token_counts = np.array([sum(counts.values()) for counts in chapter_counts], dtype=np.float64)
+
+	return matrix.reshape(len(chapter_counts), len(p_terms)), token_counts, p_terms
+
+def tick_locator():
+	return MaxNLocator(max_ticks)
+
+def relative_frequencies(p_matrix, p_token_counts):
+	return p_matrix * frequency_scale / np.maximum(p_token_counts, 1)[:, np.newaxis]
+
+def cumulative_frequencies(p_matrix):
+	return np.cumsum(p_matrix, axis=0)
+
+def rates_of_change(p_matrix):
+
+	# Change from one chapter to the next (the first chapter changes from zero)
+	return np.diff(p_matrix, axis=0, prepend=0)
+
+
+# Worker functions
+
+# Figures kept by each worker process for reuse, by grid shape (creating the axes
+# and their ticks costs about as much as drawing them)
+worker_figures = {}
+
+def grid_figure(p_rows, p_columns, p_panel_size):
+
+	key = (p_rows, p_columns, p_panel_size)
+	if key not in worker_figures:
+
+		# 1. One figure with a shared chapter axis (fixed margins in inches, since
+		#    measuring every label for tight_layout costs as much as drawing)
+		width = p_columns * p_panel_size[0]
+		height = p_rows * p_panel_size[1] + title_height
+		figure, axes = plt.subplots(p_rows, p_columns, figsize=(width, height), sharex=True, squeeze=False)
+		figure.subplots_adjust(left=0.4 / width, right=1 - 0.1 / width, bottom=0.3 / height,
+			top=1 - (title_height + 0.2) / height, wspace=0.3, hspace=0.45)
+		for axis in axes.flat:
+			axis.tick_params(labelsize=6, pad=1)
+			axis.yaxis.set_major_locator(tick_locator())
+		axes.flat[0].xaxis.set_major_locator(tick_locator())
+		worker_figures[key] = (figure, axes)
+
+	return worker_figures[key]
+
+def render_figure(p_job):
+
+	# Renders one grid of panels to an image file (run in a worker process)
+	panels = p_job["panels"]
+	columns = min(p_job["columns"], len(panels))
+	rows = int(math.ceil(len(panels) / float(columns)))
+	figure, axes = grid_figure(rows, columns, tuple(p_job["panel_size"]))
+
+	# 1. Clear the previous figure's series
+	for axis in axes.flat:
+		for line in list(axis.lines):
+			line.remove()
+		if None != axis.get_legend():
+			axis.get_legend().remove()
+		axis.set_visible(False)
+
+	# 2. One panel per term, with a line per series (e.g. per edition)
+	for axis, (title, series) in zip(axes.flat, panels):
+		axis.set_visible(True)
+		axis.set_prop_cycle(None)
+		for label, x, y in series:
+			axis.plot(x, y, linewidth=0.8, label=label)
+		axis.set_title(title, fontsize=8, pad=2, y=1.0)
+		axis.relim()
+		axis.autoscale_view()
+	if len(panels[0][1]) > 1:
+		axes.flat[0].legend(fontsize=5)
+
+	# 3. Write the image
+	figure.suptitle(p_job["title"], fontsize=10)
+	figure.savefig(p_job["filepath"], dpi=p_job["dpi"])
+
+	return p_job["filepath"]
+
+
+# Classes
+
+class SmallMultiplesRenderer:
+
+	# Constructor and private methods
+
+	def __init__(self, p_output_folder, p_columns=default_columns, p_panels_per_figure=default_panels_per_figure,
+				 p_max_points=default_max_points, p_panel_size=default_panel_size, p_dpi=default_dpi,
+				 p_format="png"):
+
+		# 0. Save parameters
+		self.m_output_folder = p_output_folder
+		self.m_columns = p_columns
+		self.m_panels_per_figure = p_panels_per_figure
+		self.m_max_points = p_max_points
+		self.m_panel_size = p_panel_size
+		self.m_dpi = p_dpi
+		self.m_format = p_format
+
+		# 1. Figures waiting to be rendered
+		self.m_jobs = []
+
+	def __add_panels(self, p_name, p_title, p_panels):
+
+		# Pages of panels become figures named <name>_<page>
+		page_count = int(math.ceil(len(p_panels) / float(self.m_panels_per_figure)))
+		for page in range(page_count):
+			self.m_jobs.append({
+
+				"filepath": "{0}{1}_{2}.{3}".format(self.m_output_folder, component_filename(p_name), page + 1, self.m_format),
+				"title": p_title if 1 == page_count else "{0} ({1}/{2})".format(p_title, page + 1, page_count),
+				"panels": p_panels[page * self.m_panels_per_figure:(page + 1) * self.m_panels_per_figure],
+				"columns": self.m_columns,
+				"panel_size": self.m_panel_size,
+				"dpi": self.m_dpi
+			})
+
+	def __series(self, p_label, p_values):
+		x = np.arange(1, len(p_values) + 1)
+		return (p_label,) + downsample(x, np.asarray(p_values, dtype=np.float64), self.m_max_points)
+
+	# Properties
+
+	@property
+	def jobs(self):
+		return self.m_jobs
+
+	# Public methods
+
+	def add_comparison(self, p_name, p_title, p_matrices, p_terms):
+
+		# Panels with one line per labelled matrix (e.g. per edition), for terms
+		# in the same column order of each matrix
+		self.__add_panels(p_name, p_title, [(term,
+			[self.__series(label, matrix[:, column]) for label, matrix in p_matrices.items()])
+			for column, term in enumerate(p_terms)])
+
+	def add_matrix(self, p_name, p_title, p_matrix, p_terms):
+
+		# Panels with one line per term
+		self.__add_panels(p_name, p_title, [(term, [self.__series(None, p_matrix[:, column])])
+			for column, term in enumerate(p_terms)])
+
+	def render(self, p_processes=None):
+
+		# 1. Render all figures across worker processes
+		if not os.path.isdir(self.m_output_folder):
+			os.makedirs(self.m_output_folder)
+		with ProcessPoolExecutor(p_processes) as executor:
+			filepaths = list(executor.map(render_figure, self.m_jobs))
+		self.m_jobs = []
+
+		return filepaths
+
+
+# Main script
+
+def edition_chapters(p_filepath):
+
+	# Chapter names and texts of the body of a packed text or metadata json file
+	chapters = OrderedDict()
+	for document_id, text in component_documents(p_filepath):
+		if "_BODY_" in document_id:
+			chapters[document_id.split("/", 1)[1]] = text
+
+	return chapters
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define rendering possibilities
+	parser.add_argument("inputs", nargs="+", help="Packed texts or metadata json files (one per edition)")
+	parser.add_argument("-o", "--output", default="{0}{1}data{1}output{1}figures{1}".format(os.getcwd(), os.sep),
+		help="Folder for figures")
+	parser.add_argument("-n", "--top", type=int, default=default_panels_per_figure, help="Number of most frequent terms")
+	parser.add_argument("-c", "--columns", type=int, default=default_columns, help="Panels per row")
+	parser.add_argument("-m", "--max-points", type=int, default=default_max_points, help="Most points per plotted series")
+	parser.add_argument("-p", "--processes", type=int, help="Number of worker processes")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+	start_time = time.time()
+	renderer = SmallMultiplesRenderer(os.path.join(arguments.output, ""), arguments.columns,
+		p_max_points=arguments.max_points)
+
+	# 1. Chapter texts of each edition, and the terms most frequent across all of them
+	editions = OrderedDict((os.path.splitext(os.path.basename(filepath))[0], edition_chapters(filepath))
+		for filepath in arguments.inputs)
+	terms = chapter_term_matrix(["\n".join(chapters.values()) for chapters in editions.values()],
+		p_top_n=arguments.top)[2]
+
+	# 2. Frequency, cumulative frequency and rate of change figures for each edition
+	frequencies = OrderedDict()
+	for edition, chapters in editions.items():
+		matrix, token_counts, terms = chapter_term_matrix(list(chapters.values()), terms)
+		frequencies[edition] = relative_frequencies(matrix, token_counts)
+		renderer.add_matrix(edition + "_frequencies", "{0}: frequency per 10,000 words".format(edition),
+			frequencies[edition], terms)
+		renderer.add_matrix(edition + "_cumulative", "{0}: cumulative count".format(edition),
+			cumulative_frequencies(matrix), terms)
+		renderer.add_matrix(edition + "_rates", "{0}: change in frequency".format(edition),
+			rates_of_change(frequencies[edition]), terms)
+
+	# 3. Editions compared term by term
+	if len(editions) > 1:
+		renderer.add_comparison("editions_frequencies", "Frequency per 10,000 words by edition", frequencies, terms)
+
+	# 4. Render everything in parallel
+	filepaths = renderer.render(arguments.processes)
+	print("Wrote {0} figures to {1} in {2:.2f}s".format(len(filepaths), arguments.output, time.time() - start_time))
+
+if "__main__" == __name__:
+	main()
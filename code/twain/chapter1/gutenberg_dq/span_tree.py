@@ -0,0 +1,231 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Divides a text into a tree of spans (volume > part > chapter >
+# 		   paragraph > sentence) in a single pass, with nodes holding offsets
+# 		   into the text rather than copies of its lines
+
+# Levels
+# Heading levels (e.g. volume, part, chapter) are found in one scan of the text
+# with a single combined pattern. A heading node spans from its heading line up
+# to the next heading of the same or a higher level. Paragraph and sentence
+# nodes are only computed when a caller first asks a node for its children.
+
+# Imports
+
+# Built-ins
+from collections import OrderedDict
+import re
+import sys
+
+
+# Globals
+
+# Default heading levels, highest first (each pattern matches a whole heading line)
+default_heading_levels = OrderedDict([
+
+	("volume", r"VOLUME [IVXLCDM\d]+\.?"),
+	("part", r"PART [IVXLCDM\d]+\.?"),
+	("chapter", r"CHAPTER (?:[IVXLCDM\d]+|THE LAST)\.?")
+])
+
+# Levels computed on demand below the heading levels
+paragraph_pattern = re.compile(r"[ \t]*(\S[^\n]*(?:\n[^\n]*\S[^\n]*)*)")
+sentence_pattern = re.compile(r"\S.*?(?:(?<!\bMr)(?<!\bMrs)(?<!\bDr)(?<!\bSt)(?<!\bCol)[.!?]+[\"'”’)\]]*(?=\s|$)|$)", re.DOTALL)
+
+
+# Classes
+
+class SpanNode:
+
+	__slots__ = ["m_tree", "m_level", "m_name", "m_start", "m_body_start", "m_end",
+				 "m_parent", "m_children"]
+
+	# Constructor
+
+	def __init__(self, p_tree, p_level, p_name, p_start, p_body_start, p_end, p_parent):
+
+		# Tree (and text) this node is a span of
+		self.m_tree = p_tree
+
+		# Level name (e.g. "chapter") and heading line (empty below heading levels)
+		self.m_level = p_level
+		self.m_name = p_name
+
+		# Offsets into the text: node start, start of the text after its heading, node end
+		self.m_start = p_start
+		self.m_body_start = p_body_start
+		self.m_end = p_end
+
+		# Parent node and child nodes (None until computed for lazy levels)
+		self.m_parent = p_parent
+		self.m_children = None
+
+	def __repr__(self):
+		return "SpanNode({0}, {1!r}, {2}-{3})".format(self.m_level, self.m_name, self.m_start, self.m_end)
+
+	# Properties
+
+	@property
+	def body(self):
+		return self.m_tree.text[self.m_body_start:self.m_end]
+
+	@property
+	def children(self):
+
+		# Children below the heading levels are found on first request
+		if None == self.m_children:
+			self.m_children = self.m_tree.lazy_children(self)
+		return self.m_children
+
+	@property
+	def end(self):
+		return self.m_end
+
+	@property
+	def level(self):
+		return self.m_level
+
+	@property
+	def name(self):
+		return self.m_name
+
+	@property
+	def parent(self):
+		return self.m_parent
+
+	@property
+	def start(self):
+		return self.m_start
+
+	@property
+	def text(self):
+		return self.m_tree.text[self.m_start:self.m_end]
+
+	# Public methods
+
+	def find(self, p_level):
+
+		# Nodes of a level below this one, in text order (lazy levels are only
+		# computed for the parts of the tree that are walked)
+		for child in self.children:
+			if p_level == child.level:
+				yield child
+			else:
+				for node in child.find(p_level):
+					yield node
+
+	def lines(self):
+
+		# Component-style list of stripped lines of the text after the heading
+		return [line.strip() for line in self.body.split("\n")]
+
+
+class SpanTree:
+
+	# Constructor
+
+	def __init__(self, p_text):
+
+		# 0. Save parameters
+		self.m_text = p_text
+
+		# 1. Root node spanning the whole text
+		self.m_root = SpanNode(self, "text", "", 0, 0, len(p_text), None)
+		self.m_root.m_children = []
+
+	# Properties
+
+	@property
+	def root(self):
+		return self.m_root
+
+	@property
+	def text(self):
+		return self.m_text
+
+	# Public methods
+
+	def find(self, p_level):
+		return self.m_root.find(p_level)
+
+	def lazy_children(self, p_node):
+
+		# 1. Nodes below the heading levels are divided into paragraphs, and
+		#    paragraphs into sentences
+		if "paragraph" == p_node.level:
+			return [SpanNode(self, "sentence", "", match.start(), match.start(), match.end(), p_node)
+					for match in sentence_pattern.finditer(self.m_text, p_node.m_body_start, p_node.m_end)]
+		if "sentence" == p_node.level:
+			return []
+
+		return [SpanNode(self, "paragraph", "", match.start(1), match.start(1), match.end(1), p_node)
+				for match in paragraph_pattern.finditer(self.m_text, p_node.m_body_start, p_node.m_end)]
+
+
+class HierarchicalSegmenter:
+
+	# Constructor
+
+	def __init__(self, p_heading_levels=default_heading_levels):
+
+		# 0. Save parameters (level name -> heading line pattern, highest level first)
+		self.m_heading_levels = OrderedDict(p_heading_levels)
+
+		# 1. Compile all heading levels into one pattern over whole lines
+		self.m_level_ranks = { level: rank + 1 for rank, level in enumerate(self.m_heading_levels) }
+		self.m_heading_pattern = re.compile(
+			r"^[ \t]*(?:" + "|".join("(?P<{0}>{1})".format(level, pattern)
+				for level, pattern in self.m_heading_levels.items()) + r")[ \t]*$",
+			re.MULTILINE)
+
+	# Public methods
+
+	def segment(self, p_text):
+
+		tree = SpanTree(p_text)
+
+		# 0. Open heading nodes from the root down, with their level ranks
+		stack = [(tree.root, 0)]
+
+		# 1. Single scan of the text for heading lines of any level
+		for match in self.m_heading_pattern.finditer(p_text):
+
+			# A. Level of this heading
+			level = next(level for level in self.m_heading_levels if -1 != match.start(level))
+			rank = self.m_level_ranks[level]
+
+			# B. Close open headings of the same or a lower level
+			while stack[len(stack) - 1][1] >= rank:
+				stack.pop()[0].m_end = match.start()
+
+			# C. Open this heading under the nearest higher level heading
+			parent = stack[len(stack) - 1][0]
+			node = SpanNode(tree, level, match.group(level), match.start(), match.end(), len(p_text), parent)
+			if None == parent.m_children:
+				parent.m_children = []
+			parent.m_children.append(node)
+			stack.append((node, rank))
+
+		# 2. Headings still open run to the end of the text; a root without
+		#    headings is divided lazily like any other node
+		if 0 == len(tree.root.m_children):
+			tree.root.m_children = None
+
+		return tree
+
+
+# Main script
+
+def main(p_text_filepath, p_level):
+
+	# 1. Segment a text and show the nodes of one level
+	with open(p_text_filepath, "r") as text_file:
+		tree = HierarchicalSegmenter().segment(text_file.read())
+
+	for node in tree.find(p_level):
+		print("{0}: {1} [{2}-{3}]".format(node.level, node.name or node.text[0:60].replace("\n", " "),
+			node.start, node.end))
+
+if "__main__" == __name__:
+	if len(sys.argv) > 2:
+		main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,364 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Content-addressed, on-disk memoization of the stages of a text cleaning
+# 		   or segmentation sequence so that iterative data quality experiments
+# 		   only recompute the stages downstream of a change
+
+# Keys
+# A stage's key is a hash of (input key, stage name, stage parameters). The
+# input key of the first stage is a hash of the input content itself, and the
+# input key of every later stage is the key of the stage before it. Changing
+# the parameters of stage N therefore changes the keys of stages N and onward
+# while the keys (and cached outputs) of stages 1 to N-1 stay the same.
+
+# Imports
+
+# Built-ins
+from collections import OrderedDict
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+
+
+# Globals
+
+# Input/output paths
+paths = {
+
+	"input": "{0}{1}data{1}input{1}".format(os.getcwd(), os.sep),
+	"cache": "{0}{1}data{1}cache{1}stages{1}".format(os.getcwd(), os.sep)
+}
+
+# Default cache size (bytes)
+default_max_bytes = 512 * 1024 * 1024
+
+
+# Classes
+
+class StageCache:
+
+	# Constructor and private methods
+
+	def __init__(self, p_cache_folder, p_max_bytes=default_max_bytes):
+
+		# 0. Save parameters
+		self.m_cache_folder = p_cache_folder
+		self.m_max_bytes = p_max_bytes
+
+		# 1. Member field initialization
+
+		# Cache entries keyed by stage key, least recently used first
+		self.m_index = OrderedDict()
+
+		# Total size of all cached entries (bytes)
+		self.m_total_bytes = 0
+
+		# Hit/miss statistics for this session
+		self.m_stats = {
+
+			"hits": 0,
+			"misses": 0,
+			"evictions": 0,
+			"seconds_saved": 0.0,
+			"seconds_computing": 0.0
+		}
+
+		# 2. Create the cache folder and read its index
+		if not os.path.isdir(self.m_cache_folder):
+			os.makedirs(self.m_cache_folder)
+		self.__read_index()
+
+	def __entry_filepath(self, p_key):
+		return self.m_cache_folder + p_key[0:2] + os.sep + p_key + ".pickle"
+
+	def __evict(self):
+
+		# 1. Remove least recently used entries until the cache fits its size bound
+		#    (the most recently stored entry is always kept)
+		while self.m_total_bytes > self.m_max_bytes and len(self.m_index) > 1:
+
+			key, entry = self.m_index.popitem(last=False)
+			self.m_total_bytes -= entry["size"]
+			self.m_stats["evictions"] += 1
+
+			if os.path.isfile(self.__entry_filepath(key)):
+				os.remove(self.__entry_filepath(key))
+
+	def __read_index(self):
+
+		index_filepath = self.m_cache_folder + "index.json"
+		if not os.path.isfile(index_filepath):
+			return
+
+		# 1. Read the entry list (stored least recently used first)
+		with open(index_filepath, "r") as index_file:
+			index_json = json.load(index_file)
+
+		# 2. Keep only the entries whose output files still exist
+		for key, entry in index_json["entries"]:
+			if os.path.isfile(self.__entry_filepath(key)):
+				self.m_index[key] = entry
+				self.m_total_bytes += entry["size"]
+
+	# Properties
+
+	@property
+	def stats(self):
+
+		# Hit rate is derived from the session counts
+		stats = dict(self.m_stats)
+		lookups = stats["hits"] + stats["misses"]
+		stats["hit_rate"] = stats["hits"] / lookups if lookups > 0 else 0.0
+		stats["entries"] = len(self.m_index)
+		stats["bytes"] = self.m_total_bytes
+
+		return stats
+
+	# Public methods
+
+	def clear(self):
+
+		# 1. Remove all entry files and empty the index
+		for key in self.m_index:
+			if os.path.isfile(self.__entry_filepath(key)):
+				os.remove(self.__entry_filepath(key))
+		self.m_index = OrderedDict()
+		self.m_total_bytes = 0
+
+		self.flush()
+
+	def contains(self, p_key):
+		return p_key in self.m_index
+
+	def flush(self):
+
+		# 1. Write out the index in least recently used order, via a temporary
+		#    file so an interrupted write never leaves a broken index behind
+		index_filepath = self.m_cache_folder + "index.json"
+		with open(index_filepath + ".tmp", "w") as index_file:
+			json.dump({ "entries": list(self.m_index.items()) }, index_file)
+		os.replace(index_filepath + ".tmp", index_filepath)
+
+	def get(self, p_key):
+
+		# 1. Report a miss for unknown keys
+		if p_key not in self.m_index:
+			return False, None
+
+		# 2. Read the stored output; an entry file deleted or evicted by another
+		#    process sharing the folder, or left unreadable, is a miss
+		try:
+			with open(self.__entry_filepath(p_key), "rb") as entry_file:
+				output = pickle.load(entry_file)
+		except (OSError, EOFError, pickle.UnpicklingError):
+			self.m_total_bytes -= self.m_index.pop(p_key)["size"]
+			if os.path.isfile(self.__entry_filepath(p_key)):
+				os.remove(self.__entry_filepath(p_key))
+			return False, None
+
+		# 3. Mark the entry as most recently used
+		self.m_index.move_to_end(p_key)
+
+		return True, output
+
+	def put(self, p_key, p_output, p_stage_name, p_compute_seconds=0.0):
+
+		# 1. Write out the output for this key
+		entry_filepath = self.__entry_filepath(p_key)
+		if not os.path.isdir(os.path.dirname(entry_filepath)):
+			os.mkdir(os.path.dirname(entry_filepath))
+		with open(entry_filepath, "wb") as entry_file:
+			pickle.dump(p_output, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+		# 2. Record the entry as most recently used
+		if p_key in self.m_index:
+			self.m_total_bytes -= self.m_index.pop(p_key)["size"]
+		self.m_index[p_key] = {
+
+			"stage": p_stage_name,
+			"size": os.path.getsize(entry_filepath),
+			"seconds": p_compute_seconds
+		}
+		self.m_total_bytes += self.m_index[p_key]["size"]
+
+		# 3. Keep the cache within its size bound
+		self.__evict()
+
+	def run(self, p_stage_name, p_stage_function, p_input, p_parameters=None, p_input_key=None):
+
+		# 0. Default to hashing the input content itself
+		input_key = p_input_key if None != p_input_key else StageCache.content_key(p_input)
+		parameters = p_parameters if None != p_parameters else {}
+		key = StageCache.stage_key(input_key, p_stage_name, parameters)
+
+		# 1. Return the stored output if this stage has already been run on this input
+		found, output = self.get(key)
+		if found:
+			self.m_stats["hits"] += 1
+			self.m_stats["seconds_saved"] += self.m_index[key]["seconds"]
+			return output, key
+
+		# 2. Otherwise compute and store it
+		self.m_stats["misses"] += 1
+		start_time = time.perf_counter()
+		output = p_stage_function(p_input, **parameters)
+		compute_seconds = time.perf_counter() - start_time
+		self.m_stats["seconds_computing"] += compute_seconds
+
+		self.put(key, output, p_stage_name, compute_seconds)
+		self.flush()
+
+		return output, key
+
+	def run_sequence(self, p_input, p_stages, p_input_key=None):
+
+		# p_stages: list of (stage name, stage function, parameter dict) in order
+
+		# 1. Compute the key of every stage in the sequence without running any of them
+		keys = []
+		previous_key = p_input_key if None != p_input_key else StageCache.content_key(p_input)
+		for stage_name, stage_function, parameters in p_stages:
+			previous_key = StageCache.stage_key(previous_key, stage_name, parameters)
+			keys.append(previous_key)
+
+		# 2. Load the output of the last stage that is stored and readable (get
+		#    drops missing or unreadable entries, which are then recomputed)
+		resume_index = -1
+		output = p_input
+		for index in range(len(keys) - 1, -1, -1):
+			if keys[index] in self.m_index:
+				found, stored_output = self.get(keys[index])
+				if found:
+					resume_index = index
+					output = stored_output
+					break
+
+		# 3. Upstream stages are counted as hits without being read
+		for index in range(resume_index + 1):
+			self.m_stats["hits"] += 1
+			if keys[index] in self.m_index:
+				self.m_stats["seconds_saved"] += self.m_index[keys[index]]["seconds"]
+
+		# 4. Compute and store the remaining downstream stages
+		for index in range(resume_index + 1, len(p_stages)):
+
+			stage_name, stage_function, parameters = p_stages[index]
+
+			self.m_stats["misses"] += 1
+			start_time = time.perf_counter()
+			output = stage_function(output, **parameters)
+			compute_seconds = time.perf_counter() - start_time
+			self.m_stats["seconds_computing"] += compute_seconds
+
+			self.put(keys[index], output, stage_name, compute_seconds)
+
+		# 5. Save the index once for the whole sequence
+		self.flush()
+
+		return output, keys[len(keys) - 1] if len(keys) > 0 else None
+
+
+	# Static methods
+
+	@staticmethod
+	def content_key(p_content):
+
+		# 1. Hash the content as bytes (text is hashed as UTF-8)
+		if isinstance(p_content, str):
+			content_bytes = p_content.encode("utf-8")
+		elif isinstance(p_content, bytes):
+			content_bytes = p_content
+		else:
+			content_bytes = pickle.dumps(p_content, protocol=pickle.HIGHEST_PROTOCOL)
+
+		return hashlib.sha256(content_bytes).hexdigest()
+
+	@staticmethod
+	def file_key(p_filepath, p_block_size=1024 * 1024):
+
+		# 1. Hash a file's content without reading it all into memory
+		file_hash = hashlib.sha256()
+		with open(p_filepath, "rb") as input_file:
+			for block in iter(lambda: input_file.read(p_block_size), b""):
+				file_hash.update(block)
+
+		return file_hash.hexdigest()
+
+	@staticmethod
+	def stage_key(p_input_key, p_stage_name, p_parameters):
+
+		# 1. Parameters are serialized with sorted keys so that dict order does not matter
+		key_json = json.dumps([p_input_key, p_stage_name, p_parameters], sort_keys=True, default=str)
+
+		return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+# Example cleaning stages
+
+def strip_lines(p_lines):
+	return [line.strip() for line in p_lines]
+
+def drop_blank_lines(p_lines):
+	return [line for line in p_lines if len(line) > 0]
+
+def lowercase_lines(p_lines):
+	return [line.lower() for line in p_lines]
+
+def tokenize_lines(p_lines, p_separator=None):
+	return [line.split(p_separator) for line in p_lines]
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define cache possibilities
+	parser.add_argument("filenames", nargs="+", help="Text files in the input folder to clean")
+	parser.add_argument("-c", "--cache", default=paths["cache"], help="Folder for cached stage outputs")
+	parser.add_argument("-m", "--max_megabytes", type=int, default=default_max_bytes // (1024 * 1024),
+						help="Size bound of the cache (MB)")
+	parser.add_argument("--clear", action="store_true", help="Empty the cache before running")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	# 1. Open the stage cache
+	cache = StageCache(arguments.cache, arguments.max_megabytes * 1024 * 1024)
+	if arguments.clear:
+		cache.clear()
+
+	# 2. Cleaning sequence to run over each edition
+	stages = [
+
+		("strip_lines", strip_lines, {}),
+		("drop_blank_lines", drop_blank_lines, {}),
+		("lowercase_lines", lowercase_lines, {}),
+		("tokenize_lines", tokenize_lines, {})
+	]
+
+	# 3. Run the sequence over each text, recomputing only stages that are not cached
+	for filename in arguments.filenames:
+
+		with open(paths["input"] + filename, "r") as text_file:
+			lines = text_file.readlines()
+
+		tokens, key = cache.run_sequence(lines, stages, StageCache.file_key(paths["input"] + filename))
+		print("{0}: {1} lines ({2})".format(filename, len(tokens), key[0:12]))
+
+	# 4. Show the savings
+	for stat, value in cache.stats.items():
+		print("{0}: {1}".format(stat, value))
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,350 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Fixed-memory approximate counting (count-min sketch, heavy hitters and
+# 		   HyperLogLog distinct counts) for n-gram and attribute statistics over
+# 		   corpora too large for exact Counter-based counting
+
+# Error bounds
+# Count-min:   estimate <= true count + epsilon * total count, with probability 1 - delta
+#              (width = ceil(e / epsilon) counters, depth = ceil(ln(1 / delta)) rows)
+# HyperLogLog: relative standard error of about 1.04 / sqrt(2 ** precision)
+#
+# Items are hashed with a keyed BLAKE2 digest rather than Python's hash(), so
+# sketches built in different processes (or on different days) can be merged.
+
+# Imports
+
+# Built-ins
+from array import array
+import argparse
+import hashlib
+import math
+from multiprocessing import Pool
+import pickle
+import struct
+
+# Custom
+from positional_index import component_documents, tokenize
+
+
+# Globals
+
+# Default error bounds
+default_epsilon = 0.0001
+default_delta = 0.001
+default_precision = 14
+default_heavy_hitters = 100
+
+
+# Utility functions
+
+def item_hashes(p_item, p_seed=b""):
+
+	# Two independent 64-bit hashes of an item (tuples are n-grams of strings)
+	if isinstance(p_item, tuple):
+		item_bytes = "\x1f".join(p_item).encode("utf-8")
+	else:
+		item_bytes = str(p_item).encode("utf-8")
+
+	return struct.unpack("<QQ", hashlib.blake2b(item_bytes, digest_size=16, key=p_seed).digest())
+
+def ngrams(p_tokens, p_n):
+	return zip(*[p_tokens[index:] for index in range(p_n)])
+
+
+# Classes
+
+class CountMinSketch:
+
+	# Constructor
+
+	def __init__(self, p_epsilon=default_epsilon, p_delta=default_delta, p_seed=b""):
+
+		# 0. Save parameters
+		self.m_epsilon = p_epsilon
+		self.m_delta = p_delta
+		self.m_seed = p_seed
+
+		# 1. Table dimensions from the error bounds
+		self.m_width = int(math.ceil(math.e / p_epsilon))
+		self.m_depth = int(math.ceil(math.log(1.0 / p_delta)))
+
+		# 2. Counter table (one flat array of depth x width 64-bit counters)
+		self.m_table = array("Q", bytes(8 * self.m_width * self.m_depth))
+		self.m_total = 0
+
+	# Properties
+
+	@property
+	def memory_bytes(self):
+		return self.m_table.itemsize * len(self.m_table)
+
+	@property
+	def total(self):
+		return self.m_total
+
+	# Public methods
+
+	def add(self, p_item, p_count=1, p_hashes=None):
+
+		# 1. Increment one counter per row (double hashing gives the row positions)
+		hash1, hash2 = p_hashes if None != p_hashes else item_hashes(p_item, self.m_seed)
+		for row in range(self.m_depth):
+			self.m_table[row * self.m_width + (hash1 + row * hash2) % self.m_width] += p_count
+		self.m_total += p_count
+
+	def estimate(self, p_item, p_hashes=None):
+
+		# 1. The smallest of the item's counters is the least overcounted
+		hash1, hash2 = p_hashes if None != p_hashes else item_hashes(p_item, self.m_seed)
+		return min(self.m_table[row * self.m_width + (hash1 + row * hash2) % self.m_width]
+				   for row in range(self.m_depth))
+
+	def merge(self, p_other):
+
+		# 1. Sketches with the same dimensions and seed add counter by counter
+		if (self.m_width, self.m_depth, self.m_seed) != (p_other.m_width, p_other.m_depth, p_other.m_seed):
+			raise ValueError("Count-min sketches must share dimensions and seed to merge")
+		for index in range(len(self.m_table)):
+			self.m_table[index] += p_other.m_table[index]
+		self.m_total += p_other.m_total
+
+
+class HeavyHitters:
+
+	# Most frequent items tracked with count-min estimates: up to 2k candidates are
+	# kept and pruned back to the top k whenever that fills, so memory stays fixed
+
+	# Constructor
+
+	def __init__(self, p_k=default_heavy_hitters, p_epsilon=default_epsilon, p_delta=default_delta, p_seed=b""):
+
+		# 0. Save parameters
+		self.m_k = p_k
+
+		# 1. Sketch of all counts and current candidates with their estimates
+		self.m_sketch = CountMinSketch(p_epsilon, p_delta, p_seed)
+		self.m_candidates = {}
+
+	def __prune(self):
+		top = sorted(self.m_candidates.items(), key=lambda item: item[1], reverse=True)[0:self.m_k]
+		self.m_candidates = dict(top)
+
+	# Properties
+
+	@property
+	def sketch(self):
+		return self.m_sketch
+
+	# Public methods
+
+	def add(self, p_item, p_count=1, p_hashes=None):
+
+		hashes = p_hashes if None != p_hashes else item_hashes(p_item, self.m_sketch.m_seed)
+		self.m_sketch.add(p_item, p_count, hashes)
+
+		# 1. Track the item if it is already a candidate or could be one
+		if p_item in self.m_candidates:
+			self.m_candidates[p_item] += p_count
+		else:
+			self.m_candidates[p_item] = self.m_sketch.estimate(p_item, hashes)
+			if len(self.m_candidates) >= 2 * self.m_k:
+				self.__prune()
+
+	def merge(self, p_other):
+
+		# 1. Merge sketches, then re-estimate the union of candidates
+		self.m_sketch.merge(p_other.m_sketch)
+		for item in set(self.m_candidates).union(p_other.m_candidates):
+			self.m_candidates[item] = self.m_sketch.estimate(item)
+		self.__prune()
+
+	def top(self, p_n=None):
+		n = self.m_k if None == p_n else min(p_n, self.m_k)
+		return sorted(self.m_candidates.items(), key=lambda item: item[1], reverse=True)[0:n]
+
+
+class HyperLogLog:
+
+	# Constructor
+
+	def __init__(self, p_precision=default_precision, p_seed=b""):
+
+		# 0. Save parameters
+		self.m_precision = p_precision
+		self.m_seed = p_seed
+
+		# 1. One register per bucket
+		self.m_bucket_count = 1 << p_precision
+		self.m_registers = bytearray(self.m_bucket_count)
+
+	# Properties
+
+	@property
+	def memory_bytes(self):
+		return len(self.m_registers)
+
+	# Public methods
+
+	def add(self, p_item, p_hashes=None):
+
+		# 1. The first bits pick a register, the rest keep the longest run of leading zeros
+		hash1 = (p_hashes if None != p_hashes else item_hashes(p_item, self.m_seed))[0]
+		bucket = hash1 >> (64 - self.m_precision)
+		remaining = (hash1 << self.m_precision) & 0xFFFFFFFFFFFFFFFF
+		rank = (64 - remaining.bit_length()) + 1 if remaining else 64 - self.m_precision + 1
+		if rank > self.m_registers[bucket]:
+			self.m_registers[bucket] = rank
+
+	def estimate(self):
+
+		# 1. Harmonic mean of the registers with bias correction
+		bucket_count = self.m_bucket_count
+		alpha = 0.7213 / (1 + 1.079 / bucket_count)
+		raw_estimate = alpha * bucket_count * bucket_count / sum(2.0 ** -register for register in self.m_registers)
+
+		# 2. Linear counting for small cardinalities
+		empty_registers = self.m_registers.count(0)
+		if raw_estimate <= 2.5 * bucket_count and empty_registers > 0:
+			return bucket_count * math.log(bucket_count / float(empty_registers))
+
+		return raw_estimate
+
+	def merge(self, p_other):
+
+		# 1. Register-wise maximum
+		if (self.m_precision, self.m_seed) != (p_other.m_precision, p_other.m_seed):
+			raise ValueError("HyperLogLogs must share precision and seed to merge")
+		self.m_registers = bytearray(max(pair) for pair in zip(self.m_registers, p_other.m_registers))
+
+
+class ApproximateStatistics:
+
+	# Heavy hitters, count-min frequencies and distinct counts for one kind of item
+	# (e.g. word 3-grams or values of an attribute), all sharing one hash per item
+
+	# Constructor
+
+	def __init__(self, p_k=default_heavy_hitters, p_epsilon=default_epsilon, p_delta=default_delta,
+				 p_precision=default_precision, p_seed=b""):
+
+		# 0. Save parameters
+		self.m_seed = p_seed
+
+		# 1. Sketches
+		self.m_heavy_hitters = HeavyHitters(p_k, p_epsilon, p_delta, p_seed)
+		self.m_distinct = HyperLogLog(p_precision, p_seed)
+
+	# Properties
+
+	@property
+	def memory_bytes(self):
+		return self.m_heavy_hitters.sketch.memory_bytes + self.m_distinct.memory_bytes
+
+	@property
+	def total(self):
+		return self.m_heavy_hitters.sketch.total
+
+	# Public methods
+
+	def add(self, p_item, p_count=1):
+		hashes = item_hashes(p_item, self.m_seed)
+		self.m_heavy_hitters.add(p_item, p_count, hashes)
+		self.m_distinct.add(p_item, hashes)
+
+	def add_all(self, p_items):
+		for item in p_items:
+			self.add(item)
+
+	def distinct(self):
+		return self.m_distinct.estimate()
+
+	def estimate(self, p_item):
+		return self.m_heavy_hitters.sketch.estimate(p_item)
+
+	def merge(self, p_other):
+		self.m_heavy_hitters.merge(p_other.m_heavy_hitters)
+		self.m_distinct.merge(p_other.m_distinct)
+		return self
+
+	def save(self, p_filepath):
+		with open(p_filepath, "wb") as sketch_file:
+			pickle.dump(self, sketch_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+	def top(self, p_n=None):
+		return self.m_heavy_hitters.top(p_n)
+
+	# Static methods
+
+	@staticmethod
+	def load(p_filepath):
+		with open(p_filepath, "rb") as sketch_file:
+			return pickle.load(sketch_file)
+
+
+# Corpus sketching
+
+def sketch_file(p_arguments):
+
+	# Approximate n-gram statistics of every component of one file (run in a worker process)
+	filepath, n, k, epsilon, delta, precision = p_arguments
+	statistics = ApproximateStatistics(k, epsilon, delta, precision)
+	for document_id, text in component_documents(filepath):
+		statistics.add_all(ngrams(tokenize(text)[0], n))
+
+	return statistics
+
+def sketch_files(p_filepaths, p_n, p_k=default_heavy_hitters, p_epsilon=default_epsilon,
+				 p_delta=default_delta, p_precision=default_precision, p_processes=None):
+
+	# Sketches each file in its own process and merges the results into empty
+	# statistics (so no files give empty statistics)
+	statistics = ApproximateStatistics(p_k, p_epsilon, p_delta, p_precision)
+	with Pool(p_processes) as pool:
+		for file_statistics in pool.imap_unordered(sketch_file,
+			[(filepath, p_n, p_k, p_epsilon, p_delta, p_precision) for filepath in p_filepaths]):
+			statistics.merge(file_statistics)
+
+	return statistics
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define sketching possibilities
+	parser.add_argument("inputs", nargs="+", help="Packed texts or metadata json files")
+	parser.add_argument("-n", "--n", type=int, default=3, help="n-gram length")
+	parser.add_argument("-k", "--top", type=int, default=25, help="Number of most frequent n-grams to show")
+	parser.add_argument("-e", "--epsilon", type=float, default=default_epsilon, help="Count-min error bound")
+	parser.add_argument("-d", "--delta", type=float, default=default_delta, help="Count-min failure probability")
+	parser.add_argument("-p", "--precision", type=int, default=default_precision, help="HyperLogLog precision (bits)")
+	parser.add_argument("-o", "--output", help="File to save the merged sketch to")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	# 1. Sketch all inputs in parallel and merge
+	statistics = sketch_files(arguments.inputs, arguments.n, max(arguments.top, default_heavy_hitters),
+		arguments.epsilon, arguments.delta, arguments.precision)
+
+	# 2. Show the estimates
+	print("{0}-grams: {1} total, ~{2:.0f} distinct ({3:.1f} MB of sketches)".format(arguments.n,
+		statistics.total, statistics.distinct(), statistics.memory_bytes / (1024.0 * 1024.0)))
+	for item, count in statistics.top(arguments.top):
+		print("{0}: {1}".format(" ".join(item), count))
+
+	# 3. Optionally save the merged sketch for later merging
+	if arguments.output:
+		statistics.save(arguments.output)
+
+if "__main__" == __name__:
+	main()
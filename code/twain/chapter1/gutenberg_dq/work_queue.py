@@ -0,0 +1,429 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: SQLite work queue that splits corpus jobs (boundary detection,
+# 		   metrics, parsing) into per-file tasks that any number of worker
+# 		   processes, on one or more machines, can claim and complete
+
+# Tasks
+# One row per (job, key) (e.g. ("metrics", "<text file path>")) with a JSON payload.
+# A worker claims the oldest available task in an immediate (write-locked)
+# transaction and holds it under a lease that its heartbeat thread renews.
+# A task whose lease expires (its worker crashed or lost its machine) is available
+# again. A failed attempt is retried until the task's attempt limit, then the
+# task is marked failed. Results are checkpointed in the row when each task
+# finishes, and are accepted only from the worker that still holds the lease,
+# so a resubmitted or restarted job skips work already done.
+#
+# The queue database can live on a filesystem shared by several machines (use
+# --shared there: SQLite's write-ahead log needs memory shared by all processes,
+# so shared queues use rollback journals and whole-file locks instead).
+
+# Imports
+
+# Built-ins
+import argparse
+import importlib
+import json
+from multiprocessing import Process
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+
+
+# Globals
+
+# Default lease length (seconds), attempts per task and idle polling interval
+default_lease_seconds = 60.0
+default_max_attempts = 3
+default_poll_seconds = 1.0
+
+# Table and index definitions
+schema = """
+CREATE TABLE IF NOT EXISTS tasks (
+	task_id INTEGER PRIMARY KEY,
+	job TEXT NOT NULL,
+	key TEXT NOT NULL,
+	payload TEXT,
+	state TEXT NOT NULL DEFAULT 'pending',
+	attempts INTEGER NOT NULL DEFAULT 0,
+	max_attempts INTEGER NOT NULL,
+	worker TEXT,
+	lease_expires REAL,
+	result TEXT,
+	error TEXT,
+	submitted REAL,
+	finished REAL,
+	UNIQUE (job, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_available ON tasks (job, state, task_id);
+"""
+
+# Task states
+task_states = ["pending", "leased", "done", "failed"]
+
+# Functions of built-in jobs ("module:function"), each taking one task's payload
+job_functions = {
+
+	"boundaries": "work_queue:boundaries_job",
+	"metrics": "work_queue:metrics_job"
+}
+
+
+# Utility functions
+
+def job_function(p_job):
+
+	# Function of a built-in job or of a "module:function" job name
+	module_name, function_name = job_functions.get(p_job, p_job).split(":")
+	return getattr(importlib.import_module(module_name), function_name)
+
+def result_default(p_value):
+
+	# JSON form of result values json cannot encode itself: numpy numbers and
+	# arrays as Python numbers and lists, sets as lists, anything else as a string
+	if hasattr(p_value, "tolist"):
+		return p_value.tolist()
+	if isinstance(p_value, (set, frozenset)):
+		return list(p_value)
+	return str(p_value)
+
+def worker_name():
+	return "{0}:{1}".format(socket.gethostname(), os.getpid())
+
+
+# Job functions
+
+def boundaries_job(p_filepath):
+
+	# Metadata json of generated component keys next to a Gutenberg text
+	from gutenberg_boundaries import detect_file
+	return detect_file((p_filepath, None, False))
+
+def metrics_job(p_filepath):
+
+	# Data quality metric rows of every component of a packed text or metadata json file
+	from dq_metrics import DQMetricsEngine
+	from positional_index import component_documents
+	return DQMetricsEngine(["token_count", "type_token_ratio", "hapax_count", "mean_word_length",
+		"punctuation_density", "non_ascii_rate"]).table(component_documents(p_filepath))
+
+
+# Classes
+
+class Task:
+
+	# Claimed task
+
+	def __init__(self, p_task_id, p_job, p_key, p_payload, p_attempts):
+		self.task_id = p_task_id
+		self.job = p_job
+		self.key = p_key
+		self.payload = p_payload
+		self.attempts = p_attempts
+
+
+class WorkQueue:
+
+	# Constructor and private methods
+
+	def __init__(self, p_database_filepath, p_lease_seconds=default_lease_seconds, p_shared=False):
+
+		# 0. Save parameters
+		self.m_database_filepath = p_database_filepath
+		self.m_lease_seconds = p_lease_seconds
+
+		# 1. Open the queue (transactions are begun explicitly; busy writers are waited for)
+		self.m_connection = sqlite3.connect(p_database_filepath, timeout=60.0, isolation_level=None)
+		self.m_connection.execute("PRAGMA journal_mode = {0}".format("DELETE" if p_shared else "WAL"))
+		self.m_connection.execute("PRAGMA synchronous = {0}".format("FULL" if p_shared else "NORMAL"))
+		self.m_connection.executescript(schema)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, p_type, p_value, p_traceback):
+		self.close()
+
+	def __write(self, p_function):
+
+		# Runs a function in an immediate transaction (holding the write lock from its start)
+		self.m_connection.execute("BEGIN IMMEDIATE")
+		try:
+			result = p_function()
+			self.m_connection.execute("COMMIT")
+		except BaseException:
+			self.m_connection.execute("ROLLBACK")
+			raise
+
+		return result
+
+	# Properties
+
+	@property
+	def database_filepath(self):
+		return self.m_database_filepath
+
+	@property
+	def lease_seconds(self):
+		return self.m_lease_seconds
+
+	# Public methods
+
+	def claim(self, p_job, p_worker):
+
+		# Oldest pending task, or task whose lease expired, now leased to the worker (None if there is none)
+		def claim_task():
+
+			now = time.time()
+
+			# 1. Expired leases out of attempts fail
+			self.m_connection.execute("UPDATE tasks SET state = 'failed', finished = ?, error = COALESCE(error, "
+				"'lease expired') WHERE job = ? AND state = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+				(now, p_job, now))
+
+			# 2. Lease the next available task
+			row = self.m_connection.execute("SELECT task_id, key, payload, attempts FROM tasks WHERE job = ? AND "
+				"(state = 'pending' OR (state = 'leased' AND lease_expires < ?)) ORDER BY task_id LIMIT 1",
+				(p_job, now)).fetchone()
+			if None == row:
+				return None
+			self.m_connection.execute("UPDATE tasks SET state = 'leased', worker = ?, lease_expires = ?, "
+				"attempts = attempts + 1 WHERE task_id = ?", (p_worker, now + self.m_lease_seconds, row[0]))
+
+			return Task(row[0], p_job, row[1], json.loads(row[2]), row[3] + 1)
+
+		return self.__write(claim_task)
+
+	def close(self):
+		self.m_connection.close()
+
+	def complete(self, p_task, p_worker, p_result):
+
+		# Checkpoints a task's result if the worker still holds its lease (the result
+		# is encoded first, so one that cannot be raises before anything is written)
+		result = json.dumps(p_result, default=result_default)
+		return self.__write(lambda: self.m_connection.execute("UPDATE tasks SET state = 'done', result = ?, "
+			"error = NULL, finished = ?, lease_expires = NULL WHERE task_id = ? AND worker = ? AND state = 'leased'",
+			(result, time.time(), p_task.task_id, p_worker)).rowcount > 0)
+
+	def counts(self, p_job):
+
+		# Number of tasks of a job in each state
+		counts = dict.fromkeys(task_states, 0)
+		counts.update(self.m_connection.execute("SELECT state, COUNT(*) FROM tasks WHERE job = ? GROUP BY state",
+			(p_job,)).fetchall())
+
+		return counts
+
+	def fail(self, p_task, p_worker, p_error):
+
+		# Returns a task to the queue after a failed attempt (or fails it for good
+		# after its last attempt) if the worker still holds its lease
+		return self.__write(lambda: self.m_connection.execute("UPDATE tasks SET state = CASE WHEN attempts < "
+			"max_attempts THEN 'pending' ELSE 'failed' END, error = ?, worker = NULL, lease_expires = NULL, "
+			"finished = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END "
+			"WHERE task_id = ? AND worker = ? AND state = 'leased'",
+			(p_error, time.time(), p_task.task_id, p_worker)).rowcount > 0)
+
+	def failures(self, p_job):
+		return self.m_connection.execute("SELECT key, attempts, error FROM tasks WHERE job = ? AND state = 'failed' "
+			"ORDER BY task_id", (p_job,)).fetchall()
+
+	def heartbeat(self, p_task, p_worker):
+
+		# Extends a task's lease; False if the worker no longer holds it
+		return self.__write(lambda: self.m_connection.execute("UPDATE tasks SET lease_expires = ? WHERE task_id = ? "
+			"AND worker = ? AND state = 'leased'", (time.time() + self.m_lease_seconds, p_task.task_id,
+			p_worker)).rowcount > 0)
+
+	def requeue(self, p_job, p_states=("failed",)):
+
+		# Makes failed (or other) tasks of a job available again with fresh attempts
+		return self.__write(lambda: self.m_connection.execute("UPDATE tasks SET state = 'pending', attempts = 0, "
+			"worker = NULL, lease_expires = NULL, finished = NULL WHERE job = ? AND state IN ({0})".format(
+			", ".join("?" * len(p_states))), [p_job] + list(p_states)).rowcount)
+
+	def results(self, p_job):
+
+		# (key, result) of each finished task of a job, in submission order
+		for key, result in self.m_connection.execute("SELECT key, result FROM tasks WHERE job = ? AND state = 'done' "
+			"ORDER BY task_id", (p_job,)):
+			yield key, json.loads(result)
+
+	def submit(self, p_job, p_tasks, p_max_attempts=default_max_attempts):
+
+		# Adds (key, payload) tasks to a job in one transaction; tasks already in the
+		# job (pending, running or done) are left as they are. Returns the number added.
+		now = time.time()
+		return self.__write(lambda: self.m_connection.executemany("INSERT OR IGNORE INTO tasks (job, key, payload, "
+			"max_attempts, submitted) VALUES (?, ?, ?, ?, ?)", ((p_job, key, json.dumps(payload), p_max_attempts, now)
+			for key, payload in p_tasks)).rowcount)
+
+
+class QueueWorker:
+
+	# Drains one job of a queue, running each claimed task while a heartbeat
+	# thread keeps its lease
+
+	# Constructor and private methods
+
+	def __init__(self, p_database_filepath, p_job, p_lease_seconds=default_lease_seconds, p_shared=False,
+				 p_poll_seconds=default_poll_seconds, p_worker=None):
+
+		# 0. Save parameters
+		self.m_database_filepath = p_database_filepath
+		self.m_job = p_job
+		self.m_lease_seconds = p_lease_seconds
+		self.m_shared = p_shared
+		self.m_poll_seconds = p_poll_seconds
+		self.m_worker = p_worker if None != p_worker else worker_name()
+
+		# 1. Member field initialization
+		self.m_function = job_function(p_job)
+		self.m_completed = 0
+		self.m_failed = 0
+
+	def __heartbeat(self, p_task, p_stop):
+
+		# Renews the lease a few times per lease length until the task finishes
+		# (SQLite connections belong to the thread that opened them)
+		with WorkQueue(self.m_database_filepath, self.m_lease_seconds, self.m_shared) as queue:
+			while not p_stop.wait(self.m_lease_seconds / 3.0):
+				if not queue.heartbeat(p_task, self.m_worker):
+					break
+
+	# Properties
+
+	@property
+	def completed(self):
+		return self.m_completed
+
+	@property
+	def failed(self):
+		return self.m_failed
+
+	@property
+	def worker(self):
+		return self.m_worker
+
+	# Public methods
+
+	def run(self):
+
+		# Claims and runs tasks until none are pending or leased to other workers
+		with WorkQueue(self.m_database_filepath, self.m_lease_seconds, self.m_shared) as queue:
+			while True:
+
+				# 1. Claim a task; with none available, wait while other workers may still fail theirs
+				task = queue.claim(self.m_job, self.m_worker)
+				if None == task:
+					if 0 == queue.counts(self.m_job)["leased"]:
+						break
+					time.sleep(self.m_poll_seconds)
+					continue
+
+				# 2. Run it under a heartbeat
+				stop = threading.Event()
+				heartbeat = threading.Thread(target=self.__heartbeat, args=(task, stop), daemon=True)
+				heartbeat.start()
+				try:
+					result = self.m_function(task.payload)
+					error = None
+				except Exception:
+					error = traceback.format_exc()
+				stop.set()
+				heartbeat.join()
+
+				# 3. Checkpoint the result, or record the failure (including a result
+				#    JSON cannot encode, e.g. one with tuple keys) for a retry
+				if None == error:
+					try:
+						self.m_completed += 1 if queue.complete(task, self.m_worker, result) else 0
+					except (TypeError, ValueError):
+						error = traceback.format_exc()
+				if None != error:
+					self.m_failed += 1 if queue.fail(task, self.m_worker, error) else 0
+
+		return self.m_completed, self.m_failed
+
+
+# Worker processes
+
+def run_worker(p_arguments):
+
+	# One worker draining a job (the target of each local worker process)
+	database_filepath, job, lease_seconds, shared = p_arguments
+	worker = QueueWorker(database_filepath, job, lease_seconds, shared)
+	completed, failed = worker.run()
+	print("{0}: {1} tasks completed, {2} failed attempts".format(worker.worker, completed, failed))
+
+def run_workers(p_database_filepath, p_job, p_worker_count, p_lease_seconds=default_lease_seconds, p_shared=False):
+
+	# Drains a job with several local worker processes (workers on other machines
+	# run "work_queue.py <queue> work <job>" against the same queue file)
+	processes = [Process(target=run_worker, args=((p_database_filepath, p_job, p_lease_seconds, p_shared),))
+				 for index in range(p_worker_count)]
+	for process in processes:
+		process.start()
+	for process in processes:
+		process.join()
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define queue possibilities
+	parser.add_argument("queue", help="Queue database file")
+	parser.add_argument("command", choices=["submit", "work", "run", "status", "results", "requeue"],
+		help="Queue operation (work: one worker, run: several local workers)")
+	parser.add_argument("job", help="Job name ({0}) or module:function".format(", ".join(job_functions)))
+	parser.add_argument("inputs", nargs="*", help="Files to submit as tasks")
+	parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Local worker processes (run)")
+	parser.add_argument("-l", "--lease", type=float, default=default_lease_seconds, help="Lease length in seconds")
+	parser.add_argument("-a", "--attempts", type=int, default=default_max_attempts, help="Attempts per task")
+	parser.add_argument("-s", "--shared", action="store_true", help="Queue is on a filesystem shared by several machines")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	# 1. Add a task per input file (keyed by absolute path)
+	if "submit" == arguments.command:
+		with WorkQueue(arguments.queue, arguments.lease, arguments.shared) as queue:
+			print("{0} tasks added".format(queue.submit(arguments.job, ((os.path.abspath(filepath),
+				os.path.abspath(filepath)) for filepath in arguments.inputs), arguments.attempts)))
+
+	# 2. Drain the job with one worker, or several local ones
+	elif "work" == arguments.command:
+		run_worker((arguments.queue, arguments.job, arguments.lease, arguments.shared))
+	elif "run" == arguments.command:
+		start_time = time.time()
+		run_workers(arguments.queue, arguments.job, arguments.workers, arguments.lease, arguments.shared)
+		print("Ran in {0:.2f}s".format(time.time() - start_time))
+
+	# 3. Progress, results or retries
+	else:
+		with WorkQueue(arguments.queue, arguments.lease, arguments.shared) as queue:
+			if "status" == arguments.command:
+				print(", ".join("{0}: {1}".format(state, count) for state, count in queue.counts(arguments.job).items()))
+				for key, attempts, error in queue.failures(arguments.job):
+					print("Failed after {0} attempts: {1}\n{2}".format(attempts, key, error))
+			elif "results" == arguments.command:
+				for key, result in queue.results(arguments.job):
+					print("{0}: {1}".format(key, json.dumps(result)))
+			else:
+				print("{0} tasks requeued".format(queue.requeue(arguments.job)))
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,240 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Persistent catalog of the TEI XML documents of Mark Twain Project
+# 		   Online (http://www.marktwainproject.org/) with constant-time lookups
+# 		   by docId and by genre
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Catalog
+# One SQLite row per document: docId (TEI file name, e.g. "MTDP10362.xml"), genre
+# (work type, e.g. "autobio"), title, URL, size, content hash and fetch time.
+# Rows are loaded once into dictionaries by docId and by genre, so lookups
+# never scan the genre lists. A new catalog is seeded with the known files of
+# mtpo_commons; the scraper adds and updates documents as it finds and fetches them.
+
+# Imports
+
+# Built-ins
+import argparse 			  	# Terminal arguments
+import os
+import sqlite3
+import time
+
+# Custom
+from mtpo_commons import mtpo   # Data about the Mark Twain Project TEI collection
+
+
+# Globals
+
+# Default catalog location
+mtpo["folders"]["catalog"] = mtpo["folders"]["works"] + "catalog.db"
+
+# Folder of the TEI files of each genre
+mtpo["genre_folders"] = {
+
+	"autobio": mtpo["folders"]["autobiographies"],
+	"fiction": mtpo["folders"]["fiction"],
+	"letters": mtpo["folders"]["letters"],
+	"reviews": mtpo["folders"]["letters"]
+}
+
+# Catalog fields, in table column order
+document_fields = ["doc_id", "genre", "title", "url", "size", "hash", "fetched"]
+
+schema = """
+CREATE TABLE IF NOT EXISTS documents (
+	doc_id TEXT PRIMARY KEY,
+	genre TEXT,
+	title TEXT,
+	url TEXT,
+	size INTEGER,
+	hash TEXT,
+	fetched REAL
+);
+CREATE INDEX IF NOT EXISTS documents_genre ON documents (genre);
+"""
+
+
+# Utility functions
+
+def catalog_document(p_doc_id):
+
+	# Terminal argument type for docIds that are in the catalog
+	if not MTPO_Catalog.default().contains(p_doc_id):
+		raise argparse.ArgumentTypeError("Not in the MTPO catalog: {0}".format(p_doc_id))
+	return p_doc_id
+
+
+# Classes
+
+class MTPO_Catalog:
+
+	# Default catalog shared by tools in this process
+	s_default_catalog = None
+
+	# Constructor and private methods
+
+	def __init__(self, p_database_filepath=mtpo["folders"]["catalog"]):
+
+		# 0. Save parameters
+		self.m_database_filepath = p_database_filepath
+
+		# 1. Member field initialization
+
+		# Documents (field dictionaries) by docId
+		self.m_documents = {}
+
+		# DocIds by genre (dictionaries keep insertion order and give O(1) membership)
+		self.m_genres = {}
+
+		# 2. Open the catalog (creating its folder), seeding a new one from the known files
+		folder = os.path.dirname(p_database_filepath)
+		if ":memory:" != p_database_filepath and folder and not os.path.isdir(folder):
+			os.makedirs(folder)
+		self.m_connection = sqlite3.connect(p_database_filepath)
+		self.m_connection.executescript(schema)
+		self.__load()
+		if 0 == len(self.m_documents):
+			self.seed()
+
+	def __contains__(self, p_doc_id):
+		return p_doc_id in self.m_documents
+
+	def __len__(self):
+		return len(self.m_documents)
+
+	def __index(self, p_document):
+
+		# 1. Move the document to its (possibly new) genre
+		previous = self.m_documents.get(p_document["doc_id"])
+		if None != previous and previous["genre"] != p_document["genre"]:
+			self.m_genres[previous["genre"]].pop(p_document["doc_id"], None)
+
+		# 2. Index it by docId and genre
+		self.m_documents[p_document["doc_id"]] = p_document
+		self.m_genres.setdefault(p_document["genre"], {})[p_document["doc_id"]] = True
+
+	def __load(self):
+		for row in self.m_connection.execute("SELECT {0} FROM documents".format(", ".join(document_fields))):
+			self.__index(dict(zip(document_fields, row)))
+
+	# Public methods
+
+	def close(self):
+		self.m_connection.close()
+
+	def contains(self, p_doc_id):
+		return p_doc_id in self.m_documents
+
+	def document(self, p_doc_id):
+		return self.m_documents.get(p_doc_id)
+
+	def documents(self, p_genre=None):
+
+		# DocIds of one genre, or of all documents
+		if None == p_genre:
+			return list(self.m_documents.keys())
+		return list(self.m_genres.get(p_genre, {}).keys())
+
+	def fetched(self, p_doc_id):
+		return p_doc_id in self.m_documents and None != self.m_documents[p_doc_id]["fetched"]
+
+	def filepath(self, p_doc_id):
+
+		# Local path of a document's TEI file by its genre's folder
+		genre = self.genre(p_doc_id)
+		return mtpo["genre_folders"].get(genre, mtpo["folders"]["autobiographies"]) + p_doc_id
+
+	def genre(self, p_doc_id):
+		document = self.m_documents.get(p_doc_id)
+		return document["genre"] if None != document else None
+
+	def genres(self):
+		return { genre: len(doc_ids) for genre, doc_ids in self.m_genres.items() if len(doc_ids) > 0 }
+
+	def record_fetch(self, p_doc_id, p_size, p_hash, p_url=None):
+
+		# Size, content hash and time of a download (the crawler calls this per file)
+		fields = { "size": p_size, "hash": p_hash, "fetched": time.time() }
+		if None != p_url:
+			fields["url"] = p_url
+		self.update([dict(fields, doc_id=p_doc_id)])
+
+	def seed(self):
+
+		# Known files and titles from mtpo_commons
+		self.update([{ "doc_id": doc_id, "genre": genre, "title": mtpo["known_files_dict"].get(doc_id) }
+					 for genre in mtpo["known_files"] for doc_id in mtpo["known_files"][genre]])
+
+	def update(self, p_documents):
+
+		# Adds documents or updates the given fields of existing ones, all in one transaction
+		documents = []
+		for fields in p_documents:
+			document = dict(self.m_documents.get(fields["doc_id"], dict.fromkeys(document_fields)))
+			document.update((field, value) for field, value in fields.items() if None != value)
+			documents.append(document)
+
+		with self.m_connection:
+			self.m_connection.executemany("INSERT OR REPLACE INTO documents ({0}) VALUES ({1})".format(
+				", ".join(document_fields), ", ".join("?" * len(document_fields))),
+				[[document[field] for field in document_fields] for document in documents])
+		for document in documents:
+			self.__index(document)
+
+	# Static methods
+
+	@staticmethod
+	def default():
+
+		# Catalog at the default location (in the works folder, created if needed)
+		if None == MTPO_Catalog.s_default_catalog:
+			MTPO_Catalog.s_default_catalog = MTPO_Catalog(mtpo["folders"]["catalog"])
+
+		return MTPO_Catalog.s_default_catalog
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define catalog possibilities
+	parser.add_argument("command", choices=["genres", "list", "show"], help="Catalog operation")
+	parser.add_argument("doc_ids", nargs="*", help="DocIds to show")
+	parser.add_argument("-c", "--catalog", default=mtpo["folders"]["catalog"], help="Catalog database file")
+	parser.add_argument("-g", "--genre", help="Genre of documents to list")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 1. Get arguments from the terminal
+	arguments = parse_arguments()
+	catalog = MTPO_Catalog(arguments.catalog)
+
+	# 2. Count documents by genre
+	if "genres" == arguments.command:
+		for genre, count in sorted(catalog.genres().items()):
+			print("{0}: {1}".format(genre, count))
+
+	# 3. List documents (of a genre)
+	elif "list" == arguments.command:
+		for doc_id in catalog.documents(arguments.genre):
+			print("{0}: {1}".format(doc_id, catalog.document(doc_id)["title"]))
+
+	# 4. Show catalog entries
+	else:
+		for doc_id in arguments.doc_ids:
+			print(catalog.document(doc_id))
+
+	catalog.close()
+
+
+if "__main__" == __name__:
+	main()
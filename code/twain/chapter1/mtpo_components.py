@@ -0,0 +1,245 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Streams the TEI XML files of Mark Twain Project Online
+# 		   (http://www.marktwainproject.org/) into plain text components by
+# 		   their div structure so that MTPO volumes can be measured with the
+# 		   same component code as the Project Gutenberg texts in gutenberg_dq
+
+# Component names
+# Each div is named by its position in the div hierarchy and its type attribute,
+# e.g. the second div2 inside the third top-level div of MTDP10362.xml with
+# type="chapter" is "MTDP10362_3.2_chapter". Position paths only depend on a
+# div's ancestors, so names are stable however the file is read.
+
+# Imports
+
+# Built-ins
+import argparse 			  	# Terminal arguments
+from collections import OrderedDict
+import os
+import re
+import sys
+
+# Third party
+from lxml import etree 			# Streaming parse of TEI XML files
+
+# Custom
+from mtpo_catalog import MTPO_Catalog, catalog_document # Catalog of MTPO documents by docId and genre
+from mtpo_commons import mtpo   # Data about the Mark Twain Project TEI collection
+from mtpo_store import open_tei # Reads raw, compressed or stored TEI files
+
+# Gutenberg component classes live in the gutenberg_dq subfolder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + os.sep + "gutenberg_dq")
+from gutenberg_dq import ProjectGutenbergText
+
+
+# Globals
+
+# TEI tags that begin a new line of text
+tei_line_tags = set(["ab", "bibl", "closer", "dateline", "div", "head", "item", "l",
+	"lb", "lg", "note", "opener", "p", "salute", "signed", "sp", "speaker", "trailer"])
+
+# TEI div tags (unnumbered or numbered, e.g. div, div1, div2)
+tei_div_pattern = re.compile(r"div\d*$")
+
+
+# Utility functions
+
+def local_name(p_tag):
+
+	# Remove a namespace from a tag name (e.g. {http://www.tei-c.org/ns/1.0}div -> div)
+	return p_tag[p_tag.rfind("}") + 1:] if "}" in p_tag else p_tag
+
+def is_div(p_element):
+	return isinstance(p_element.tag, str) and None != tei_div_pattern.match(local_name(p_element.tag))
+
+def element_lines(p_element, p_skip_tags=()):
+
+	# Lines of text of an element, broken at TEI line-level tags with
+	# whitespace inside each line collapsed (as XML indentation is not text)
+	lines = []
+	current_line = []
+
+	def break_line():
+		line = " ".join("".join(current_line).split())
+		if len(line) > 0:
+			lines.append(line)
+		del current_line[:]
+
+	def walk(p_node):
+
+		# Comments and processing instructions contribute only their tails
+		if isinstance(p_node.tag, str):
+
+			tag = local_name(p_node.tag)
+			if tag in p_skip_tags:
+				return
+
+			line_tag = tag in tei_line_tags or None != tei_div_pattern.match(tag)
+			if line_tag:
+				break_line()
+			if p_node.text:
+				current_line.append(p_node.text)
+			for child in p_node:
+				walk(child)
+				if child.tail:
+					current_line.append(child.tail)
+			if line_tag:
+				break_line()
+
+	walk(p_element)
+	break_line()
+
+	return lines
+
+
+# Classes
+
+class MTPO_ComponentExtractor:
+
+	# Constructor and private methods
+
+	def __init__(self, p_source, p_component_prefix="", p_div_depth=1, p_skip_tags=("note",)):
+
+		# 0. Save parameters
+
+		# TEI file path or file-like object
+		self.m_source = p_source
+
+		# Prefix for component names (e.g. "MTDP10362_")
+		self.m_component_prefix = p_component_prefix
+
+		# Divs at this depth (1 = top-level divs) become components,
+		# including the text of any divs nested inside them
+		self.m_div_depth = p_div_depth
+
+		# Tags whose text is left out of components (editorial notes by default)
+		self.m_skip_tags = set(p_skip_tags)
+
+	# Public methods
+
+	def components(self):
+
+		# Yields (component name, component lines) in document order, keeping only
+		# the div currently being read in memory
+
+		# 0. Position path of the divs currently open and the count of
+		#    child divs seen so far under each of them
+		div_path = []
+		child_div_counts = [0]
+
+		# 1. Walk the file's start and end tags (paths are opened as raw,
+		#    compressed or stored files and decompressed while streaming)
+		source = open_tei(self.m_source) if isinstance(self.m_source, str) else self.m_source
+		for event, element in etree.iterparse(source, events=("start", "end"),
+											  huge_tree=True, resolve_entities=False):
+
+			# A. Open div: record its position among its sibling divs
+			if "start" == event:
+				if is_div(element):
+					child_div_counts[len(child_div_counts) - 1] += 1
+					div_path.append(child_div_counts[len(child_div_counts) - 1])
+					child_div_counts.append(0)
+				continue
+
+			# B. Closed div at the requested depth: emit it as a component
+			if is_div(element):
+
+				if len(div_path) == self.m_div_depth:
+					yield self.component_name(div_path, element), element_lines(element, self.m_skip_tags)
+
+				div_path.pop()
+				child_div_counts.pop()
+
+			# C. Release everything that is not inside a div still being read
+			if len(div_path) < self.m_div_depth:
+				MTPO_ComponentExtractor.release(element)
+
+		if source != self.m_source:
+			source.close()
+
+	def component_name(self, p_div_path, p_div):
+
+		# Prefix, position path and type (if the div has one)
+		name = self.m_component_prefix + ".".join(str(index) for index in p_div_path)
+		if "type" in p_div.attrib:
+			name += "_" + p_div.attrib["type"]
+
+		return name
+
+	# Static methods
+
+	@staticmethod
+	def release(p_element):
+
+		# Free a parsed element and any already-read siblings before it
+		p_element.clear()
+		parent = p_element.getparent()
+		if None != parent:
+			while None != p_element.getprevious():
+				del parent[0]
+
+
+class MTPO_Text(ProjectGutenbergText):
+
+	# MTPO volume exposing its div components through the Project Gutenberg text API
+
+	def __init__(self, p_filepath, p_div_depth=1, p_skip_tags=("note",)):
+
+		# 0. Save parameters
+		self.m_div_depth = p_div_depth
+		self.m_skip_tags = p_skip_tags
+
+		# 1. Call base constructor to stream in the file's components
+		#    (the TEI file is never held in memory as raw text)
+		super().__init__(p_filepath, OrderedDict(), self.__read_components, p_read_raw_text=False)
+
+	def __read_components(self):
+
+		# 1. Read components from the TEI file, named by its filename (e.g. MTDP10362_1_textsec)
+		extractor = MTPO_ComponentExtractor(self.m_text_filepath,
+			os.path.splitext(self.m_text_filename)[0] + "_",
+			self.m_div_depth,
+			self.m_skip_tags)
+
+		for name, lines in extractor.components():
+			self.m_components[name] = lines
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define extraction possibilities
+	parser.add_argument("filename",
+						type=catalog_document,
+						help="Filename of MTPO title to divide into components")
+	parser.add_argument("-d", "--depth", type=int, default=1, help="Depth of divs to output as components (1 = top-level)")
+	parser.add_argument("-f", "--folder", help="Folder of the TEI file (defaults to the folder of its genre)")
+	parser.add_argument("-o", "--output", default=mtpo["folders"]["output"], help="Folder to output components")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 1. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	# 2. Stream the TEI file into components
+	filepath = arguments.folder + arguments.filename if arguments.folder else \
+		MTPO_Catalog.default().filepath(arguments.filename)
+	mtpo_text = MTPO_Text(filepath, arguments.depth)
+
+	# 3. Output each component as its own text file
+	mtpo_text.output(arguments.output)
+
+	print("{0}: {1} components".format(arguments.filename, len(mtpo_text.components)))
+
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,422 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Corpus statistics of the TEI XML files of Mark Twain Project Online
+# 		   (http://www.marktwainproject.org/) kept as mergeable per-file partial
+# 		   counts, so adding, replacing or removing a file only touches that file
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Statistics
+# tag:        count of each tag name
+# attribute:  count of each (tag, attribute, value), as MTPO_Volume.get_attributes_for_tag counts them
+# term:       count of each term of the text (outside the teiHeader)
+# corpus:     document and token totals
+#
+# Tag and attribute names are lowercased as in the BeautifulSoup explorer, and
+# attributes keep their prefixes (e.g. xml:id) and include namespace
+# declarations as they do there (see the -v option). Each
+# file's partial counts are stored with its content hash; the corpus totals are
+# rows keyed by (kind, key) that are incremented or decremented by one file's
+# partial counts at a time. check() sums the stored partials (and optionally
+# re-reads every file) to confirm the totals.
+
+# Imports
+
+# Built-ins
+import argparse 			  	# Terminal arguments
+from collections import Counter
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+# Third party
+from lxml import etree 			# Streaming parse of TEI XML files
+
+# Custom
+from mtpo_commons import mtpo   # Data about the Mark Twain Project TEI collection
+from mtpo_components import local_name
+from mtpo_store import open_tei # Reads raw, compressed or stored TEI files
+
+# Shared text statistics live in the gutenberg_dq subfolder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + os.sep + "gutenberg_dq")
+from positional_index import tokenize
+
+
+# Globals
+
+# Default statistics database
+mtpo["folders"]["corpus_stats"] = mtpo["folders"]["works"] + "corpus_stats.db"
+
+# Separator of the parts of (tag, attribute, value) keys
+key_separator = "\x1f"
+
+# Tags whose text is not counted as terms
+default_skip_tags = ("teiHeader",)
+
+# Namespace of xml: attributes (e.g. xml:id)
+xml_namespace = "http://www.w3.org/XML/1998/namespace"
+
+schema = """
+CREATE TABLE IF NOT EXISTS files (
+	path TEXT PRIMARY KEY,
+	hash TEXT NOT NULL,
+	tokens INTEGER NOT NULL,
+	partial BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+	kind TEXT NOT NULL,
+	key TEXT NOT NULL,
+	count INTEGER NOT NULL,
+	PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+"""
+
+
+# Utility functions
+
+def attribute_name(p_attribute, p_nsmap):
+
+	# Attribute name with its prefix as written in the file (e.g. xml:id), as
+	# BeautifulSoup reports it, rather than lxml's {namespace}name
+	if "}" not in p_attribute:
+		return p_attribute
+	namespace, name = p_attribute[1:].split("}", 1)
+	if xml_namespace == namespace:
+		return "xml:" + name
+	for prefix, prefix_namespace in p_nsmap.items():
+		if namespace == prefix_namespace and None != prefix:
+			return prefix + ":" + name
+	return name
+
+
+def namespace_declarations(p_element):
+
+	# (xmlns or xmlns:prefix, namespace) of the namespaces an element declares,
+	# which BeautifulSoup reports as attributes
+	parent = p_element.getparent()
+	parent_nsmap = parent.nsmap if None != parent else {}
+	return [("xmlns:" + prefix if None != prefix else "xmlns", namespace)
+		for prefix, namespace in p_element.nsmap.items() if parent_nsmap.get(prefix) != namespace]
+
+
+# Classes
+
+class HashingReader:
+
+	# Binary stream wrapper that hashes what is read through it
+
+	def __init__(self, p_stream):
+		self.m_stream = p_stream
+		self.m_hash = hashlib.sha256()
+
+	def read(self, p_size=-1):
+		block = self.m_stream.read(p_size)
+		self.m_hash.update(block)
+		return block
+
+	def hexdigest(self):
+		return self.m_hash.hexdigest()
+
+
+class PartialCounts:
+
+	# Mergeable counts of one file (or, summed, of many): counters keyed by kind
+	kinds = ["tag", "attribute", "term", "corpus"]
+
+	# Constructor and private methods
+
+	def __init__(self, p_counters=None):
+		self.m_counters = { kind: Counter() for kind in PartialCounts.kinds }
+		if None != p_counters:
+			for kind in p_counters:
+				self.m_counters[kind].update(p_counters[kind])
+
+	def __eq__(self, p_other):
+		if not isinstance(p_other, PartialCounts):
+			return NotImplemented
+		return all(+self.m_counters[kind] == +p_other.m_counters[kind] for kind in PartialCounts.kinds)
+
+	def __getitem__(self, p_kind):
+		return self.m_counters[p_kind]
+
+	# Public methods
+
+	def items(self):
+
+		# (kind, key, count) of every count
+		for kind in PartialCounts.kinds:
+			for key, count in self.m_counters[kind].items():
+				yield kind, key, count
+
+	def merge(self, p_other):
+		for kind in PartialCounts.kinds:
+			self.m_counters[kind].update(p_other.m_counters[kind])
+		return self
+
+	def to_bytes(self):
+		return gzip.compress(json.dumps(self.m_counters, sort_keys=True).encode("utf-8"))
+
+	# Static methods
+
+	@staticmethod
+	def from_bytes(p_bytes):
+		return PartialCounts(json.loads(gzip.decompress(p_bytes).decode("utf-8")))
+
+	@staticmethod
+	def from_file(p_filepath, p_skip_tags=default_skip_tags):
+
+		# Counts of one TEI file in one streaming pass, with the hash of its content
+		counts = PartialCounts()
+		tags, attributes, terms = counts["tag"], counts["attribute"], counts["term"]
+		skip_depth = 0
+
+		with open_tei(p_filepath) as tei_file:
+
+			reader = HashingReader(tei_file)
+			for event, element in etree.iterparse(reader, events=("start", "end"), remove_comments=True, remove_pis=True):
+
+				if not isinstance(element.tag, str):
+					continue
+				tag = local_name(element.tag)
+
+				# A. Tags and their attribute values are counted as they open
+				if "start" == event:
+					tag_name = tag.lower()
+					tags[tag_name] += 1
+					for attribute, value in element.attrib.items():
+						attributes[key_separator.join((tag_name, attribute_name(attribute, element.nsmap).lower(), value))] += 1
+					for name, value in namespace_declarations(element):
+						attributes[key_separator.join((tag_name, name.lower(), value))] += 1
+					if tag in p_skip_tags:
+						skip_depth += 1
+					continue
+
+				# B. Once an element closes, its text and the tails of its children are
+				#    complete; count them, then release the children
+				if 0 == skip_depth:
+					for text in [element.text] + [child.tail for child in element]:
+						if text:
+							terms.update(tokenize(text)[0])
+				if tag in p_skip_tags:
+					skip_depth -= 1
+				element.clear(keep_tail=True)
+
+				# C. Detach the earlier siblings (counting their now complete tails),
+				#    so memory does not grow with the number of elements
+				parent = element.getparent()
+				while None != element.getprevious():
+					if 0 == skip_depth and parent[0].tail:
+						terms.update(tokenize(parent[0].tail)[0])
+					del parent[0]
+
+			# D. Document totals
+			counts["corpus"]["documents"] = 1
+			counts["corpus"]["tokens"] = sum(terms.values())
+
+		return counts, reader.hexdigest()
+
+
+class MTPO_CorpusStatistics:
+
+	# Constructor and private methods
+
+	def __init__(self, p_database_filepath=mtpo["folders"]["corpus_stats"]):
+
+		# 0. Save parameters
+		self.m_database_filepath = p_database_filepath
+
+		# 1. Open the database
+		self.m_connection = sqlite3.connect(p_database_filepath)
+		self.m_connection.executescript(schema)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, p_type, p_value, p_traceback):
+		self.close()
+
+	def __apply(self, p_counts, p_sign):
+
+		# Adds (p_sign = 1) or subtracts (p_sign = -1) one file's counts from the
+		# totals, touching only that file's keys
+		rows = [(kind, key, p_sign * count) for kind, key, count in p_counts.items()]
+		self.m_connection.executemany("INSERT INTO totals (kind, key, count) VALUES (?, ?, ?) "
+			"ON CONFLICT (kind, key) DO UPDATE SET count = count + excluded.count", rows)
+		if p_sign < 0:
+			self.m_connection.executemany("DELETE FROM totals WHERE kind = ? AND key = ? AND count = 0",
+				[(kind, key) for kind, key, count in rows])
+
+	def __partial(self, p_path):
+		row = self.m_connection.execute("SELECT partial FROM files WHERE path = ?", (p_path,)).fetchone()
+		return PartialCounts.from_bytes(row[0]) if None != row else None
+
+	# Properties
+
+	@property
+	def document_count(self):
+		return self.m_connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+	# Public methods
+
+	def add(self, p_filepath, p_path=None):
+
+		# Adds a file, or replaces it if its content has changed; returns whether the totals changed
+		path = p_path if None != p_path else p_filepath
+		counts, content_hash = PartialCounts.from_file(p_filepath)
+
+		with self.m_connection:
+
+			# 1. Unchanged files are left alone; changed ones have their old counts taken out
+			row = self.m_connection.execute("SELECT hash, partial FROM files WHERE path = ?", (path,)).fetchone()
+			if None != row:
+				if content_hash == row[0]:
+					return False
+				self.__apply(PartialCounts.from_bytes(row[1]), -1)
+
+			# 2. Add the new counts and keep them for later replacement or removal
+			self.__apply(counts, 1)
+			self.m_connection.execute("INSERT OR REPLACE INTO files (path, hash, tokens, partial) VALUES (?, ?, ?, ?)",
+				(path, content_hash, counts["corpus"]["tokens"], counts.to_bytes()))
+
+		return True
+
+	def attribute_counts(self, p_tag, p_attribute):
+
+		# Counts of the values of an attribute of a tag across the corpus
+		prefix = key_separator.join((p_tag.lower(), p_attribute.lower(), ""))
+		return Counter({ key[len(prefix):]: count for key, count in self.m_connection.execute(
+			"SELECT key, count FROM totals WHERE kind = 'attribute' AND key >= ? AND key < ?",
+			(prefix, prefix[:-1] + chr(ord(key_separator) + 1))) })
+
+	def check(self, p_reread=False):
+
+		# Differences between the totals and the sum of the stored per-file counts
+		# (and, if p_reread, between stored and freshly computed per-file counts)
+		problems = []
+		summed = PartialCounts()
+		for path, content_hash, partial in self.m_connection.execute("SELECT path, hash, partial FROM files"):
+			counts = PartialCounts.from_bytes(partial)
+			summed.merge(counts)
+			if p_reread:
+				fresh_counts, fresh_hash = PartialCounts.from_file(path)
+				if fresh_hash != content_hash or fresh_counts != counts:
+					problems.append("{0}: stored counts are out of date".format(path))
+
+		totals = self.totals()
+		for kind in PartialCounts.kinds:
+			for key in set(+summed[kind]).union(totals[kind]):
+				if summed[kind][key] != totals[kind][key]:
+					problems.append("{0} {1!r}: total {2}, per-file sum {3}".format(kind, key,
+						totals[kind][key], summed[kind][key]))
+
+		return problems
+
+	def close(self):
+		self.m_connection.close()
+
+	def document_lengths(self):
+		return dict(self.m_connection.execute("SELECT path, tokens FROM files"))
+
+	def paths(self):
+		return [row[0] for row in self.m_connection.execute("SELECT path FROM files ORDER BY path")]
+
+	def remove(self, p_path):
+
+		# Takes one file's counts out of the totals
+		with self.m_connection:
+			counts = self.__partial(p_path)
+			if None == counts:
+				return False
+			self.__apply(counts, -1)
+			self.m_connection.execute("DELETE FROM files WHERE path = ?", (p_path,))
+
+		return True
+
+	def tag_counts(self):
+		return Counter(dict(self.m_connection.execute("SELECT key, count FROM totals WHERE kind = 'tag'")))
+
+	def term_counts(self, p_n=None):
+
+		# Most frequent terms (all terms if p_n is None)
+		return self.m_connection.execute("SELECT key, count FROM totals WHERE kind = 'term' "
+			"ORDER BY count DESC, key LIMIT ?", (-1 if None == p_n else p_n,)).fetchall()
+
+	def totals(self):
+
+		# All totals as PartialCounts
+		totals = PartialCounts()
+		for kind, key, count in self.m_connection.execute("SELECT kind, key, count FROM totals"):
+			totals[kind][key] = count
+
+		return totals
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define statistics possibilities
+	parser.add_argument("command", choices=["add", "remove", "check", "show"], help="Statistics operation")
+	parser.add_argument("paths", nargs="*", help="TEI files to add or remove")
+	parser.add_argument("-d", "--database", default=mtpo["folders"]["corpus_stats"], help="Statistics database file")
+	parser.add_argument("-r", "--reread", action="store_true", help="Also re-read every file when checking")
+	parser.add_argument("-t", "--tag", help="Tag whose attribute values to show")
+	parser.add_argument("-a", "--attribute", help="Attribute whose values to show [See -t option]")
+	parser.add_argument("-v", "--verify", action="store_true",
+		help="Check the attribute values against the BeautifulSoup explorer [See -a option]")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 1. Get arguments from the terminal
+	arguments = parse_arguments()
+
+	with MTPO_CorpusStatistics(arguments.database) as statistics:
+
+		# 2. Add (or replace) and remove files
+		if "add" == arguments.command:
+			for filepath in arguments.paths:
+				print("{0}: {1}".format(filepath, "updated" if statistics.add(filepath) else "unchanged"))
+		elif "remove" == arguments.command:
+			for path in arguments.paths:
+				print("{0}: {1}".format(path, "removed" if statistics.remove(path) else "not found"))
+
+		# 3. Compare the totals with the per-file counts
+		elif "check" == arguments.command:
+			problems = statistics.check(arguments.reread)
+			for problem in problems:
+				print(problem)
+			print("{0} documents, {1} problems".format(statistics.document_count, len(problems)))
+
+		# 4. Show attribute values of a tag, or the corpus totals
+		elif arguments.tag and arguments.attribute:
+			attribute_counts = statistics.attribute_counts(arguments.tag, arguments.attribute)
+			for value, count in attribute_counts.most_common():
+				print("{0}: {1}".format(value, count))
+
+			# Optionally compare with MTPO_Volume.get_attributes_for_tag on every file
+			if arguments.verify:
+				from mtpo_explore import MTPO_Volume
+				soup_counts = Counter()
+				for path in statistics.paths():
+					soup_counts.update(MTPO_Volume(path).get_attributes_for_tag(arguments.tag.lower(),
+						arguments.attribute.lower()))
+				print("Matches MTPO_Volume: {0}".format(soup_counts == attribute_counts))
+		else:
+			totals = statistics.totals()
+			print("{0} documents, {1} tokens".format(totals["corpus"]["documents"], totals["corpus"]["tokens"]))
+			for term, count in statistics.term_counts(25):
+				print("{0}: {1}".format(term, count))
+
+
+if "__main__" == __name__:
+	main()
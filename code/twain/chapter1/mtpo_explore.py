@@ -9,9 +9,19 @@
 
 import argparse 			  	# Terminal arguments
 from collections import Counter	# Counts all values in a list
+import os
+import sys
 from bs4 import BeautifulSoup	# Parse TEI XML file for a Mark Twain work
 
+from mtpo_catalog import MTPO_Catalog, catalog_document # Catalog of MTPO documents by docId and genre
 from mtpo_commons import mtpo   # Data about the Mark Twain Project TEI collection
+from mtpo_query import MTPO_QueryEngine # Structural queries evaluated in one streaming pass
+from mtpo_store import open_tei # Reads raw, compressed or stored TEI files
+
+# Shared text statistics classes live in the gutenberg_dq subfolder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + os.sep + "gutenberg_dq")
+from external_counter import ExternalCounter # Exact counts under a memory budget
+from text_sketches import ApproximateStatistics # Fixed-memory approximate counts
 
 
 class MTPO_Volume:
@@ -19,7 +29,7 @@ class MTPO_Volume:
 	def __init__(self, p_filepath):
 
 		# 1. Ingest the TEI as a BeautifulSoup object
-		with open(p_filepath, "r") as tei_file:
+		with open_tei(p_filepath) as tei_file:
 			self.m_soup = BeautifulSoup(tei_file.read(), "lxml")
 
 	def get_attributes_for_tag(self, p_tag, p_attribute):
@@ -38,6 +48,30 @@ class MTPO_Volume:
 		# 3. Create and return a counting dictionary of the attribute values
 		return Counter(attribute_values)
 
+	def get_attribute_sketch(self, p_tag, p_attribute, p_statistics=None):
+
+		# Fixed-memory alternative to get_attributes_for_tag for very large
+		# volumes, mergeable across volumes (see text_sketches.py)
+		statistics = p_statistics if None != p_statistics else ApproximateStatistics()
+
+		# 1. Add all values of the requested attribute (if listed in tag)
+		for tag in self.m_soup.find_all(p_tag):
+			if tag.has_attr(p_attribute):
+				statistics.add(tag[p_attribute])
+
+		return statistics
+
+	def get_attribute_counter(self, p_tag, p_attribute, p_counter=None):
+
+		# Exact alternative to get_attributes_for_tag whose counts spill to disk
+		# past a memory budget, mergeable across volumes (see external_counter.py)
+		counter = p_counter if None != p_counter else ExternalCounter()
+
+		# 1. Count all values of the requested attribute (if listed in tag)
+		counter.update(tag[p_attribute] for tag in self.m_soup.find_all(p_tag) if tag.has_attr(p_attribute))
+
+		return counter
+
 	def get_tags_by_attribute_value(self, p_tag, p_attribute, p_attribute_value):
 
 		# Stores all tag contents
@@ -62,11 +96,13 @@ def parse_arguments():
 
 	# 2. Define MTPO Scraping Possibilities
 	parser.add_argument("filename",
-						choices=mtpo["known_files_dict"].keys(),
+						type=catalog_document,
 						help="Filename of MTPO title to explore")
 	parser.add_argument("-t", "--tag", help="Name of tags to retrieve")
 	parser.add_argument("-a", "--attribute", help="Name of attribute to retrieve from a tag [See -t option].")
 	parser.add_argument("-av", "--attribute_value", help="Attribute value to look for in a tag [See -t option].")
+	parser.add_argument("-q", "--query", nargs="+", help="Structural queries to evaluate together [See mtpo_query.py].")
+	parser.add_argument("-m", "--memory", type=int, help="Memory budget (MB) for counting attribute values on disk [See -a option].")
 
 	# 3. Parse arguments passed in through the terminal
 	arguments = parser.parse_args()
@@ -79,21 +115,38 @@ def main():
 	arguments = parse_arguments()
 
 	print("Arguments read: {0}".format(arguments))
+	filepath = MTPO_Catalog.default().filepath(arguments.filename)
 
-	# 2. Look for tag/attribute to retrieve in a given title
+	# 2. Evaluate structural queries in one pass without building the full soup
+	if arguments.filename and arguments.query:
+
+		results = MTPO_QueryEngine(arguments.query).run(filepath)
+		for query in results:
+			print("{0}: {1}".format(query, len(results[query])))
+			for result in results[query]:
+				print("\t{0}".format(result["text"]))
+
+	# 3. Look for tag/attribute to retrieve in a given title
 	if arguments.filename and arguments.tag:
 
 		# a. Ingest the TEI file
-		mtpo_volume = MTPO_Volume(mtpo["folders"]["autobiographies"] + arguments.filename)
+		mtpo_volume = MTPO_Volume(filepath)
 
 		if arguments.attribute and not arguments.attribute_value:
 
-			# b. Retrieve the attribute values for the given tag
-			attribute_values = mtpo_volume.get_attributes_for_tag(arguments.tag, arguments.attribute)
-
-			# c. Output the attribute values
-			for val in attribute_values:
-				print("{0}: {1}".format(val, attribute_values[val]))
+			# b. Retrieve the attribute values for the given tag (counted within a
+			#    memory budget and output in value order if one is given)
+			if arguments.memory:
+				with mtpo_volume.get_attribute_counter(arguments.tag, arguments.attribute,
+					ExternalCounter(arguments.memory * 1024 * 1024)) as attribute_counter:
+					for val, count in attribute_counter.items():
+						print("{0}: {1}".format(val, count))
+			else:
+				attribute_values = mtpo_volume.get_attributes_for_tag(arguments.tag, arguments.attribute)
+
+				# c. Output the attribute values
+				for val in attribute_values:
+					print("{0}: {1}".format(val, attribute_values[val]))
 
 		elif arguments.attribute and arguments.attribute_value:
 
@@ -0,0 +1,510 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Parses single large TEI XML files of Mark Twain Project Online
+# 		   (http://www.marktwainproject.org/) in parallel by dividing them at
+# 		   div boundaries found by a byte-level pre-scan
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Chunks
+# 1. A pre-scan of the raw bytes (tags only, no parsing of text) finds every div
+#    with its byte range, preorder element index, div nesting level and ancestors.
+# 2. Runs of sibling divs at one level become chunks. Each chunk is parsed on its
+#    own as: prolog (XML declaration, DOCTYPE) + the original start tags of its
+#    ancestors (so namespaces and ancestor attributes are in scope) + the chunk's
+#    bytes + closing tags for the ancestors.
+# 3. Everything outside the chunks (teiHeader, front and back matter, ancestor
+#    tags, content between runs) is parsed as one "skeleton" document.
+# 4. Results are mapped back to preorder indices and positions of the whole file
+#    and merged in document order.
+#
+# Query steps with :has(), :contains() or :matches() that could match a chunk's
+# ancestors depend on content outside the chunk, so such queries are evaluated
+# serially (in their own worker) instead. Components deeper than the chunk level
+# are always inside one chunk. Parallel mode reads the whole file into memory.
+
+# Imports
+
+# Built-ins
+import argparse 			  	# Terminal arguments
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import os
+import re
+import time
+
+# Third party
+from lxml import etree 			# Streaming parse of TEI XML files
+
+# Custom
+from mtpo_catalog import MTPO_Catalog, catalog_document # Catalog of MTPO documents by docId and genre
+from mtpo_components import MTPO_ComponentExtractor, tei_div_pattern
+from mtpo_query import MTPO_QueryEngine, element_attributes, local_name
+from mtpo_store import open_tei # Reads raw, compressed or stored TEI files
+
+
+# Globals
+
+# Markup of a TEI file, one match per comment, CDATA section, processing
+# instruction, DOCTYPE, end tag or start tag (group 1: end tag name, group 2:
+# start tag name; a start tag ending in "/>" is empty)
+markup_pattern = re.compile(
+	br"<(?:!--.*?-->|!\[CDATA\[.*?\]\]>|\?.*?\?>|!DOCTYPE(?:[^\[>]*\[.*?\])?[^>]*>|" +
+	br"/([^\s>]+)\s*>|([^\s/>!?]+)(?:[^>\"']+|\"[^\"]*\"|'[^']*')*>)",
+	re.DOTALL)
+
+# Chunks per worker process (more chunks balance uneven div sizes)
+default_chunks_per_process = 4
+
+
+# Utility functions
+
+def is_div_name(p_qualified_name):
+	return None != tei_div_pattern.match(p_qualified_name[p_qualified_name.rfind(b":") + 1:].decode("utf-8"))
+
+
+# Classes
+
+class ScannedElement:
+
+	# Open element seen by the pre-scan
+
+	__slots__ = ["name", "start_tag", "index", "parent", "div_level", "div_count", "div_path"]
+
+	def __init__(self, p_name, p_start_tag, p_index, p_parent, p_div_level, p_div_path):
+
+		# Qualified tag name, original start tag bytes and preorder element index
+		self.name = p_name
+		self.start_tag = p_start_tag
+		self.index = p_index
+
+		# Parent element (None for the root)
+		self.parent = p_parent
+
+		# Number of divs among this element and its ancestors, the number of
+		# child divs seen so far and, for divs, their position path among divs
+		self.div_level = p_div_level
+		self.div_count = 0
+		self.div_path = p_div_path
+
+	def ancestors(self):
+
+		# This element's ancestors, root first
+		chain = []
+		element = self.parent
+		while None != element:
+			chain.append(element)
+			element = element.parent
+		chain.reverse()
+
+		return chain
+
+
+class ScannedDiv:
+
+	# Byte range and position of one div found by the pre-scan
+
+	__slots__ = ["element", "start", "end", "end_index"]
+
+	def __init__(self, p_element, p_start):
+		self.element = p_element
+		self.start = p_start
+		self.end = None
+		self.end_index = None
+
+
+class DocumentScan:
+
+	# Byte-level pre-scan of a TEI file's tags
+
+	# Constructor
+
+	def __init__(self, p_data):
+
+		# 1. Member field initialization
+
+		# Bytes before the root element (XML declaration, DOCTYPE, comments)
+		self.m_prolog = b""
+
+		# Divs by div level, in document order
+		self.m_divs = {}
+
+		# Total number of elements, and of divs with no div ancestor (divs are
+		# numbered among the divs under the same nearest div, as in MTPO_ComponentExtractor)
+		self.m_element_count = 0
+		self.div_count = 0
+
+		# 2. Walk every tag, keeping the stack of open elements
+		stack = []
+		index = 0
+		open_divs = []
+		for match in markup_pattern.finditer(p_data):
+
+			end_name, start_name = match.group(1), match.group(2)
+
+			# A. Start tag: a new (possibly empty) element
+			if None != start_name:
+
+				if 0 == len(stack) and 0 == index:
+					self.m_prolog = p_data[0:match.start()]
+
+				parent = stack[len(stack) - 1] if len(stack) > 0 else None
+				is_div = is_div_name(start_name)
+				div_level = (parent.div_level if None != parent else 0) + (1 if is_div else 0)
+				div_path = None
+				if is_div:
+					div_parent = parent
+					while None != div_parent and None == div_parent.div_path:
+						div_parent = div_parent.parent
+					parent_path = div_parent.div_path if None != div_parent else ()
+					counter = div_parent if None != div_parent else self
+					counter.div_count += 1
+					div_path = parent_path + (counter.div_count,)
+
+				element = ScannedElement(start_name, match.group(0), index, parent, div_level, div_path)
+				index += 1
+
+				if is_div:
+					div = ScannedDiv(element, match.start())
+					self.m_divs.setdefault(div_level, []).append(div)
+				else:
+					div = None
+
+				if match.group(0).endswith(b"/>"):
+					if None != div:
+						div.end = match.end()
+						div.end_index = index
+				else:
+					stack.append(element)
+					open_divs.append(div)
+
+			# B. End tag: close the innermost element
+			elif None != end_name:
+				stack.pop()
+				div = open_divs.pop()
+				if None != div:
+					div.end = match.end()
+					div.end_index = index
+
+		self.m_element_count = index
+
+	# Properties
+
+	@property
+	def divs(self):
+		return self.m_divs
+
+	@property
+	def element_count(self):
+		return self.m_element_count
+
+	@property
+	def prolog(self):
+		return self.m_prolog
+
+	# Public methods
+
+	def chunks(self, p_target_count, p_max_level=None):
+
+		# Runs of sibling divs at the shallowest level with at least p_target_count
+		# divs (or the most divs), split into about p_target_count chunks by size
+		levels = [level for level in sorted(self.m_divs) if None == p_max_level or level <= p_max_level]
+		if 0 == len(levels):
+			return []
+		level = next((level for level in levels if len(self.m_divs[level]) >= p_target_count),
+			max(levels, key=lambda level: len(self.m_divs[level])))
+		divs = self.m_divs[level]
+
+		# 1. Chunks hold sibling divs only, up to about the target size
+		target_size = sum(div.end - div.start for div in divs) / float(p_target_count)
+		chunks = []
+		for div in divs:
+			chunk = chunks[len(chunks) - 1] if len(chunks) > 0 else None
+			if None == chunk or chunk.parent is not div.element.parent or \
+			   chunk.end - chunk.start >= target_size:
+				chunks.append(DocumentChunk(div))
+			else:
+				chunk.extend(div)
+
+		return chunks
+
+
+class DocumentChunk:
+
+	# Run of sibling divs parsed on its own
+
+	def __init__(self, p_div):
+
+		# First div and parent shared by the run's divs
+		self.first_div = p_div.element
+		self.parent = p_div.element.parent
+
+		# Byte range and preorder element index range of the run
+		self.start = p_div.start
+		self.end = p_div.end
+		self.start_index = p_div.element.index
+		self.end_index = p_div.end_index
+
+	def extend(self, p_div):
+		self.end = p_div.end
+		self.end_index = p_div.end_index
+
+	def wrap(self, p_data, p_prolog):
+
+		# Chunk bytes inside its prolog and ancestor tags, and the number of ancestors
+		ancestors = self.first_div.ancestors()
+		return p_prolog + b"".join(ancestor.start_tag for ancestor in ancestors) + p_data[self.start:self.end] + \
+			b"".join(b"</" + ancestor.name + b">" for ancestor in reversed(ancestors)), len(ancestors)
+
+
+class ChunkComponentExtractor(MTPO_ComponentExtractor):
+
+	# Extractor for one chunk that names divs by their position in the whole file
+
+	def __init__(self, p_source, p_component_prefix, p_div_depth, p_skip_tags, p_parent_path, p_first_position):
+
+		super().__init__(p_source, p_component_prefix, p_div_depth, p_skip_tags)
+
+		# Position path of the chunk's parent div (empty at the top level) and the
+		# position of the chunk's first div among its sibling divs
+		self.m_parent_path = list(p_parent_path)
+		self.m_first_position = p_first_position
+
+	def component_name(self, p_div_path, p_div):
+
+		# Ancestor divs in the chunk are each their parent's only div, and the
+		# chunk's own divs are counted from 1
+		level = len(self.m_parent_path)
+		path = self.m_parent_path + [p_div_path[level] + self.m_first_position - 1] + list(p_div_path[level + 1:])
+
+		return super().component_name(path, p_div)
+
+
+# Worker functions
+
+def query_chunk(p_job):
+
+	# Query results of one wrapped chunk (or skeleton, or whole file) with
+	# preorder indices mapped back to the whole file
+	data, queries, ancestor_count, gap_indices, gap_offsets = p_job
+	results = []
+	for query_index, result in MTPO_QueryEngine(queries).stream(BytesIO(data)):
+
+		# 1. Ancestors only provide context in chunks
+		if result["index"] < ancestor_count:
+			continue
+
+		# 2. Indices shift by the elements left out before each position
+		index = result["index"] - ancestor_count
+		index += gap_offsets[bisect_right(gap_indices, index) - 1] if len(gap_indices) > 0 else 0
+		results.append((query_index, dict(result, index=index)))
+
+	return results
+
+def extract_chunk(p_job):
+
+	# Components of one wrapped chunk, named by their positions in the whole file
+	data, prefix, div_depth, skip_tags, parent_path, first_position = p_job
+	extractor = ChunkComponentExtractor(BytesIO(data), prefix, div_depth, skip_tags, parent_path, first_position)
+
+	return list(extractor.components())
+
+def extract_serial(p_job):
+	data, prefix, div_depth, skip_tags = p_job
+	return list(MTPO_ComponentExtractor(BytesIO(data), prefix, div_depth, skip_tags).components())
+
+def run_job(p_job):
+
+	# Runs a worker function on a job, re-raising its exceptions as RuntimeError
+	# naming the file and chunk (some, like lxml's parse errors, cannot be
+	# pickled back to the parent process)
+	function, description, job = p_job
+	try:
+		return function(job)
+	except Exception as exception:
+		raise RuntimeError("{0}: {1!r}".format(description, exception))
+
+
+class MTPO_ParallelParser:
+
+	# Constructor and private methods
+
+	def __init__(self, p_source, p_processes=None, p_chunks_per_process=default_chunks_per_process):
+
+		# 0. Save parameters
+		self.m_source = p_source
+		self.m_processes = p_processes if None != p_processes else os.cpu_count()
+		self.m_chunk_count = self.m_processes * p_chunks_per_process
+
+		# 1. Read and pre-scan the file
+		with open_tei(p_source) as tei_file:
+			self.m_data = tei_file.read()
+		self.m_scan = DocumentScan(self.m_data)
+
+	def __describe(self, p_chunk):
+		return "{0} (chunk of bytes {1}-{2})".format(self.m_source, p_chunk.start, p_chunk.end)
+
+	def __skeleton(self, p_chunks):
+
+		# Bytes outside the chunks, and (skeleton index, offset) pairs that map
+		# skeleton element indices back to the whole file
+		parts = []
+		gap_indices = [0]
+		gap_offsets = [0]
+		position = 0
+		removed = 0
+		for chunk in p_chunks:
+			parts.append(self.m_data[position:chunk.start])
+			removed += chunk.end_index - chunk.start_index
+			gap_indices.append(chunk.end_index - removed)
+			gap_offsets.append(removed)
+			position = chunk.end
+		parts.append(self.m_data[position:])
+
+		return b"".join(parts), gap_indices, gap_offsets
+
+	def __context_sensitive(self, p_query, p_ancestors):
+
+		# Whether any ancestor of a chunk could be a result of the query, or match
+		# a step whose predicates depend on the ancestor's (partial) content
+		steps = p_query.steps
+		for tag, attributes in p_ancestors:
+			for step_index, step in enumerate(steps):
+				if not step.matches_element(tag, attributes):
+					continue
+				if len(steps) - 1 == step_index or len(step.has_steps) > 0 or len(step.text_tests) > 0:
+					return True
+
+		return False
+
+	# Properties
+
+	@property
+	def scan(self):
+		return self.m_scan
+
+	# Public methods
+
+	def components(self, p_component_prefix="", p_div_depth=1, p_skip_tags=("note",)):
+
+		# Same (name, lines) components as MTPO_ComponentExtractor, in document order
+		chunks = self.m_scan.chunks(self.m_chunk_count, p_div_depth)
+		if len(chunks) < 2:
+			return extract_serial((self.m_data, p_component_prefix, p_div_depth, p_skip_tags))
+
+		# 1. Components are divs at or below the chunk level, so each is in one chunk
+		jobs = []
+		for chunk in chunks:
+			data, ancestor_count = chunk.wrap(self.m_data, self.m_scan.prolog)
+			parent_path = chunk.first_div.div_path[0:len(chunk.first_div.div_path) - 1]
+			jobs.append((extract_chunk, self.__describe(chunk), (data, p_component_prefix, p_div_depth,
+				tuple(p_skip_tags), parent_path, chunk.first_div.div_path[len(chunk.first_div.div_path) - 1])))
+
+		# 2. Extract in parallel and concatenate in chunk (document) order
+		components = []
+		with ProcessPoolExecutor(self.m_processes) as executor:
+			for chunk_components in executor.map(run_job, jobs):
+				components.extend(chunk_components)
+
+		return components
+
+	def query(self, p_queries):
+
+		# Same results as MTPO_QueryEngine.run, evaluated over chunks in parallel
+		engine = MTPO_QueryEngine(p_queries)
+		results = OrderedDict((query, []) for query in p_queries)
+		chunks = self.m_scan.chunks(self.m_chunk_count)
+
+		# 1. Queries that depend on ancestors' content are evaluated over the whole file
+		ancestors = {}
+		for chunk in chunks:
+			for ancestor in chunk.first_div.ancestors():
+				ancestors[ancestor.index] = ancestor
+		ancestor_tree = etree.fromstring(self.m_scan.prolog +
+			b"".join(ancestors[index].start_tag for index in sorted(ancestors)) +
+			b"".join(b"</" + ancestors[index].name + b">" for index in sorted(ancestors, reverse=True)),
+			etree.XMLParser(huge_tree=True, resolve_entities=False)) if len(ancestors) > 0 else None
+		ancestor_elements = [(local_name(element.tag), element_attributes(element))
+			for element in ancestor_tree.iter()] if None != ancestor_tree else []
+		serial_queries = [query.query for query in engine.m_queries
+			if len(chunks) < 2 or self.__context_sensitive(query, ancestor_elements)]
+		parallel_queries = [query for query in p_queries if query not in serial_queries]
+
+		# 2. Jobs: each chunk, the skeleton around them and the serial queries
+		jobs = []
+		if len(parallel_queries) > 0:
+			for chunk in chunks:
+				data, ancestor_count = chunk.wrap(self.m_data, self.m_scan.prolog)
+				jobs.append((parallel_queries, (query_chunk, self.__describe(chunk),
+					(data, parallel_queries, ancestor_count, [0], [chunk.start_index]))))
+			skeleton, gap_indices, gap_offsets = self.__skeleton(chunks)
+			jobs.append((parallel_queries, (query_chunk, "{0} (outside the chunks)".format(self.m_source),
+				(skeleton, parallel_queries, 0, gap_indices, gap_offsets))))
+		if len(serial_queries) > 0:
+			jobs.append((serial_queries, (query_chunk, str(self.m_source), (self.m_data, serial_queries, 0, [], []))))
+
+		# 3. Evaluate in parallel and merge in document order
+		with ProcessPoolExecutor(self.m_processes) as executor:
+			for (queries, job), job_results in zip(jobs, executor.map(run_job, [job for queries, job in jobs])):
+				for query_index, result in job_results:
+					results[queries[query_index]].append(result)
+		for query in results:
+			results[query].sort(key=lambda result: result["index"])
+
+		return results
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define parallel parsing possibilities
+	parser.add_argument("filename", type=catalog_document, help="Filename of MTPO title to parse")
+	parser.add_argument("queries", nargs="*", help="Structural queries to evaluate [See mtpo_query.py]")
+	parser.add_argument("-f", "--folder", help="Folder of the TEI file (defaults to the folder of its genre)")
+	parser.add_argument("-c", "--components", action="store_true", help="Extract div components instead of querying")
+	parser.add_argument("-d", "--depth", type=int, default=1, help="Depth of divs to output as components (1 = top-level)")
+	parser.add_argument("-p", "--processes", type=int, help="Number of worker processes")
+	parser.add_argument("-v", "--verify", action="store_true", help="Check results against a serial parse")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 1. Get arguments from the terminal
+	arguments = parse_arguments()
+	filepath = arguments.folder + arguments.filename if arguments.folder else \
+		MTPO_Catalog.default().filepath(arguments.filename)
+	prefix = os.path.splitext(arguments.filename)[0] + "_"
+
+	# 2. Parse in parallel
+	start_time = time.time()
+	parser = MTPO_ParallelParser(filepath, arguments.processes)
+	if arguments.components:
+		results = parser.components(prefix, arguments.depth)
+		print("{0} components".format(len(results)))
+	else:
+		results = parser.query(arguments.queries)
+		for query in results:
+			print("{0}: {1} results".format(query, len(results[query])))
+	print("Parallel: {0:.2f}s".format(time.time() - start_time))
+
+	# 3. Optionally compare with a serial parse
+	if arguments.verify:
+		start_time = time.time()
+		if arguments.components:
+			serial_results = list(MTPO_ComponentExtractor(filepath, prefix, arguments.depth).components())
+		else:
+			serial_results = MTPO_QueryEngine(arguments.queries).run(filepath)
+		print("Serial: {0:.2f}s, matches: {1}".format(time.time() - start_time, results == serial_results))
+
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,511 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Downloads, segments and measures TEI XML files of Mark Twain Project
+# 		   Online (http://www.marktwainproject.org/) as one overlapped pipeline,
+# 		   so no stage waits for the previous one to finish the whole corpus
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Stages
+# download  threads stream each document to disk (network bound)
+# segment   worker processes parse each TEI file into div components in one
+#           streaming pass (see mtpo_components.py)
+# measure   worker processes compute data quality metrics of each component
+#           (see gutenberg_dq/dq_metrics.py)
+# sink      the main thread writes metric rows and records downloads in the catalog
+#
+# Stages are linked by bounded queues. Each stage's dispatcher thread keeps at
+# most two items per worker in flight and blocks while the next queue is full,
+# so a slow stage holds back the ones before it instead of letting items pile
+# up in memory. Wall-clock time then approaches that of the slowest stage
+# rather than the sum of all stages (--serial runs the stages one after another
+# for comparison). Per-stage throughput and queue depths are reported.
+
+# Imports
+
+# Built-ins
+import argparse 			  	# Terminal arguments
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import csv
+import hashlib
+import os
+import queue
+import sys
+import threading
+import time
+
+# Third party
+import requests 				# Download TEI files
+
+# Custom
+from mtpo_catalog import MTPO_Catalog # Catalog of MTPO documents by docId and genre
+from mtpo_commons import mtpo   # Data about the Mark Twain Project TEI collection
+from mtpo_components import MTPO_ComponentExtractor # Streams TEI files into div components
+from mtpo_scrape import scrape_and_build_file_urls # Finds TEI file URLs on the MTPO site (and adds site URLs to mtpo)
+
+# Shared text statistics classes live in the gutenberg_dq subfolder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + os.sep + "gutenberg_dq")
+from dq_metrics import DQMetricsEngine # Fused data quality metrics of text components
+
+
+# Globals
+
+# Marks the end of a stage's input
+end_of_stream = None
+
+# Default workers per stage, queue length and seconds between progress reports
+default_download_threads = 8
+default_queue_size = 16
+default_report_seconds = 5.0
+
+# Download block size (bytes)
+download_block_size = 1024 * 1024
+
+# Metrics computed for every component
+pipeline_metrics = ["token_count", "type_token_ratio", "hapax_count", "mean_word_length",
+	"punctuation_density", "non_ascii_rate"]
+
+
+# Stage functions (each takes and returns one document dictionary)
+
+def download_document(p_document):
+
+	# Streams a document's TEI file to disk (a temporary file until complete),
+	# hashing it on the way; documents already on disk are not downloaded again
+	filepath = p_document["filepath"]
+	if os.path.isfile(filepath) and not p_document.get("refetch", False):
+		return dict(p_document, downloaded=False)
+
+	# 1. Stream the response in blocks
+	folder = os.path.dirname(filepath)
+	if folder and not os.path.isdir(folder):
+		os.makedirs(folder, exist_ok=True)
+	content_hash = hashlib.sha256()
+	try:
+		with requests.get(p_document["url"], stream=True, timeout=60) as response:
+			response.raise_for_status()
+			with open(filepath + ".part", "wb") as output_file:
+				for block in response.iter_content(download_block_size):
+					content_hash.update(block)
+					output_file.write(block)
+	except Exception:
+		# (no partial file is left behind by a failed download)
+		if os.path.isfile(filepath + ".part"):
+			os.remove(filepath + ".part")
+		raise
+	os.replace(filepath + ".part", filepath)
+
+	return dict(p_document, downloaded=True, size=os.path.getsize(filepath), hash=content_hash.hexdigest())
+
+def segment_document(p_document):
+
+	# Div components (name, text) of a TEI file, read in one streaming pass
+	extractor = MTPO_ComponentExtractor(p_document["filepath"],
+		os.path.splitext(p_document["doc_id"])[0] + "_", p_document["div_depth"])
+
+	return dict(p_document, components=[(name, "\n".join(lines)) for name, lines in extractor.components()])
+
+def measure_document(p_document):
+
+	# Tidy metric rows of every component (the components themselves are dropped)
+	rows = DQMetricsEngine(pipeline_metrics).table((p_document["doc_id"] + "/" + name, text)
+		for name, text in p_document["components"])
+	document = dict(p_document, rows=rows, component_count=len(p_document["components"]))
+	del document["components"]
+
+	return document
+
+def timed_call(p_arguments):
+
+	# Runs a stage function, returning its result and duration (run in a worker)
+	# (exceptions are re-raised as RuntimeError since some, like lxml's parse
+	# errors, cannot be pickled back to the dispatcher)
+	function, item = p_arguments
+	start_time = time.perf_counter()
+	try:
+		result = function(item)
+	except Exception as exception:
+		raise RuntimeError(repr(exception))
+
+	return result, time.perf_counter() - start_time
+
+
+# Classes
+
+class PipelineStage:
+
+	# One stage: a dispatcher thread moving items from its input queue through a
+	# thread or process pool to its output queue
+
+	# Constructor and private methods
+
+	def __init__(self, p_name, p_function, p_workers, p_processes, p_input, p_output):
+
+		# 0. Save parameters
+		self.m_name = p_name
+		self.m_function = p_function
+		self.m_workers = p_workers
+		self.m_processes = p_processes
+		self.m_input = p_input
+		self.m_output = p_output
+
+		# 1. Member field initialization
+
+		# Items finished and failed, seconds spent in the stage function, and the
+		# times of the first item received and the last item finished
+		self.m_completed = 0
+		self.m_errors = []
+		self.m_busy_seconds = 0.0
+		self.m_first_time = None
+		self.m_last_time = None
+
+		# Queue depth samples (see PipelineMonitor)
+		self.m_depth_samples = []
+
+		self.m_thread = threading.Thread(target=self.__dispatch, name=p_name, daemon=True)
+
+	def __dispatch(self):
+
+		executor = self.__new_executor()
+		in_flight = {}
+		finished_input = False
+
+		try:
+			while not finished_input or len(in_flight) > 0:
+
+				# 1. Submit while there is room (waiting for input only when nothing is running)
+				while not finished_input and len(in_flight) < 2 * self.m_workers:
+					try:
+						item = self.m_input.get(0 == len(in_flight))
+					except queue.Empty:
+						break
+					if end_of_stream is item:
+						finished_input = True
+						break
+					if None == self.m_first_time:
+						self.m_first_time = time.time()
+					try:
+						future = executor.submit(timed_call, (self.m_function, item))
+					except BrokenExecutor:
+						# A worker process died: the pool's running items fail
+						# (see 2.) and the item goes to a new pool
+						executor.shutdown(wait=False)
+						executor = self.__new_executor()
+						future = executor.submit(timed_call, (self.m_function, item))
+					in_flight[future] = (item, executor)
+
+				# 2. Pass finished items on (blocking while the next stage's queue is full)
+				if len(in_flight) > 0:
+					done, pending = wait(list(in_flight.keys()), timeout=0.1, return_when=FIRST_COMPLETED)
+					for future in done:
+						item, item_executor = in_flight.pop(future)
+						try:
+							result, seconds = future.result()
+						except BrokenExecutor as exception:
+							self.__record_error(item, exception)
+							if item_executor is executor:
+								executor.shutdown(wait=False)
+								executor = self.__new_executor()
+							continue
+						except Exception as exception:
+							self.__record_error(item, exception)
+							continue
+						self.m_busy_seconds += seconds
+						self.m_completed += 1
+						self.m_last_time = time.time()
+						self.m_output.put(result)
+
+		except Exception as exception:
+
+			# Unexpected failure: fail the items running and those still to come
+			# (consuming them so earlier stages are not left blocked)
+			for item, item_executor in in_flight.values():
+				self.__record_error(item, exception)
+			while not finished_input:
+				item = self.m_input.get()
+				if end_of_stream is item:
+					break
+				self.__record_error(item, exception)
+
+		finally:
+
+			# 3. Tell the next stage this one is done
+			executor.shutdown(wait=0 == len(in_flight))
+			self.m_output.put(end_of_stream)
+
+	def __new_executor(self):
+		return ProcessPoolExecutor(self.m_workers) if self.m_processes else ThreadPoolExecutor(self.m_workers)
+
+	def __record_error(self, p_item, p_exception):
+		self.m_errors.append((p_item.get("doc_id"), repr(p_exception)))
+
+	# Properties
+
+	@property
+	def busy_seconds(self):
+		return self.m_busy_seconds
+
+	@property
+	def completed(self):
+		return self.m_completed
+
+	@property
+	def depth_samples(self):
+		return self.m_depth_samples
+
+	@property
+	def errors(self):
+		return self.m_errors
+
+	@property
+	def input(self):
+		return self.m_input
+
+	@property
+	def name(self):
+		return self.m_name
+
+	@property
+	def output(self):
+		return self.m_output
+
+	@property
+	def workers(self):
+		return self.m_workers
+
+	# Public methods
+
+	def join(self):
+		self.m_thread.join()
+
+	def start(self):
+		self.m_thread.start()
+
+	def throughput(self):
+
+		# Items per second from the stage's first input to its last output
+		if None == self.m_first_time or None == self.m_last_time or self.m_last_time <= self.m_first_time:
+			return 0.0
+		return self.m_completed / (self.m_last_time - self.m_first_time)
+
+
+class PipelineMonitor:
+
+	# Samples each stage's input queue depth and prints progress periodically
+
+	def __init__(self, p_stages, p_report_seconds=default_report_seconds, p_sample_seconds=0.1):
+
+		# 0. Save parameters
+		self.m_stages = p_stages
+		self.m_report_seconds = p_report_seconds
+		self.m_sample_seconds = p_sample_seconds
+
+		# 1. Member field initialization
+		self.m_stop = threading.Event()
+		self.m_thread = threading.Thread(target=self.__run, name="monitor", daemon=True)
+
+	def __run(self):
+
+		last_report = time.time()
+		while not self.m_stop.wait(self.m_sample_seconds):
+			for stage in self.m_stages:
+				stage.depth_samples.append(stage.input.qsize())
+			if None != self.m_report_seconds and time.time() - last_report >= self.m_report_seconds:
+				last_report = time.time()
+				print(" | ".join("{0}: {1} done, queue {2}".format(stage.name, stage.completed, stage.input.qsize())
+					for stage in self.m_stages))
+
+	def start(self):
+		self.m_thread.start()
+
+	def stop(self):
+		self.m_stop.set()
+		self.m_thread.join()
+
+
+class MTPO_Pipeline:
+
+	# Constructor and private methods
+
+	def __init__(self, p_download_threads=default_download_threads, p_segment_processes=None,
+				 p_measure_processes=None, p_queue_size=default_queue_size, p_report_seconds=default_report_seconds):
+
+		# 0. Save parameters
+		cpu_count = os.cpu_count()
+		self.m_download_threads = p_download_threads
+		self.m_segment_processes = p_segment_processes if None != p_segment_processes else cpu_count
+		self.m_measure_processes = p_measure_processes if None != p_measure_processes else max(1, cpu_count // 2)
+		self.m_queue_size = p_queue_size
+		self.m_report_seconds = p_report_seconds
+
+		# 1. Stages of the last run
+		self.m_stages = []
+
+	def __stages(self, p_queue_size):
+
+		# Stages linked by queues of the given length (0 is unbounded)
+		queues = [queue.Queue(p_queue_size) for index in range(4)]
+		return [
+			PipelineStage("download", download_document, self.m_download_threads, False, queues[0], queues[1]),
+			PipelineStage("segment", segment_document, self.m_segment_processes, True, queues[1], queues[2]),
+			PipelineStage("measure", measure_document, self.m_measure_processes, True, queues[2], queues[3])
+		]
+
+	# Properties
+
+	@property
+	def stages(self):
+		return self.m_stages
+
+	# Public methods
+
+	def report(self, p_wall_seconds):
+
+		# Per-stage counts, throughput, busy time and queue depths
+		lines = []
+		for stage in self.m_stages:
+			depths = stage.depth_samples
+			lines.append("{0}: {1} documents, {2} errors, {3:.2f} docs/s, {4:.1f}s busy over {5} workers, "
+				"queue mean {6:.1f} max {7}".format(stage.name, stage.completed, len(stage.errors),
+				stage.throughput(), stage.busy_seconds, stage.workers,
+				sum(depths) / float(len(depths)) if len(depths) > 0 else 0.0, max(depths) if len(depths) > 0 else 0))
+			for doc_id, error in stage.errors:
+				lines.append("\t{0}: {1}".format(doc_id, error))
+		lines.append("Wall clock: {0:.2f}s".format(p_wall_seconds))
+
+		return "\n".join(lines)
+
+	def run(self, p_documents, p_sink, p_serial=False):
+
+		# Runs documents (dictionaries of doc_id, url, filepath and div_depth)
+		# through all stages, calling p_sink with each finished document in the
+		# calling thread
+
+		# 1. Overlapped: all stages at once, linked by bounded queues
+		if not p_serial:
+			self.m_stages = self.__stages(self.m_queue_size)
+			monitor = PipelineMonitor(self.m_stages, self.m_report_seconds)
+			for stage in self.m_stages:
+				stage.start()
+			monitor.start()
+
+			# A. Feed the first stage (blocking when it falls behind)
+			feeder = threading.Thread(target=MTPO_Pipeline.feed, args=(p_documents, self.m_stages[0].input), daemon=True)
+			feeder.start()
+
+			# B. Drain the last stage
+			output = self.m_stages[len(self.m_stages) - 1].output
+			while True:
+				document = output.get()
+				if end_of_stream is document:
+					break
+				p_sink(document)
+			for stage in self.m_stages:
+				stage.join()
+			monitor.stop()
+
+		# 2. Serial: each stage finishes all documents before the next begins
+		else:
+			self.m_stages = self.__stages(0)
+			monitor = PipelineMonitor(self.m_stages, self.m_report_seconds)
+			monitor.start()
+			documents = list(p_documents)
+			for stage in self.m_stages:
+				for document in documents + [end_of_stream]:
+					stage.input.put(document)
+				stage.start()
+				stage.join()
+				documents = []
+				while True:
+					document = stage.output.get()
+					if end_of_stream is document:
+						break
+					documents.append(document)
+			monitor.stop()
+			for document in documents:
+				p_sink(document)
+
+	# Static methods
+
+	@staticmethod
+	def feed(p_documents, p_queue):
+		for document in p_documents:
+			p_queue.put(document)
+		p_queue.put(end_of_stream)
+
+
+# Main script
+
+def document_url(p_doc_id, p_catalog, p_base_url=None):
+
+	# URL of a document: from the catalog, or under a base URL by its genre's site folder
+	document = p_catalog.document(p_doc_id)
+	if None == p_base_url and None != document and document["url"]:
+		return document["url"]
+	genre = p_catalog.genre(p_doc_id)
+	folder = mtpo["url_folder_dict"].get(genre) or "works"
+
+	return (p_base_url if None != p_base_url else mtpo["urls"]["base"]) + folder + "/" + p_doc_id
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define pipeline possibilities
+	parser.add_argument("doc_ids", nargs="*", help="DocIds of MTPO documents (default: all documents of the genre)")
+	parser.add_argument("-g", "--genre", default="autobio", help="Genre of documents to process when no docIds are given")
+	parser.add_argument("-s", "--scrape", action="store_true", help="Scrape the MTPO landing pages for new documents first")
+	parser.add_argument("-b", "--base-url", help="Base URL of TEI folders (default: each document's catalogued URL)")
+	parser.add_argument("-f", "--folder", help="Folder for downloads (default: the folder of each document's genre)")
+	parser.add_argument("-d", "--depth", type=int, default=1, help="Depth of divs to measure as components (1 = top-level)")
+	parser.add_argument("-t", "--threads", type=int, default=default_download_threads, help="Download threads")
+	parser.add_argument("-p", "--processes", type=int, help="Segmenting processes (default: one per CPU)")
+	parser.add_argument("-m", "--measure-processes", type=int, help="Measuring processes (default: half the CPUs)")
+	parser.add_argument("-q", "--queue", type=int, default=default_queue_size, help="Length of the queues between stages")
+	parser.add_argument("-o", "--output", default=mtpo["folders"]["output"] + "pipeline_metrics.csv",
+		help="CSV file for component metrics")
+	parser.add_argument("--serial", action="store_true", help="Run the stages one after another (for comparison)")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 0. Get arguments from the terminal
+	arguments = parse_arguments()
+	catalog = MTPO_Catalog.default()
+
+	# 1. Documents to process
+	if arguments.scrape:
+		scrape_and_build_file_urls([arguments.genre], p_catalog=catalog)
+	doc_ids = arguments.doc_ids if len(arguments.doc_ids) > 0 else catalog.documents(arguments.genre)
+	documents = [{
+
+		"doc_id": doc_id,
+		"url": document_url(doc_id, catalog, arguments.base_url),
+		"filepath": os.path.join(arguments.folder, doc_id) if arguments.folder else catalog.filepath(doc_id),
+		"div_depth": arguments.depth
+	} for doc_id in doc_ids]
+
+	# 2. Run the pipeline, writing metric rows and recording downloads as documents finish
+	start_time = time.time()
+	pipeline = MTPO_Pipeline(arguments.threads, arguments.processes, arguments.measure_processes, arguments.queue)
+	with open(arguments.output, "w", newline="") as output_file:
+		writer = csv.writer(output_file)
+		writer.writerow(["doc_id", "component", "metric", "value"])
+
+		def sink(p_document):
+			writer.writerows(p_document["rows"])
+			if p_document["downloaded"] and catalog.contains(p_document["doc_id"]):
+				catalog.record_fetch(p_document["doc_id"], p_document["size"], p_document["hash"], p_document["url"])
+
+		pipeline.run(documents, sink, arguments.serial)
+
+	# 3. Report per-stage throughput and queue depths
+	print(pipeline.report(time.time() - start_time))
+
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,579 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Structural queries over the TEI XML files of Mark Twain Project Online
+# 		   (http://www.marktwainproject.org/), evaluated together in a single
+# 		   streaming pass over a file
+
+# Query language
+# A query is a list of steps separated by a space (descendant) or ">" (child),
+# e.g. 'div[type=letter]:has(date[when^=1906]) persName:contains("Howells")'
+#
+# Step:  tag name or * followed by any of
+#   [attr]            attribute is present
+#   [attr=value]      attribute equals value (also != ^= $= *= and ~= for a regex)
+#   :has(step)        a descendant matches the given single step
+#   :contains(text)   element text contains text  (last step only)
+#   :matches(regex)   element text matches regex   (last step only)
+#
+# Values may be bare or quoted with ' or ". Tag and attribute names are matched
+# without their namespaces. Element text is the element's text and that of its
+# descendants with whitespace collapsed.
+
+# Imports
+
+# Built-ins
+import argparse 			  	# Terminal arguments
+from collections import OrderedDict
+import re
+
+# Third party
+from lxml import etree 			# Streaming parse of TEI XML files
+
+# Custom
+from mtpo_catalog import MTPO_Catalog, catalog_document # Catalog of MTPO documents by docId and genre
+from mtpo_components import local_name
+from mtpo_store import open_tei # Reads raw, compressed or stored TEI files
+
+
+# Globals
+
+# Tokens of the query language
+query_token_pattern = re.compile(r"""
+	\s*(?P<child>>)\s* |
+	(?P<space>\s+) |
+	(?P<tag>\*|[\w.\-]+) |
+	\[\s*(?P<attribute>[\w.\-]+)\s*(?:(?P<operator>!=|\^=|\$=|\*=|~=|=)\s*(?P<value>"[^"]*"|'[^']*'|[^\]]*?))?\s*\] |
+	:(?P<pseudo>has|contains|matches)\(
+	""", re.VERBOSE)
+
+# Attribute value tests by operator
+attribute_operators = {
+
+	"=": lambda value, test: value == test,
+	"!=": lambda value, test: value != test,
+	"^=": lambda value, test: value.startswith(test),
+	"$=": lambda value, test: value.endswith(test),
+	"*=": lambda value, test: test in value,
+	"~=": lambda value, test: None != test.search(value)
+}
+
+
+# Utility functions
+
+def element_attributes(p_element):
+	return { local_name(name): value for name, value in p_element.attrib.items() }
+
+def element_text(p_element):
+
+	# Text of an element and its descendants (comments contribute only their tails)
+	parts = []
+	def walk(p_node):
+		if isinstance(p_node.tag, str) and p_node.text:
+			parts.append(p_node.text)
+		for child in p_node:
+			walk(child)
+			if child.tail:
+				parts.append(child.tail)
+	walk(p_element)
+
+	return " ".join("".join(parts).split())
+
+def unquote(p_value):
+	if len(p_value) > 1 and p_value[0] in "\"'" and p_value[0] == p_value[len(p_value) - 1]:
+		return p_value[1:len(p_value) - 1]
+	return p_value.strip()
+
+
+# Classes
+
+class QueryStep:
+
+	# One step of a query: a tag, attribute predicates, text predicates and
+	# :has() descendant constraints
+
+	def __init__(self):
+
+		self.m_tag = "*"
+		self.m_attribute_tests = []
+		self.m_text_tests = []
+		self.m_has_steps = []
+
+	@property
+	def has_steps(self):
+		return self.m_has_steps
+
+	@property
+	def text_tests(self):
+		return self.m_text_tests
+
+	def matches_element(self, p_tag, p_attributes):
+
+		# 1. Tag and attribute predicates
+		if "*" != self.m_tag and self.m_tag != p_tag:
+			return False
+		for name, operator, test in self.m_attribute_tests:
+			if name not in p_attributes:
+				return False
+			if None != operator and not attribute_operators[operator](p_attributes[name], test):
+				return False
+
+		return True
+
+	def matches_text(self, p_text):
+
+		# 1. Text predicates
+		for operator, test in self.m_text_tests:
+			if "contains" == operator and test not in p_text:
+				return False
+			if "matches" == operator and None == test.search(p_text):
+				return False
+
+		return True
+
+
+class StructuralQuery:
+
+	# Compiled query: steps and the combinators (" " or ">") between them
+
+	def __init__(self, p_query):
+
+		# 0. Save parameters
+		self.m_query = p_query
+
+		# 1. Member field initialization
+		self.m_steps = []
+		self.m_combinators = []
+
+		# 2. Compile the query
+		position = StructuralQuery.parse_steps(p_query.strip(), 0, self.m_steps, self.m_combinators)
+		if position != len(p_query.strip()) or 0 == len(self.m_steps):
+			raise ValueError("Could not parse query '{0}' at position {1}".format(p_query, position))
+		for step in self.m_steps[0:len(self.m_steps) - 1]:
+			if len(step.text_tests) > 0:
+				raise ValueError("Text predicates are only supported on the last step of '{0}'".format(p_query))
+
+	@property
+	def combinators(self):
+		return self.m_combinators
+
+	@property
+	def query(self):
+		return self.m_query
+
+	@property
+	def steps(self):
+		return self.m_steps
+
+	# Static methods
+
+	@staticmethod
+	def parse_steps(p_query, p_position, p_steps, p_combinators, p_single_step=False):
+
+		# Parses steps from the given position, returning the position where parsing stopped
+		position = p_position
+		step = None
+
+		while position < len(p_query):
+
+			# A. Closing parenthesis of a :has() step
+			if p_single_step and ")" == p_query[position]:
+				break
+
+			match = query_token_pattern.match(p_query, position)
+			if None == match:
+				break
+
+			# B. Combinator between steps (whitespace is skipped inside :has())
+			if match.group("child") or match.group("space"):
+				if p_single_step and None == step and match.group("space"):
+					position = match.end()
+					continue
+				if p_single_step or None == step:
+					break
+				p_combinators.append(">" if match.group("child") else " ")
+				step = None
+				position = match.end()
+				continue
+
+			# C. Tag name starts a new step (a step may also begin with a predicate, meaning *)
+			if None == step:
+				step = QueryStep()
+				p_steps.append(step)
+				if match.group("tag"):
+					step.m_tag = match.group("tag")
+					position = match.end()
+					continue
+			elif match.group("tag"):
+				raise ValueError("Unexpected tag name in '{0}' at position {1}".format(p_query, position))
+
+			# D. Attribute predicate
+			if match.group("attribute"):
+				operator = match.group("operator")
+				test = unquote(match.group("value")) if None != operator else None
+				if "~=" == operator:
+					test = re.compile(test)
+				step.m_attribute_tests.append((match.group("attribute"), operator, test))
+
+			# E. Pseudo-class predicates
+			elif "has" == match.group("pseudo"):
+				has_steps = []
+				position = StructuralQuery.parse_steps(p_query, match.end(), has_steps, [], True)
+				while position < len(p_query) and p_query[position].isspace():
+					position += 1
+				if position >= len(p_query) or ")" != p_query[position] or 1 != len(has_steps):
+					raise ValueError("Could not parse :has() in '{0}' at position {1}".format(p_query, position))
+				step.m_has_steps.append(has_steps[0])
+				position += 1
+				continue
+			else:
+				end = StructuralQuery.find_closing_parenthesis(p_query, match.end())
+				test = unquote(p_query[match.end():end])
+				if "matches" == match.group("pseudo"):
+					test = re.compile(test)
+				step.m_text_tests.append((match.group("pseudo"), test))
+				position = end + 1
+				continue
+
+			position = match.end()
+
+		# 2. A trailing combinator is an error
+		if len(p_combinators) >= len(p_steps) and len(p_steps) > 0:
+			raise ValueError("Query '{0}' ends with a combinator".format(p_query))
+
+		return position
+
+	@staticmethod
+	def find_closing_parenthesis(p_query, p_position):
+
+		# Closing parenthesis of a text predicate, skipping over a quoted argument
+		position = p_position
+		while position < len(p_query) and p_query[position].isspace():
+			position += 1
+		if position < len(p_query) and p_query[position] in "\"'":
+			position = p_query.find(p_query[position], position + 1)
+			if -1 == position:
+				raise ValueError("Unterminated quote in '{0}'".format(p_query))
+		end = p_query.find(")", position)
+		if -1 == end:
+			raise ValueError("Missing ')' in '{0}'".format(p_query))
+
+		return end
+
+
+class StreamNode:
+
+	# State kept for each open element during a streaming pass
+
+	__slots__ = ["index", "tag", "attributes", "matches", "reach", "watchers",
+				 "candidates", "pending", "keeps_text"]
+
+	def __init__(self, p_index, p_tag, p_attributes, p_query_count):
+
+		# Preorder index of the element, its tag and its attributes
+		self.index = p_index
+		self.tag = p_tag
+		self.attributes = p_attributes
+
+		# Per query: step index -> True (matched), None (waiting on :has()) or False
+		self.matches = [{} for query_index in range(p_query_count)]
+
+		# Per query: step indices matched by this element or its ancestors
+		self.reach = [None] * p_query_count
+
+		# [query index, step index, :has() steps not yet seen among descendants]
+		self.watchers = []
+
+		# Queries whose last step this element matches
+		self.candidates = []
+
+		# Results waiting on this element's :has() constraints
+		self.pending = []
+
+		# Whether this element's text is needed when it closes
+		self.keeps_text = False
+
+
+class MTPO_QueryEngine:
+
+	# Evaluates many structural queries at once in one streaming pass over a TEI file
+
+	# Constructor and private methods
+
+	def __init__(self, p_queries):
+
+		# 0. Save parameters
+		self.m_queries = [StructuralQuery(query) for query in p_queries]
+
+	def __chain_exists(self, p_query_index, p_path):
+
+		# Whether the query's steps match along the given root-to-element path
+		# with the last step at the last element
+		query = self.m_queries[p_query_index]
+		memo = {}
+
+		def matched(p_position, p_step):
+
+			if (p_position, p_step) in memo:
+				return memo[(p_position, p_step)]
+
+			result = True == p_path[p_position].matches[p_query_index].get(p_step)
+			if result and p_step > 0:
+				if ">" == query.combinators[p_step - 1]:
+					result = p_position > 0 and matched(p_position - 1, p_step - 1)
+				else:
+					result = any(matched(position, p_step - 1) for position in range(p_position))
+
+			memo[(p_position, p_step)] = result
+			return result
+
+		return matched(len(p_path) - 1, len(query.steps) - 1)
+
+	def __open(self, p_element, p_index, p_parent):
+
+		node = StreamNode(p_index, local_name(p_element.tag), element_attributes(p_element), len(self.m_queries))
+
+		for query_index, query in enumerate(self.m_queries):
+
+			parent_matches = p_parent.matches[query_index] if None != p_parent else {}
+			parent_reach = p_parent.reach[query_index] if None != p_parent else frozenset()
+
+			# 1. Steps this element can match given its ancestors' matches
+			matched_steps = []
+			for step_index, step in enumerate(query.steps):
+
+				if step_index > 0:
+					if ">" == query.combinators[step_index - 1]:
+						if False == parent_matches.get(step_index - 1, False):
+							continue
+					elif step_index - 1 not in parent_reach:
+						continue
+
+				if not step.matches_element(node.tag, node.attributes):
+					continue
+
+				# A. Steps with :has() constraints wait until the element closes
+				if len(step.has_steps) > 0:
+					node.matches[query_index][step_index] = None
+					node.watchers.append([query_index, step_index, list(step.has_steps)])
+				else:
+					node.matches[query_index][step_index] = True
+				matched_steps.append(step_index)
+
+			# 2. Steps reachable from this element's descendants
+			node.reach[query_index] = parent_reach.union(matched_steps) if len(matched_steps) > 0 else parent_reach
+
+			# 3. Element is a possible result of this query
+			if len(query.steps) - 1 in node.matches[query_index]:
+				node.candidates.append(query_index)
+
+		return node
+
+	def __resolve(self, p_query_index, p_result, p_path):
+
+		# 1. Results wait on the outermost element of their path still waiting on :has()
+		for node in p_path:
+			if None in node.matches[p_query_index].values():
+				node.pending.append((p_query_index, p_result, p_path))
+				return None
+
+		# 2. Otherwise the result stands if a complete chain of steps exists
+		if self.__chain_exists(p_query_index, p_path):
+			return (p_query_index, p_result)
+
+		return None
+
+	# Public methods
+
+	def run(self, p_source):
+
+		# Results by query string, in document order
+		results = OrderedDict((query.query, []) for query in self.m_queries)
+		for query_index, result in self.stream(p_source):
+			results[self.m_queries[query_index].query].append(result)
+		for query in results:
+			results[query].sort(key=lambda result: result["index"])
+
+		return results
+
+	def stream(self, p_source):
+
+		# Yields (query index, result) as soon as each result is decided. A result
+		# is a dict of the element's preorder index, tag, attributes and text.
+
+		# 0. Open elements and the number of them whose text is needed when they
+		#    close (possible results and possible :has() matches with text predicates)
+		stack = []
+		open_text_elements = 0
+		index = 0
+
+		# 1. Walk the file's start and end tags (paths are opened as raw,
+		#    compressed or stored files and decompressed while streaming)
+		source = open_tei(p_source) if isinstance(p_source, str) else p_source
+		for event, element in etree.iterparse(source, events=("start", "end"),
+											  huge_tree=True, resolve_entities=False):
+
+			# A. Open element: match it against every query's steps
+			if "start" == event:
+				node = self.__open(element, index, stack[len(stack) - 1] if len(stack) > 0 else None)
+				node.keeps_text = len(node.candidates) > 0 or \
+					any(len(has_step.text_tests) > 0 and has_step.matches_element(node.tag, node.attributes)
+						for ancestor in stack for watcher in ancestor.watchers for has_step in watcher[2])
+				stack.append(node)
+				open_text_elements += 1 if node.keeps_text else 0
+				index += 1
+				continue
+
+			node = stack.pop()
+			text = None
+
+			# B. Closed element: satisfy the :has() constraints of open ancestors
+			for ancestor in stack:
+				for watcher in ancestor.watchers:
+					for has_step in list(watcher[2]):
+						if has_step.matches_element(node.tag, node.attributes):
+							if len(has_step.text_tests) > 0:
+								text = element_text(element) if None == text else text
+								if not has_step.matches_text(text):
+									continue
+							watcher[2].remove(has_step)
+
+			# C. Decide this element's own :has() constraints
+			for query_index, step_index, remaining_steps in node.watchers:
+				node.matches[query_index][step_index] = 0 == len(remaining_steps)
+			node.watchers = []
+
+			# D. Possible results of this element
+			open_text_elements -= 1 if node.keeps_text else 0
+			if len(node.candidates) > 0:
+
+				text = element_text(element) if None == text else text
+
+				for query_index in node.candidates:
+					query = self.m_queries[query_index]
+					if not query.steps[len(query.steps) - 1].matches_text(text):
+						continue
+					result = {
+
+						"index": node.index,
+						"tag": node.tag,
+						"attributes": node.attributes,
+						"text": text
+					}
+					decided = self.__resolve(query_index, result, stack + [node])
+					if None != decided:
+						yield decided
+
+			# E. Results that were waiting on this element
+			for query_index, result, path in node.pending:
+				decided = self.__resolve(query_index, result, path)
+				if None != decided:
+					yield decided
+			node.pending = []
+
+			# F. Release elements whose text no open element still needs
+			if 0 == open_text_elements:
+				element.clear()
+				parent = element.getparent()
+				if None != parent:
+					while None != element.getprevious():
+						del parent[0]
+
+		if source != p_source:
+			source.close()
+
+
+# Reference implementation
+
+def evaluate_dom(p_source, p_queries):
+
+	# Evaluates queries over a fully parsed tree, element by element, as the
+	# reference that streaming results are checked against
+	queries = [StructuralQuery(query) for query in p_queries]
+	source = open_tei(p_source) if isinstance(p_source, str) else p_source
+	tree = etree.parse(source, etree.XMLParser(huge_tree=True, resolve_entities=False))
+	if source != p_source:
+		source.close()
+	elements = [element for element in tree.getroot().iter() if isinstance(element.tag, str)]
+
+	def step_matches(p_element, p_step, p_last):
+		if not p_step.matches_element(local_name(p_element.tag), element_attributes(p_element)):
+			return False
+		for has_step in p_step.has_steps:
+			if not any(has_step.matches_element(local_name(descendant.tag), element_attributes(descendant)) and
+					   has_step.matches_text(element_text(descendant))
+					   for descendant in p_element.iterdescendants() if isinstance(descendant.tag, str)):
+				return False
+		return not p_last or p_step.matches_text(element_text(p_element))
+
+	def chain_matches(p_query, p_element, p_step_index):
+		if not step_matches(p_element, p_query.steps[p_step_index], p_step_index == len(p_query.steps) - 1):
+			return False
+		if 0 == p_step_index:
+			return True
+		if ">" == p_query.combinators[p_step_index - 1]:
+			parent = p_element.getparent()
+			return None != parent and chain_matches(p_query, parent, p_step_index - 1)
+		return any(chain_matches(p_query, ancestor, p_step_index - 1) for ancestor in p_element.iterancestors())
+
+	results = OrderedDict((query.query, []) for query in queries)
+	for index, element in enumerate(elements):
+		for query in queries:
+			if chain_matches(query, element, len(query.steps) - 1):
+				results[query.query].append({
+
+					"index": index,
+					"tag": local_name(element.tag),
+					"attributes": element_attributes(element),
+					"text": element_text(element)
+				})
+
+	return results
+
+def verify(p_filepath, p_queries):
+
+	# Whether streaming and reference results agree for the given file and queries
+	return MTPO_QueryEngine(p_queries).run(p_filepath) == evaluate_dom(p_filepath, p_queries)
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define query possibilities
+	parser.add_argument("filename",
+						type=catalog_document,
+						help="Filename of MTPO title to query")
+	parser.add_argument("queries", nargs="+", help="Structural queries to evaluate in one pass")
+	parser.add_argument("-f", "--folder", help="Folder of the TEI file (defaults to the folder of its genre)")
+	parser.add_argument("-v", "--verify", action="store_true", help="Check results against the reference implementation")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 1. Get arguments from the terminal
+	arguments = parse_arguments()
+	filepath = arguments.folder + arguments.filename if arguments.folder else \
+		MTPO_Catalog.default().filepath(arguments.filename)
+
+	# 2. Evaluate all queries in one pass over the file
+	results = MTPO_QueryEngine(arguments.queries).run(filepath)
+
+	# 3. Output the results of each query
+	for query in results:
+		print("{0}: {1} results".format(query, len(results[query])))
+		for result in results[query]:
+			print("\t{0}".format(result["text"]))
+
+	# 4. Optionally check against the reference implementation
+	if arguments.verify:
+		print("Matches reference: {0}".format(results == evaluate_dom(filepath, arguments.queries)))
+
+
+if "__main__" == __name__:
+	main()
@@ -10,13 +10,16 @@
 # NOTE: Requires Python 3+
 
 import argparse 			  # Terminal arguments
+import hashlib 				  # Content hashes of downloads
 from itertools import chain
 import os 					  # File/folder operations
 import requests 			  # Download HTML files
-from subprocess import call   # Curl files
+from subprocess import call, Popen, PIPE # Curl files
 from bs4 import BeautifulSoup # Parse HTML
 
+from mtpo_catalog import MTPO_Catalog # Catalog of MTPO documents by docId and genre
 from mtpo_commons import mtpo # Data about the Mark Twain Project TEI collection
+from mtpo_store import MTPO_CorpusStore # Compressed, deduplicated TEI file store
 
 
 # Possible choices of work types to download
@@ -62,17 +65,21 @@ def format_folder(p_folder):
 
 	return formatted_folder
 
-def work_type(p_filename):
+def file_hash(p_filepath):
 
-	# Look for worktype of file listed in known files dictionary
-	file_work_type = None
-	print(mtpo["known_files"])
-	for work_type in mtpo["known_files"]:
-		if p_filename in mtpo["known_files"][work_type]:
-			file_work_type = work_type
-			break
-			
-	return file_work_type
+	# SHA-256 of a downloaded file (as the corpus store hashes content)
+	content_hash = hashlib.sha256()
+	with open(p_filepath, "rb") as input_file:
+		for block in iter(lambda: input_file.read(1024 * 1024), b""):
+			content_hash.update(block)
+
+	return content_hash.hexdigest()
+
+def work_type(p_filename, p_catalog=None):
+
+	# Look up the worktype of a file in the MTPO catalog
+	catalog = p_catalog if None != p_catalog else MTPO_Catalog.default()
+	return catalog.genre(p_filename)
 
 # Primary functions
 def make_output_folders(p_root_folder, p_work_types):
@@ -90,7 +97,7 @@ def make_output_folders(p_root_folder, p_work_types):
 			if not os.path.exists(mtpo["folders"][folder_name]):
 				os.mkdir(mtpo["folders"][folder_name])
 
-def scrape_and_build_file_urls(p_work_types, p_landing_pages=None):
+def scrape_and_build_file_urls(p_work_types, p_landing_pages=None, p_catalog=None):
 
 	# Determine requested landing pages
 	# requested_landing_pages = []
@@ -105,6 +112,10 @@ def scrape_and_build_file_urls(p_work_types, p_landing_pages=None):
 	# urls_by_worktype = { work_type: [] for work_type in mtpo["work_types"] }
 	urls_by_worktype = { work_type: [] for work_type in p_work_types }
 
+	# Documents found on the landing pages, catalogued together after scraping
+	catalog = p_catalog if None != p_catalog else MTPO_Catalog.default()
+	found_documents = []
+
 	# 1. Scrape given landing pages (or all if none given)
 	for page in urls_by_landing:
 
@@ -133,21 +144,71 @@ def scrape_and_build_file_urls(p_work_types, p_landing_pages=None):
 			filename = filename[0:filename.find(";")]
 			new_url = base_url + folder_name + os.sep + filename
 
-			# iii. Save new url (sorted by work type)
-			my_work_type = work_type(filename)
+			# iii. Documents not yet catalogued take the genre of their landing page,
+			#      if it lists only one genre
+			my_work_type = work_type(filename, catalog)
+			if None == my_work_type and 1 == len(mtpo["landing_genre_dict"][page]) and \
+			   mtpo["landing_genre_dict"][page][0] in mtpo["url_folder_dict"]:
+				my_work_type = mtpo["landing_genre_dict"][page][0]
+			if None != my_work_type:
+				found_documents.append({
+
+					"doc_id": filename,
+					"genre": my_work_type,
+					"title": None if catalog.contains(filename) else tag.get_text(" ", strip=True),
+					"url": new_url
+				})
+
+			# iv. Save new url (sorted by work type)
 			if None != my_work_type and my_work_type in urls_by_worktype:
 				urls_by_worktype[my_work_type].append(new_url)
 
-	print("Finish scrape\n{0}".format(urls_by_worktype))
+	# 2. Add new documents and their URLs to the catalog in one transaction
+	catalog.update(found_documents)
+
+	print("Finish scrape: {0}".format({ work_type: len(urls) for work_type, urls in urls_by_worktype.items() }))
 
 	return list(chain.from_iterable(urls_by_worktype.values()))
 
-def curl_urls(p_urls, p_output_folder):
+def curl_urls(p_urls, p_output_folder, p_store=None, p_catalog=None, p_skip_fetched=False):
+
+	catalog = p_catalog if None != p_catalog else MTPO_Catalog.default()
 
 	# Get all tei files from the listed urls and store in tei folder
 	for url in p_urls:
-		with open(p_output_folder + os.path.basename(url), "w") as new_tei_file:
-			response = call(["curl", url], stdout=new_tei_file)
+
+		# A. Optionally fetch only documents the catalog has no download for
+		doc_id = os.path.basename(url)
+		if p_skip_fetched and catalog.fetched(doc_id):
+			continue
+
+		# B. Compress each download straight into the store (deduplicated by
+		#    content) under a temporary path, replacing any stored copy only once
+		#    curl succeeds (HTTP errors and interrupted transfers leave no record)
+		if None != p_store:
+			path = url[len(mtpo["urls"]["base"]):]
+			curl_process = Popen(["curl", "-s", "-f", url], stdout=PIPE)
+			content_hash = p_store.add_stream(curl_process.stdout, path + ".part")
+			if 0 != curl_process.wait():
+				print("Failed to download {0}".format(url))
+				p_store.remove(path + ".part")
+				continue
+			p_store.move(path + ".part", path)
+			catalog.record_fetch(doc_id, p_store.size(path), content_hash, url)
+			continue
+
+		# (downloaded to a temporary file that replaces an existing one only once complete)
+		filepath = p_output_folder + doc_id
+		with open(filepath + ".part", "wb") as new_tei_file:
+			response = call(["curl", "-f", url], stdout=new_tei_file)
+		if 0 != response:
+			print("Failed to download {0}".format(url))
+			os.remove(filepath + ".part")
+			continue
+		os.replace(filepath + ".part", filepath)
+
+		# C. Record the download in the catalog
+		catalog.record_fetch(doc_id, os.path.getsize(filepath), file_hash(filepath), url)
 
 def parse_arguments():
 
@@ -159,6 +220,8 @@ def parse_arguments():
 						choices=["all"] + mtpo["work_types"],
 						help="Type of work to retrieve from Mark Twain Project")
 	parser.add_argument("-o", "--output", help="Folder to output requested files. Defaults to current folder.")
+	parser.add_argument("-s", "--store", action="store_true", help="Save files compressed in the MTPO corpus store instead.")
+	parser.add_argument("-u", "--update", action="store_true", help="Only download files the MTPO catalog has not fetched.")
 
 	# 3. Parse arguments passed in through the terminal
 	arguments = parser.parse_args()
@@ -167,13 +230,13 @@ def parse_arguments():
 	work_types = mtpo["work_types"] if "all" == arguments.worktype else [arguments.worktype]
 	output = format_folder(arguments.output) if arguments.output else "." + os.sep
 
-	return work_types, output
+	return work_types, output, arguments.store, arguments.update
 
 
 def main():
 
 	# 0. Retrieve arguments from terminal
-	work_types, output = parse_arguments()
+	work_types, output, use_store, update_only = parse_arguments()
 
 	print("Work type: {0}\nOutput: {1}".format(work_types, output))
 
@@ -185,7 +248,8 @@ def main():
 
 	# 2. Download
 	# curl_urls(urls_to_retrieve, mtpo["folders"]["autobiographies"])
-	curl_urls(urls_to_retrieve, os.getcwd() + os.sep + "output" + os.sep)
+	curl_urls(urls_to_retrieve, os.getcwd() + os.sep + "output" + os.sep,
+		MTPO_CorpusStore() if use_store else None, p_skip_fetched=update_only)
 
 
 if "__main__" == __name__:
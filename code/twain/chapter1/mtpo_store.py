@@ -0,0 +1,378 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Compressed, deduplicated local store of the TEI XML files of Mark Twain
+# 		   Project Online (http://www.marktwainproject.org/), read back as
+# 		   decompressing streams
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Layout
+# <store>/objects/ab/abcdef...xml.zst   one compressed file per distinct content hash
+# <store>/index.json                    { "paths": { path: hash }, "objects": { hash: info } }
+#
+# Paths are relative to the MTPO works folder (e.g. "autobiographies/formatted/MTDP10362.xml").
+# Files are compressed with zstd if the zstandard package is installed and gzip otherwise.
+
+# Imports
+
+# Built-ins
+import argparse 			  	# Terminal arguments
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+# Third party (optional)
+try:
+	import zstandard			# zstd compression (falls back to gzip)
+except ImportError:
+	zstandard = None
+
+# Custom
+from mtpo_commons import mtpo   # Data about the Mark Twain Project TEI collection
+
+
+# Globals
+
+# Default store location
+mtpo["folders"]["store"] = mtpo["folders"]["works"] + "store" + os.sep
+
+# Compressed file extensions by compression method
+store_extensions = { "gzip": ".gz", "zstd": ".zst" }
+
+# Read/write block size (bytes)
+block_size = 1024 * 1024
+
+
+# Utility functions
+
+def default_compression():
+	return "zstd" if None != zstandard else "gzip"
+
+def open_compressed(p_filepath, p_mode, p_compression):
+
+	# Binary stream that (de)compresses on the fly
+	if "zstd" == p_compression:
+		if None == zstandard:
+			raise ImportError("zstandard is required to read {0}".format(p_filepath))
+		return zstandard.open(p_filepath, p_mode)
+
+	return gzip.open(p_filepath, p_mode)
+
+def open_tei(p_filepath, p_store=None):
+
+	# Binary stream of a TEI file, whether it is raw, compressed on its own, or in the store
+
+	# 1. Files on disk (compressed by extension or raw)
+	if os.path.isfile(p_filepath):
+		for compression, extension in store_extensions.items():
+			if p_filepath.endswith(extension):
+				return open_compressed(p_filepath, "rb", compression)
+		return open(p_filepath, "rb")
+
+	# 2. Otherwise look for the file in the store
+	store = p_store if None != p_store else MTPO_CorpusStore.default()
+	if None != store and store.contains(p_filepath):
+		return store.open(p_filepath)
+
+	raise FileNotFoundError("TEI file not found on disk or in store: {0}".format(p_filepath))
+
+
+# Classes
+
+class MTPO_CorpusStore:
+
+	# Default store shared by readers in this process
+	s_default_store = None
+
+	# Constructor and private methods
+
+	def __init__(self, p_store_folder=mtpo["folders"]["store"], p_compression=None):
+
+		# 0. Save parameters
+		self.m_store_folder = p_store_folder
+		self.m_compression = p_compression if None != p_compression else default_compression()
+
+		# 1. Member field initialization
+
+		# Content hash by relative path
+		self.m_paths = {}
+
+		# Compression and sizes by content hash
+		self.m_objects = {}
+
+		# Relative paths by file name (MTPO file names are unique document ids)
+		self.m_names = {}
+
+		# 2. Read the index if the store exists
+		self.__read_index()
+
+	def __object_filepath(self, p_hash):
+		info = self.m_objects[p_hash]
+		return self.m_store_folder + "objects" + os.sep + p_hash[0:2] + os.sep + \
+			p_hash + ".xml" + store_extensions[info["compression"]]
+
+	def __read_index(self):
+
+		index_filepath = self.m_store_folder + "index.json"
+		if not os.path.isfile(index_filepath):
+			return
+
+		with open(index_filepath, "r") as index_file:
+			index_json = json.load(index_file)
+
+		self.m_paths = index_json["paths"]
+		self.m_objects = index_json["objects"]
+		for path in self.m_paths:
+			self.m_names[os.path.basename(path)] = path
+
+	def __relative_path(self, p_path):
+
+		# Paths inside the works folder are stored relative to it
+		path = os.path.abspath(p_path)
+		if path.startswith(os.path.abspath(mtpo["folders"]["works"]) + os.sep):
+			path = os.path.relpath(path, mtpo["folders"]["works"])
+		else:
+			path = p_path
+
+		return path.replace(os.sep, "/")
+
+	def __release(self, p_hash):
+
+		# Deletes stored content once no path refers to it
+		if p_hash not in self.m_paths.values():
+			os.remove(self.__object_filepath(p_hash))
+			del self.m_objects[p_hash]
+
+	def __resolve(self, p_path):
+
+		# Stored relative path for a path or a bare file name
+		path = self.__relative_path(p_path)
+		if path in self.m_paths:
+			return path
+		if os.path.basename(path) in self.m_names:
+			return self.m_names[os.path.basename(path)]
+
+		return None
+
+	# Public methods
+
+	def add(self, p_filepath, p_path=None, p_save=True):
+
+		# Stores a file on disk (under its own path unless another is given)
+		with open(p_filepath, "rb") as input_file:
+			return self.add_stream(input_file, p_path if None != p_path else p_filepath, p_save)
+
+	def add_stream(self, p_stream, p_path, p_save=True):
+
+		# Compresses a binary stream into the store while hashing it, so a
+		# download can be stored without first being written out raw
+
+		# 1. Compress into a temporary file in the store while hashing the raw bytes
+		objects_folder = self.m_store_folder + "objects" + os.sep
+		if not os.path.isdir(objects_folder):
+			os.makedirs(objects_folder)
+
+		content_hash = hashlib.sha256()
+		raw_size = 0
+		temp_handle, temp_filepath = tempfile.mkstemp(dir=objects_folder)
+		os.close(temp_handle)
+		with open_compressed(temp_filepath, "wb", self.m_compression) as compressed_file:
+			for block in iter(lambda: p_stream.read(block_size), b""):
+				content_hash.update(block)
+				compressed_file.write(block)
+				raw_size += len(block)
+		content_hash = content_hash.hexdigest()
+
+		# 2. Keep the compressed file only if this content is new
+		if content_hash in self.m_objects:
+			os.remove(temp_filepath)
+		else:
+			self.m_objects[content_hash] = {
+
+				"compression": self.m_compression,
+				"size": raw_size,
+				"stored_size": os.path.getsize(temp_filepath)
+			}
+			object_filepath = self.__object_filepath(content_hash)
+			if not os.path.isdir(os.path.dirname(object_filepath)):
+				os.mkdir(os.path.dirname(object_filepath))
+			os.replace(temp_filepath, object_filepath)
+
+		# 3. Point the path at the content
+		path = self.__relative_path(p_path)
+		self.m_paths[path] = content_hash
+		self.m_names[os.path.basename(path)] = path
+		if p_save:
+			self.save()
+
+		return content_hash
+
+	def contains(self, p_path):
+		return None != self.__resolve(p_path)
+
+	def hash(self, p_path):
+		path = self.__resolve(p_path)
+		return self.m_paths[path] if None != path else None
+
+	def import_folder(self, p_folder, p_remove_raw=False):
+
+		# Stores every TEI file under a folder (e.g. left behind by scrape runs)
+		imported = []
+		for folder, subfolders, filenames in os.walk(p_folder):
+
+			if os.path.abspath(folder).startswith(os.path.abspath(self.m_store_folder)):
+				continue
+
+			for filename in sorted(filenames):
+				if filename.endswith(".xml"):
+					filepath = os.path.join(folder, filename)
+					imported.append((filepath, self.add(filepath, p_save=False)))
+		self.save()
+
+		# Raw files are removed only once the index recording them is saved
+		if p_remove_raw:
+			for filepath, content_hash in imported:
+				os.remove(filepath)
+
+		return imported
+
+	def move(self, p_path, p_new_path):
+
+		# Points a new path at a stored path's content and forgets the old path
+		# (so a stored file is only replaced once its new content is complete)
+		path = self.__resolve(p_path)
+		if None == path:
+			raise FileNotFoundError("Not in store: {0}".format(p_path))
+		new_path = self.__relative_path(p_new_path)
+		previous_hash = self.m_paths.get(new_path)
+
+		# 1. Repoint the new path and forget the old one
+		self.m_paths[new_path] = self.m_paths.pop(path)
+		if self.m_names.get(os.path.basename(path)) == path:
+			del self.m_names[os.path.basename(path)]
+		self.m_names[os.path.basename(new_path)] = new_path
+
+		# 2. Delete the new path's previous content once no path refers to it
+		if None != previous_hash:
+			self.__release(previous_hash)
+
+		self.save()
+
+	def open(self, p_path):
+
+		# Decompressing binary stream of a stored file
+		path = self.__resolve(p_path)
+		if None == path:
+			raise FileNotFoundError("Not in store: {0}".format(p_path))
+		content_hash = self.m_paths[path]
+
+		return open_compressed(self.__object_filepath(content_hash), "rb", self.m_objects[content_hash]["compression"])
+
+	def paths(self):
+		return sorted(self.m_paths.keys())
+
+	def remove(self, p_path):
+
+		# 1. Forget the path
+		path = self.__resolve(p_path)
+		if None == path:
+			return
+		content_hash = self.m_paths.pop(path)
+		if self.m_names.get(os.path.basename(path)) == path:
+			del self.m_names[os.path.basename(path)]
+
+		# 2. Delete the content once no path refers to it
+		self.__release(content_hash)
+
+		self.save()
+
+	def save(self):
+
+		# Written via a temporary file so an interrupted write never breaks the index
+		index_filepath = self.m_store_folder + "index.json"
+		with open(index_filepath + ".tmp", "w") as index_file:
+			json.dump({ "paths": self.m_paths, "objects": self.m_objects }, index_file, indent=4, sort_keys=True)
+		os.replace(index_filepath + ".tmp", index_filepath)
+
+	def size(self, p_path):
+
+		# Uncompressed size of a stored file
+		content_hash = self.hash(p_path)
+		return self.m_objects[content_hash]["size"] if None != content_hash else None
+
+	def stats(self):
+
+		return {
+
+			"paths": len(self.m_paths),
+			"objects": len(self.m_objects),
+			"raw_bytes": sum(self.m_objects[self.m_paths[path]]["size"] for path in self.m_paths),
+			"stored_bytes": sum(info["stored_size"] for info in self.m_objects.values())
+		}
+
+	# Static methods
+
+	@staticmethod
+	def default():
+
+		# Store at the default location, if one has been created
+		if None == MTPO_CorpusStore.s_default_store and \
+		   os.path.isfile(mtpo["folders"]["store"] + "index.json"):
+			MTPO_CorpusStore.s_default_store = MTPO_CorpusStore()
+
+		return MTPO_CorpusStore.s_default_store
+
+
+# Main script
+
+def parse_arguments():
+
+	# 1. Create the argument parser
+	parser = argparse.ArgumentParser()
+
+	# 2. Define store possibilities
+	parser.add_argument("command", choices=["import", "list", "stats", "cat"], help="Store operation")
+	parser.add_argument("paths", nargs="*", help="Folders to import or stored paths to output")
+	parser.add_argument("-s", "--store", default=mtpo["folders"]["store"], help="Store folder")
+	parser.add_argument("-c", "--compression", choices=list(store_extensions.keys()), help="Compression for new files")
+	parser.add_argument("-r", "--remove", action="store_true", help="Remove raw files once imported")
+
+	# 3. Parse arguments passed in through the terminal
+	return parser.parse_args()
+
+def main():
+
+	# 1. Get arguments from the terminal
+	arguments = parse_arguments()
+	store = MTPO_CorpusStore(arguments.store, arguments.compression)
+
+	# 2. Import folders of raw TEI files
+	if "import" == arguments.command:
+		for folder in arguments.paths:
+			for filepath, content_hash in store.import_folder(folder, arguments.remove):
+				print("{0}: {1}".format(filepath, content_hash[0:12]))
+
+	# 3. List stored paths
+	elif "list" == arguments.command:
+		for path in store.paths():
+			print("{0}: {1}".format(path, store.hash(path)[0:12]))
+
+	# 4. Output stored files
+	elif "cat" == arguments.command:
+		for path in arguments.paths:
+			with store.open(path) as tei_file:
+				shutil.copyfileobj(tei_file, sys.stdout.buffer)
+		return
+
+	# 5. Show store statistics
+	for stat, value in store.stats().items():
+		print("{0}: {1}".format(stat, value))
+
+
+if "__main__" == __name__:
+	main()
@@ -0,0 +1,18 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Makes the chapter 1 modules and the gutenberg_dq modules importable
+# 		   by the tests (they import each other by module name)
+
+# Imports
+
+# Built-ins
+import os
+import sys
+
+
+# Globals
+
+chapter_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in (chapter_folder, chapter_folder + os.sep + "gutenberg_dq"):
+	if folder not in sys.path:
+		sys.path.insert(0, folder)
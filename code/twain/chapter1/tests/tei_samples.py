@@ -0,0 +1,98 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Generated TEI documents and structural queries for the tests
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Globals
+
+# Words of generated text
+sample_words = "the river raft jim huck widow tom sawyer mississippi night fog island".split()
+
+# Tags, attribute values and texts of random trees
+tree_tags = ["a", "b", "c", "d"]
+tree_values = ["1906", "1905", "x"]
+tree_texts = ["", " hello ", "Clemens ", "w "]
+
+
+# Utility functions
+
+def paragraph(p_random, p_length):
+	return " ".join(p_random.choice(sample_words) for index in range(p_length))
+
+def random_tree(p_random, p_depth=0):
+
+	# Element with random attributes, text and children (with comments between some)
+	tag = p_random.choice(tree_tags)
+	attributes = "".join(" {0}=\"{1}\"".format(name, p_random.choice(tree_values))
+		for name in ["n", "when"] if p_random.random() < 0.4)
+	children = ""
+	if p_depth < 5:
+		for index in range(p_random.randint(0, 3)):
+			children += p_random.choice(tree_texts) + random_tree(p_random, p_depth + 1)
+			if p_random.random() < 0.2:
+				children += "<!-- c -->"
+
+	return "<{0}{1}>{2}{3}</{0}>".format(tag, attributes, p_random.choice(["", "x ", "Howells"]), children)
+
+def random_tree_document(p_random):
+	return "<root xmlns=\"urn:x\">{0}{1}</root>".format(random_tree(p_random), random_tree(p_random))
+
+def random_step(p_random, p_last):
+
+	# One query step with random attribute tests, :has() and :contains()
+	step = p_random.choice(tree_tags + ["*"])
+	if p_random.random() < 0.3:
+		step += "[n^=19]"
+	if p_random.random() < 0.2:
+		step += "[when=1906]"
+	if p_random.random() < 0.25:
+		step += ":has({0})".format(p_random.choice(["c", "d[n=x]", "*:contains(Clemens)", "b[when]"]))
+	if p_last and p_random.random() < 0.3:
+		step += ":contains(Howells)"
+
+	return step
+
+def random_query(p_random):
+
+	# One to three steps joined by descendant or child combinators
+	step_count = p_random.randint(1, 3)
+	return "".join(random_step(p_random, step_count - 1 == index) +
+		(p_random.choice([" ", " > "]) if index < step_count - 1 else "") for index in range(step_count))
+
+def volume_document(p_random, p_chapter_count, p_namespaced):
+
+	# TEI volume with a header, front and back matter, and chapters of nested
+	# divs with notes, entities, CDATA, comments and processing instructions
+	prefix = "mt:" if p_namespaced else ""
+	parts = ["<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<!DOCTYPE TEI [\n<!ENTITY mdash \"&#8212;\">\n"
+		"<!ENTITY twain \"Mark Twain\">\n]>\n<!-- corpus file -->\n",
+		"<TEI {0} xml:id=\"root\"><teiHeader><fileDesc><title>Test &amp; <hi>t</hi></title></fileDesc>"
+		"</teiHeader>\n".format("xmlns=\"http://www.tei-c.org/ns/1.0\" xmlns:mt=\"http://example.org/mt\""
+		if p_namespaced else ""),
+		"<text type=\"book\"><front><div1 type=\"preface\"><head>Preface</head><p>{0} &twain;</p></div1>"
+		"</front>\n<body>".format(paragraph(p_random, 20))]
+
+	for chapter in range(p_chapter_count):
+		parts.append("<pb n=\"{0}\"/>\n<!-- chapter {0} -->\n<div1 type=\"chapter\" n=\"{0}\" {1}attr=\"a>b/c\">"
+			"<head>Chapter {0}</head>".format(chapter, prefix))
+		for section in range(p_random.randint(0, 4)):
+			if p_random.random() < 0.1:
+				parts.append("<div2 type=\"empty\"/>")
+				continue
+			parts.append("<div2 type=\"section\"><head>Sec {0}</head>".format(section))
+			for index in range(p_random.randint(1, 6)):
+				parts.append("<p>{0} <persName key=\"{1}\">{2}</persName>&mdash;{3}<note>n {4}</note> "
+					"<![CDATA[x < y]]> <?pi x?></p>\n".format(paragraph(p_random, 30), p_random.choice(sample_words),
+					p_random.choice(sample_words), paragraph(p_random, 10), paragraph(p_random, 3)))
+			if p_random.random() < 0.3:
+				parts.append("<div3><lg><l>{0}</l><l>{1}</l></lg></div3>".format(paragraph(p_random, 5),
+					paragraph(p_random, 6)))
+			parts.append("</div2>")
+		parts.append("<p>{0}</p></div1>\n".format(paragraph(p_random, 15)))
+
+	parts.append("<milestone unit=\"x\"/></body><back><div1 type=\"appendix\"><p>{0}</p></div1>"
+		"<div type=\"notes\"><p>end</p></div></back></text></TEI>\n".format(paragraph(p_random, 10)))
+
+	return "".join(parts)
@@ -0,0 +1,81 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Tests of external_counter.py: counts spilled to disk and merged back
+# 		   equal those of an in-memory Counter
+
+# Imports
+
+# Built-ins
+from collections import Counter
+import os
+import random
+
+# Third party
+import pytest
+
+# Custom
+from external_counter import ExternalCounter
+from text_sketches import ngrams
+
+
+# Globals
+
+words = ["the", "river", "raft", "Jim", "Huck", "widow", "naïve", "élan", "tab\tword", "fog", "island", "town"]
+
+
+# Utility functions
+
+def random_tokens(p_seed, p_count):
+	random_generator = random.Random(p_seed)
+	return [random_generator.choice(words) + str(random_generator.randrange(40)) for index in range(p_count)]
+
+
+# Tests
+
+@pytest.mark.parametrize("seed", range(5))
+def test_spilled_counts_match_counter(seed, tmp_path):
+
+	# A tiny budget and fan-in spill many runs and merge them over several passes
+	tokens = random_tokens(seed, 5000)
+	with ExternalCounter(20000, str(tmp_path), p_merge_fan_in=3) as counter:
+		for token in tokens[0:2500]:
+			counter.add(token)
+		counter.update(tokens[2500:])
+		assert counter.runs > 3
+		assert len(tokens) == counter.total
+
+		items = list(counter.items())
+		assert counter.runs <= 3
+		assert sorted(items) == items
+		assert Counter(tokens) == counter.counter()
+		assert Counter(tokens).most_common(1)[0][1] == counter.most_common(1)[0][1]
+
+	# Closing removes the run files
+	assert [] == os.listdir(str(tmp_path))
+
+def test_ngram_keys_round_trip(tmp_path):
+
+	tokens = random_tokens(0, 3000)
+	expected_counts = Counter(ngrams(tokens, 3))
+	with ExternalCounter(20000, str(tmp_path), p_ngrams=True, p_merge_fan_in=2) as counter:
+		for start in range(0, len(tokens), 500):
+			counter.update(ngrams(tokens[start:start + 502], 3))
+		assert counter.runs > 2
+		assert expected_counts == counter.counter()
+		assert all(isinstance(key, tuple) and 3 == len(key) for key, count in counter.items())
+
+def test_counts_in_memory_match_counter(tmp_path):
+
+	# Without spilling, counts come straight from memory
+	tokens = random_tokens(1, 1000)
+	with ExternalCounter(p_temp_folder=str(tmp_path)) as counter:
+		counter.update_counts(Counter(tokens))
+		assert 0 == counter.runs
+		assert Counter(tokens) == counter.counter()
+
+def test_newline_keys_raise(tmp_path):
+
+	with ExternalCounter(p_temp_folder=str(tmp_path)) as counter:
+		counter.add("two\nlines")
+		with pytest.raises(ValueError):
+			counter.spill()
@@ -0,0 +1,83 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Tests of gutenberg_component_grep.py: streamed components equal the
+# 		   ones GutenbergReader reads into memory, and a failed stream leaves
+# 		   existing output untouched
+
+# Imports
+
+# Built-ins
+import os
+import shutil
+
+# Third party
+import pytest
+
+# Custom
+from gutenberg_component_grep import ComponentStreamWriter, GutenbergReader, GutenbergStreamReader
+
+
+# Globals
+
+input_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+	os.pardir, "gutenberg_dq", "data", "input")
+
+# Editions whose metadata gives the order of their components
+editions = ["2011-05-03-HuckFinn", "2016-08-17-HuckFinn", "2021-02-21-HuckFinn"]
+
+
+# Fixtures
+
+@pytest.fixture(params=editions)
+def edition(request, tmp_path):
+
+	# Copies of an edition's text and metadata (output replaces the metadata file)
+	text_filepath = str(tmp_path / (request.param + ".txt"))
+	metadata_filepath = str(tmp_path / (request.param + ".json"))
+	shutil.copy(os.path.join(input_folder, request.param + ".txt"), text_filepath)
+	shutil.copy(os.path.join(input_folder, request.param + ".json"), metadata_filepath)
+
+	return text_filepath, metadata_filepath
+
+
+# Tests
+
+@pytest.mark.parametrize("stream_format", ComponentStreamWriter.formats)
+def test_stream_matches_reader(edition, stream_format, tmp_path):
+
+	text_filepath, metadata_filepath = edition
+	expected_components = GutenbergReader(text_filepath, metadata_filepath).m_components
+
+	output_filepath = str(tmp_path / ("streamed." + stream_format))
+	GutenbergStreamReader(text_filepath, metadata_filepath).output(output_filepath, stream_format)
+
+	components = ComponentStreamWriter.load_components(output_filepath)
+	assert list(expected_components.keys()) == list(components.keys())
+	assert expected_components == components
+	assert any(isinstance(lines, dict) for lines in components.values())
+
+def test_failed_stream_keeps_output(edition, tmp_path, monkeypatch):
+
+	text_filepath, metadata_filepath = edition
+	output_filepath = str(tmp_path / "streamed.json")
+	GutenbergStreamReader(text_filepath, metadata_filepath).output(output_filepath)
+	with open(output_filepath, "r") as output_file:
+		original_output = output_file.read()
+
+	# 1. Fail part way through a second stream
+	writes = []
+	def failing_write(self, p_key, p_lines):
+		writes.append(p_key)
+		if len(writes) > 2:
+			raise IOError("Disk full")
+		original_write(self, p_key, p_lines)
+	original_write = ComponentStreamWriter.write
+	monkeypatch.setattr(ComponentStreamWriter, "write", failing_write)
+
+	with pytest.raises(IOError):
+		GutenbergStreamReader(text_filepath, metadata_filepath).output(output_filepath)
+
+	# 2. The earlier output is unchanged and no temporary file is left behind
+	with open(output_filepath, "r") as output_file:
+		assert original_output == output_file.read()
+	assert not [filename for filename in os.listdir(str(tmp_path)) if filename.endswith(".tmp")]
@@ -0,0 +1,63 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Tests of mtpo_parallel.py: chunked parallel results equal serial
+# 		   ones, and worker parse errors reach the caller with their message
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Imports
+
+# Built-ins
+import random
+
+# Third party
+import pytest
+
+# Custom
+from mtpo_components import MTPO_ComponentExtractor
+from mtpo_parallel import MTPO_ParallelParser
+from mtpo_query import MTPO_QueryEngine
+from tei_samples import volume_document
+from test_mtpo_query import volume_queries
+
+
+# Fixtures
+
+@pytest.fixture(params=[False, True], ids=["plain", "namespaced"])
+def volume_filepath(request, tmp_path):
+	filepath = str(tmp_path / "volume.xml")
+	with open(filepath, "w", encoding="utf-8") as volume_file:
+		volume_file.write(volume_document(random.Random(2), 40, request.param))
+	return filepath
+
+
+# Tests
+
+def test_parallel_queries_match_serial(volume_filepath):
+
+	serial_results = MTPO_QueryEngine(volume_queries).run(volume_filepath)
+	for processes in (1, 3):
+		assert serial_results == MTPO_ParallelParser(volume_filepath, processes).query(volume_queries)
+
+def test_parallel_components_match_serial(volume_filepath):
+
+	parser = MTPO_ParallelParser(volume_filepath, 3)
+	assert len(parser.scan.chunks(9, 1)) > 1
+	for div_depth in (1, 2, 3):
+		assert list(MTPO_ComponentExtractor(volume_filepath, "X_", div_depth).components()) == \
+			parser.components("X_", div_depth)
+
+def test_worker_parse_error_names_chunk(tmp_path):
+
+	# A broken tag in the middle of the body fails inside a worker
+	volume = volume_document(random.Random(3), 40, False)
+	broken_position = volume.rfind("<p>", 0, len(volume) // 2)
+	filepath = str(tmp_path / "BAD.xml")
+	with open(filepath, "w", encoding="utf-8") as volume_file:
+		volume_file.write(volume[0:broken_position] + "<p><bad" + volume[broken_position + 3:])
+
+	parser = MTPO_ParallelParser(filepath, 3)
+	for parse in (lambda: parser.components("X_", 1), lambda: parser.query(["p"])):
+		with pytest.raises(RuntimeError, match=r"BAD\.xml \(chunk of bytes \d+-\d+\): XMLSyntaxError"):
+			parse()
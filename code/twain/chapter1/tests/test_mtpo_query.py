@@ -0,0 +1,57 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Tests of mtpo_query.py: streaming results equal those of the
+# 		   full-tree reference evaluation
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Imports
+
+# Built-ins
+import random
+
+# Custom
+from mtpo_query import MTPO_QueryEngine, evaluate_dom, verify
+from tei_samples import random_query, random_tree_document, volume_document
+
+
+# Globals
+
+volume_queries = ["persName", "div1 > head", "div2 p persName[key=raft]", "head:contains('Sec 1')",
+	"p:has(persName[key=jim])", "div1:has(div3) head", "text", "body > pb", "*",
+	"div1[type=chapter] > p:contains('river')", "div2:has(lg) > head", "milestone", "note"]
+
+
+# Tests
+
+def test_streaming_matches_reference_on_random_trees(tmp_path):
+
+	# Random documents and queries (combinators, attribute tests, :has, :contains)
+	sample_random = random.Random(0)
+	filepath = str(tmp_path / "tree.xml")
+	for trial in range(200):
+		with open(filepath, "w") as tree_file:
+			tree_file.write(random_tree_document(sample_random))
+		queries = [random_query(sample_random) for index in range(4)]
+		assert evaluate_dom(filepath, queries) == MTPO_QueryEngine(queries).run(filepath), queries
+
+def test_streaming_matches_reference_on_volumes(tmp_path):
+
+	for namespaced in (False, True):
+		filepath = str(tmp_path / "volume.xml")
+		with open(filepath, "w", encoding="utf-8") as volume_file:
+			volume_file.write(volume_document(random.Random(1), 12, namespaced))
+		assert verify(filepath, volume_queries)
+
+def test_query_results(tmp_path):
+
+	filepath = str(tmp_path / "letters.xml")
+	with open(filepath, "w") as letters_file:
+		letters_file.write("<TEI><text><body><div1 type=\"letter\"><head>To Howells</head><p>Dear "
+			"<persName key=\"howells\">Howells</persName></p></div1><div1 type=\"letter\"><head>To Livy</head>"
+			"<p>Dear Livy</p></div1></body></text></TEI>")
+
+	results = MTPO_QueryEngine(["div1:has(persName[key=howells]) > head", "p:contains(Livy)"]).run(filepath)
+	assert ["To Howells"] == [result["text"] for result in results["div1:has(persName[key=howells]) > head"]]
+	assert ["Dear Livy"] == [result["text"] for result in results["p:contains(Livy)"]]
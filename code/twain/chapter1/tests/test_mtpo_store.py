@@ -0,0 +1,148 @@
+# Author: Jonathan Armoza
+# Project: Art of Literary Modeling
+# Date: October 19, 2026
+# Purpose: Tests of mtpo_store.py and of mtpo_scrape.py downloads: stored files
+# 		   read back unchanged, and failed downloads never replace good copies
+# Credits: Terence Catapano of MTPO (assisted with file location and usage
+# 		   rights determination, 2018-2019)
+
+# Imports
+
+# Built-ins
+import functools
+import http.server
+import io
+import os
+import shutil
+import threading
+
+# Third party
+import pytest
+
+# Custom
+from mtpo_catalog import MTPO_Catalog
+from mtpo_commons import mtpo
+from mtpo_scrape import curl_urls
+from mtpo_store import MTPO_CorpusStore, open_tei
+
+
+# Globals
+
+tei = b"<TEI xmlns=\"http://www.tei-c.org/ns/1.0\"><text><body><div1><p>Huck</p></div1></body></text></TEI>"
+new_tei = tei.replace(b"Huck", b"Jim")
+
+
+# Fixtures
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+
+	# Serves the "site" folder over HTTP as the MTPO base URL
+	site_folder = tmp_path / "site"
+	site_folder.mkdir()
+	handler = functools.partial(QuietHandler, directory=str(site_folder))
+	http_server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+	thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+	thread.start()
+	monkeypatch.setitem(mtpo["urls"], "base", "http://127.0.0.1:{0}/".format(http_server.server_port))
+
+	yield site_folder
+
+	http_server.shutdown()
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+
+	def log_message(self, *p_arguments):
+		pass
+
+
+# Tests
+
+def test_store_reads_back_and_deduplicates(tmp_path):
+
+	store = MTPO_CorpusStore(str(tmp_path / "store") + os.sep)
+	first_hash = store.add_stream(io.BytesIO(tei), "letters/A.xml")
+	second_hash = store.add_stream(io.BytesIO(tei), "letters/B.xml")
+
+	assert first_hash == second_hash and 1 == store.stats()["objects"]
+	with open_tei("A.xml", store) as stored_file:
+		assert tei == stored_file.read()
+
+	# Content is kept while another path refers to it
+	store.remove("letters/A.xml")
+	with store.open("letters/B.xml") as stored_file:
+		assert tei == stored_file.read()
+	store.remove("letters/B.xml")
+	assert 0 == store.stats()["objects"]
+
+def test_move_replaces_content(tmp_path):
+
+	store = MTPO_CorpusStore(str(tmp_path / "store") + os.sep)
+	store.add_stream(io.BytesIO(tei), "letters/A.xml")
+	store.add_stream(io.BytesIO(new_tei), "letters/A.xml.part")
+	store.move("letters/A.xml.part", "letters/A.xml")
+
+	assert ["letters/A.xml"] == store.paths() and 1 == store.stats()["objects"]
+	with store.open("letters/A.xml") as stored_file:
+		assert new_tei == stored_file.read()
+
+def test_import_removes_raw_files_after_saving(tmp_path):
+
+	raw_folder = tmp_path / "raw"
+	raw_folder.mkdir()
+	for name in ("A.xml", "B.xml"):
+		(raw_folder / name).write_bytes(tei + name.encode("utf-8"))
+
+	store_folder = str(tmp_path / "store") + os.sep
+	imported = MTPO_CorpusStore(store_folder).import_folder(str(raw_folder), p_remove_raw=True)
+
+	assert 2 == len(imported) and 0 == len(os.listdir(str(raw_folder)))
+	reopened = MTPO_CorpusStore(store_folder)
+	assert 2 == len(reopened.paths())
+	with reopened.open("B.xml") as stored_file:
+		assert tei + b"B.xml" == stored_file.read()
+
+@pytest.mark.skipif(None == shutil.which("curl"), reason="curl is not installed")
+def test_failed_download_keeps_file(tmp_path, server):
+
+	catalog = MTPO_Catalog(str(tmp_path / "catalog.db"))
+	output_folder = str(tmp_path / "out") + os.sep
+	os.mkdir(output_folder)
+	url = mtpo["urls"]["base"] + "A.xml"
+
+	# 1. A good download is written and recorded
+	(server / "A.xml").write_bytes(tei)
+	curl_urls([url, mtpo["urls"]["base"] + "MISSING.xml"], output_folder, p_catalog=catalog)
+	assert ["A.xml"] == os.listdir(output_folder)
+	assert catalog.fetched("A.xml") and not catalog.fetched("MISSING.xml")
+	fetched_time = catalog.document("A.xml")["fetched"]
+
+	# 2. A failed download leaves the earlier copy and its record alone
+	(server / "A.xml").unlink()
+	curl_urls([url], output_folder, p_catalog=catalog)
+	assert ["A.xml"] == os.listdir(output_folder)
+	with open(output_folder + "A.xml", "rb") as output_file:
+		assert tei == output_file.read()
+	assert fetched_time == catalog.document("A.xml")["fetched"]
+
+@pytest.mark.skipif(None == shutil.which("curl"), reason="curl is not installed")
+def test_failed_download_keeps_stored_copy(tmp_path, server):
+
+	catalog = MTPO_Catalog(str(tmp_path / "catalog.db"))
+	store = MTPO_CorpusStore(str(tmp_path / "store") + os.sep)
+	url = mtpo["urls"]["base"] + "A.xml"
+
+	# 1. A good download is stored, and a new version replaces it
+	(server / "A.xml").write_bytes(tei)
+	curl_urls([url], None, store, catalog)
+	(server / "A.xml").write_bytes(new_tei)
+	curl_urls([url], None, store, catalog)
+	assert ["A.xml"] == store.paths() and 1 == store.stats()["objects"]
+
+	# 2. A failed download leaves the stored copy alone
+	(server / "A.xml").unlink()
+	curl_urls([url], None, store, catalog)
+	assert ["A.xml"] == store.paths()
+	with store.open("A.xml") as stored_file:
+		assert new_tei == stored_file.read()
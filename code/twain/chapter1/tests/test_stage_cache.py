@@ -0,0 +1,90 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Tests of stage_cache.py: resuming a sequence from the last readable
+# 		   stored stage, and recovering from missing or corrupt entries
+
+# Imports
+
+# Built-ins
+import os
+
+# Custom
+from stage_cache import StageCache, drop_blank_lines, lowercase_lines, strip_lines
+
+
+# Globals
+
+text = "  The Boy  \n\n  Went Down  \n\nTo the River\n"
+
+stages = [
+
+	("strip", strip_lines, {}),
+	("drop_blank", drop_blank_lines, {}),
+	("lowercase", lowercase_lines, {})
+]
+
+
+# Utility functions
+
+def lines():
+	return text.split("\n")
+
+def uncached_output():
+	output = lines()
+	for stage_name, stage_function, parameters in stages:
+		output = stage_function(output, **parameters)
+	return output
+
+def entry_filepath(p_cache_folder, p_key):
+	return os.path.join(p_cache_folder, p_key[0:2], p_key + ".pickle")
+
+
+# Tests
+
+def test_sequence_resumes_from_stored_stages(tmp_path):
+
+	cache_folder = str(tmp_path) + os.sep
+	output, key = StageCache(cache_folder).run_sequence(lines(), stages, "input")
+	assert uncached_output() == output
+
+	# A new session reads the last stage without recomputing any
+	cache = StageCache(cache_folder)
+	assert (output, key) == cache.run_sequence(lines(), stages, "input")
+	assert 3 == cache.stats["hits"] and 0 == cache.stats["misses"]
+
+def test_sequence_recomputes_missing_entry(tmp_path):
+
+	cache_folder = str(tmp_path) + os.sep
+	output, key = StageCache(cache_folder).run_sequence(lines(), stages, "input")
+
+	# The last stage's file is gone: resume from the stage before it
+	cache = StageCache(cache_folder)
+	os.remove(entry_filepath(cache_folder, key))
+	assert (output, key) == cache.run_sequence(lines(), stages, "input")
+	assert 2 == cache.stats["hits"] and 1 == cache.stats["misses"]
+	assert os.path.isfile(entry_filepath(cache_folder, key))
+
+def test_sequence_recomputes_corrupt_entries(tmp_path):
+
+	cache_folder = str(tmp_path) + os.sep
+	cache = StageCache(cache_folder)
+	output, key = cache.run_sequence(lines(), stages, "input")
+
+	# Every stored output is unreadable: all stages are recomputed from the input
+	for stage_key in list(cache.m_index.keys()):
+		with open(entry_filepath(cache_folder, stage_key), "wb") as entry_file:
+			entry_file.write(b"\x80\x05truncated")
+	cache = StageCache(cache_folder)
+	assert (output, key) == cache.run_sequence(lines(), stages, "input")
+	assert 0 == cache.stats["hits"] and 3 == cache.stats["misses"]
+
+def test_get_treats_missing_entry_as_miss(tmp_path):
+
+	cache_folder = str(tmp_path) + os.sep
+	cache = StageCache(cache_folder)
+	output, key = cache.run("strip", strip_lines, lines())
+	os.remove(entry_filepath(cache_folder, key))
+
+	assert (False, None) == cache.get(key)
+	assert not cache.contains(key) and 0 == cache.stats["bytes"]
+	assert (output, key) == cache.run("strip", strip_lines, lines())
@@ -0,0 +1,125 @@
+# Author: Jonathan Armoza
+# Creation date: October 19, 2026
+# Purpose: Tests of work_queue.py: draining a job, reclaiming tasks whose
+# 		   lease expired, and recovering from task and result errors
+
+# Imports
+
+# Built-ins
+import time
+
+# Third party
+import numpy as np
+import pytest
+
+# Custom
+from work_queue import QueueWorker, WorkQueue
+
+
+# Job functions (run by workers as "test_work_queue:<function>")
+
+def square_job(p_payload):
+	return { "square": np.int64(p_payload * p_payload), "digits": np.arange(3) * p_payload }
+
+def tuple_key_job(p_payload):
+
+	# Results with tuple keys cannot be encoded as JSON
+	if 0 == p_payload % 2:
+		return { (p_payload, p_payload): 1 }
+	return p_payload
+
+def raising_job(p_payload):
+	if p_payload < 0:
+		raise ValueError("Negative payload {0}".format(p_payload))
+	return p_payload
+
+
+# Fixtures
+
+@pytest.fixture
+def queue_filepath(tmp_path):
+	return str(tmp_path / "queue.sqlite")
+
+
+# Tests
+
+def test_worker_drains_job(queue_filepath):
+
+	job = "test_work_queue:square_job"
+	with WorkQueue(queue_filepath) as queue:
+		assert 4 == queue.submit(job, [("task{0}".format(number), number) for number in range(4)])
+		assert 0 == queue.submit(job, [("task0", 0)])
+
+	assert (4, 0) == QueueWorker(queue_filepath, job, p_poll_seconds=0.01).run()
+
+	with WorkQueue(queue_filepath) as queue:
+		assert 4 == queue.counts(job)["done"]
+		assert [("task{0}".format(number), { "square": number * number, "digits": [0, number, 2 * number] })
+				for number in range(4)] == list(queue.results(job))
+
+		# Resubmitted tasks that are done are not run again
+		assert 0 == queue.submit(job, [("task{0}".format(number), number) for number in range(4)])
+		assert None == queue.claim(job, "worker")
+
+def test_expired_lease_is_reclaimed(queue_filepath):
+
+	with WorkQueue(queue_filepath, p_lease_seconds=0.05) as queue:
+		queue.submit("job", [("only", 1)])
+
+		# 1. A worker that stops heartbeating loses its task to another worker
+		crashed_task = queue.claim("job", "crashed")
+		assert None == queue.claim("job", "other")
+		time.sleep(0.1)
+		task = queue.claim("job", "other")
+		assert crashed_task.task_id == task.task_id
+		assert 2 == task.attempts
+
+		# 2. Only the worker holding the lease can checkpoint the result
+		assert not queue.heartbeat(crashed_task, "crashed")
+		assert not queue.complete(crashed_task, "crashed", "stale")
+		assert queue.complete(task, "other", "fresh")
+		assert [("only", "fresh")] == list(queue.results("job"))
+
+def test_expired_lease_out_of_attempts_fails(queue_filepath):
+
+	with WorkQueue(queue_filepath, p_lease_seconds=0.01) as queue:
+		queue.submit("job", [("only", 1)], p_max_attempts=1)
+		queue.claim("job", "crashed")
+		time.sleep(0.05)
+		assert None == queue.claim("job", "other")
+		assert [("only", 1, "lease expired")] == queue.failures("job")
+
+def test_unencodable_result_fails_task(queue_filepath):
+
+	# Tasks whose results cannot be encoded fail (after every attempt) without stopping the worker
+	job = "test_work_queue:tuple_key_job"
+	with WorkQueue(queue_filepath) as queue:
+		queue.submit(job, [("task{0}".format(number), number) for number in range(4)], p_max_attempts=2)
+
+	assert (2, 4) == QueueWorker(queue_filepath, job, p_poll_seconds=0.01).run()
+
+	with WorkQueue(queue_filepath) as queue:
+		assert [("task1", 1), ("task3", 3)] == list(queue.results(job))
+		failures = queue.failures(job)
+		assert ["task0", "task2"] == [key for key, attempts, error in failures]
+		assert all(2 == attempts and "TypeError" in error for key, attempts, error in failures)
+
+def test_failed_tasks_requeue(queue_filepath):
+
+	job = "test_work_queue:raising_job"
+	with WorkQueue(queue_filepath) as queue:
+		queue.submit(job, [("negative", -1), ("positive", 1)])
+
+	assert (1, 3) == QueueWorker(queue_filepath, job, p_poll_seconds=0.01).run()
+
+	with WorkQueue(queue_filepath) as queue:
+		assert { "pending": 0, "leased": 0, "done": 1, "failed": 1 } == queue.counts(job)
+		key, attempts, error = queue.failures(job)[0]
+		assert ("negative", 3) == (key, attempts)
+		assert "Negative payload -1" in error
+
+		# Requeued tasks get fresh attempts; finished ones are left alone
+		assert 1 == queue.requeue(job)
+		task = queue.claim(job, "worker")
+		assert ("negative", 1) == (task.key, task.attempts)
+		assert None == queue.claim(job, "other")